@@ -1,8 +1,18 @@
 # Import to populate sub commands
-from aiida_optimade.cli import cmd_calc, cmd_init, cmd_run
+from aiida_optimade.cli import (
+    cmd_calc,
+    cmd_index,
+    cmd_init,
+    cmd_migrate,
+    cmd_quarantine,
+    cmd_run,
+)
 
 __all__ = (
     "cmd_calc",
+    "cmd_index",
     "cmd_init",
+    "cmd_migrate",
+    "cmd_quarantine",
     "cmd_run",
 )
@@ -5,10 +5,19 @@ import click
 from tqdm import tqdm
 
 from aiida_optimade.cli.cmd_aiida_optimade import cli
+from aiida_optimade.cli.options import (
+    CHUNK_SIZE,
+    NODE_MAX_MEMORY,
+    NODE_TIMEOUT,
+    RESUME,
+    SINCE_MTIME,
+    SINCE_PK,
+    WORKERS,
+)
 from aiida_optimade.common.logger import LOGGER, disable_logging
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Tuple
+    from typing import Optional, Tuple
 
     from aiida.common.extendeddicts import AttributeDict
 
@@ -39,12 +48,34 @@ if TYPE_CHECKING:  # pragma: no cover
     show_default=True,
     help="Suppress informational output.",
 )
+@WORKERS
+@CHUNK_SIZE
+@RESUME
+@SINCE_PK
+@SINCE_MTIME
+@NODE_TIMEOUT
+@NODE_MAX_MEMORY
 @click.pass_obj
-def calc(obj: "AttributeDict", fields: "Tuple[str]", force_yes: bool, silent: bool):
+def calc(  # pylint: disable=too-many-arguments,too-many-statements
+    obj: "AttributeDict",
+    fields: "Tuple[str]",
+    force_yes: bool,
+    silent: bool,
+    workers: int,
+    chunk_size: int,
+    resume: bool,
+    since_pk: "Optional[str]",
+    since_mtime: "Optional[str]",
+    node_timeout: float,
+    node_max_memory: int,
+):
     """Calculate OPTIMADE fields in the AiiDA database."""
     from aiida import load_profile
     from aiida.cmdline.utils import echo
 
+    from aiida_optimade.cli.utils import get_journal_filters, set_calculation_limits
+    from aiida_optimade.journal import Journal
+
     # The default aiida.cmdline loglevel inherit from aiida loglevel is REPORT
     # Here we use INFO loglevel for the operations
     echo.CMDLINE_LOGGER.setLevel("INFO")
@@ -55,10 +86,29 @@ def calc(obj: "AttributeDict", fields: "Tuple[str]", force_yes: bool, silent: bo
         profile = None
     profile = load_profile(profile).name
 
+    journal = Journal.for_profile("calc", profile)
+    filters = get_journal_filters(journal, resume, since_pk, since_mtime)
+    set_calculation_limits(node_timeout, node_max_memory)
+
     try:
         with disable_logging():
             from aiida_optimade.routers.structures import STRUCTURES
 
+        extras_fields = {
+            STRUCTURES.resource_mapper.get_backend_field(_)[
+                len(STRUCTURES.resource_mapper.PROJECT_PREFIX) :
+            ]
+            for _ in fields
+            if STRUCTURES.resource_mapper.get_backend_field(_).startswith(
+                STRUCTURES.resource_mapper.PROJECT_PREFIX
+            )
+        }
+        if resume and sorted(extras_fields) != journal.fields:
+            echo.echo_critical(
+                f"Cannot resume: the last run calculated the fields "
+                f"{', '.join(journal.fields)}."
+            )
+
         extras_key = STRUCTURES.resource_mapper.PROJECT_PREFIX.split(".")[1]
         query_kwargs = {
             "filters": {
@@ -70,11 +120,13 @@ def calc(obj: "AttributeDict", fields: "Tuple[str]", force_yes: bool, silent: bo
                         }
                     },
                 ]
+                + ([filters] if filters else [])
             },
             "project": ["*", "extras.optimade"],
         }
 
-        number_of_nodes = STRUCTURES.count(**query_kwargs)
+        # When resuming, the fields have already been removed by the last run
+        number_of_nodes = 0 if resume else STRUCTURES.count(**query_kwargs)
         if number_of_nodes:
             if not silent:
                 echo.echo_info(
@@ -130,16 +182,14 @@ def calc(obj: "AttributeDict", fields: "Tuple[str]", force_yes: bool, silent: bo
                 " This may take several minutes!"
             )
 
-        STRUCTURES._extras_fields = {
-            STRUCTURES.resource_mapper.get_backend_field(_)[
-                len(STRUCTURES.resource_mapper.PROJECT_PREFIX) :
-            ]
-            for _ in fields
-            if STRUCTURES.resource_mapper.get_backend_field(_).startswith(
-                STRUCTURES.resource_mapper.PROJECT_PREFIX
-            )
-        }
-        updated_pks = STRUCTURES._check_and_calculate_entities(cli=not silent)
+        STRUCTURES._extras_fields = extras_fields
+        updated_pks = STRUCTURES._check_and_calculate_entities(
+            cli=not silent,
+            chunk_size=chunk_size,
+            workers=workers,
+            filters=filters,
+            journal=journal,
+        )
     except click.Abort:
         echo.echo_warning("Aborted!")
         return
@@ -0,0 +1,201 @@
+# pylint: disable=protected-access
+from typing import TYPE_CHECKING
+
+import click
+
+from aiida_optimade.cli.cmd_aiida_optimade import cli
+from aiida_optimade.common.logger import LOGGER, disable_logging
+from aiida_optimade.indexes import INDEXES
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Optional, Tuple
+
+    from aiida.common.extendeddicts import AttributeDict
+
+
+FIELDS_ARGUMENT = click.argument(
+    "fields",
+    type=click.Choice(sorted(INDEXES)),
+    required=False,
+    nargs=-1,
+)
+SILENT_OPTION = click.option(
+    "-q",
+    "--silent",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Suppress informational output.",
+)
+EXPLAIN_OPTION = click.option(
+    "--explain/--no-explain",
+    default=True,
+    show_default=True,
+    help="Report the estimated cost of a set of canonical queries before and after.",
+)
+CONCURRENTLY_OPTION = click.option(
+    "--concurrently/--no-concurrently",
+    default=True,
+    show_default=True,
+    help="Do not lock writes to the AiiDA Node table while changing the indexes.",
+)
+
+
+@cli.group()
+def index():
+    """Manage indexes for the OPTIMADE fields in the AiiDA database."""
+
+
+@index.command("create")
+@FIELDS_ARGUMENT
+@EXPLAIN_OPTION
+@CONCURRENTLY_OPTION
+@SILENT_OPTION
+@click.pass_obj
+def create(
+    obj: "AttributeDict",
+    fields: "Tuple[str]",
+    explain: bool,
+    concurrently: bool,
+    silent: bool,
+):
+    """Create indexes for the OPTIMADE FIELDS (default: all)."""
+    from aiida_optimade.indexes import create_indexes
+
+    _change_indexes(
+        obj,
+        fields,
+        explain=explain,
+        silent=silent,
+        action="create",
+        change=lambda fields, entities: create_indexes(
+            fields, entities, concurrently=concurrently
+        ),
+    )
+
+
+@index.command("drop")
+@FIELDS_ARGUMENT
+@EXPLAIN_OPTION
+@CONCURRENTLY_OPTION
+@SILENT_OPTION
+@click.pass_obj
+def drop(
+    obj: "AttributeDict",
+    fields: "Tuple[str]",
+    explain: bool,
+    concurrently: bool,
+    silent: bool,
+):
+    """Drop the indexes for the OPTIMADE FIELDS (default: all)."""
+    from aiida_optimade.indexes import drop_indexes
+
+    _change_indexes(
+        obj,
+        fields,
+        explain=explain,
+        silent=silent,
+        action="drop",
+        change=lambda fields, _: drop_indexes(fields, concurrently=concurrently),
+    )
+
+
+@index.command("list")
+@click.pass_obj
+def list_(obj: "AttributeDict"):
+    """List the existing AiiDA-OPTIMADE indexes."""
+    from aiida.cmdline.utils import echo
+
+    from aiida_optimade.indexes import list_indexes
+
+    profile = _load_profile(obj)
+    indexes = list_indexes()
+    if not indexes:
+        echo.echo_info(f"No AiiDA-OPTIMADE indexes found for {profile!r}.")
+        return
+
+    for existing_index in indexes:
+        echo.echo(f"{existing_index['name']} ({existing_index['size']})")
+        echo.echo(f"    {existing_index['definition']}")
+
+
+def _load_profile(obj: "AttributeDict") -> str:
+    """Load the AiiDA profile and return its name"""
+    from aiida import load_profile
+
+    try:
+        profile: "Optional[str]" = obj.profile.name
+    except AttributeError:
+        profile = None
+    return load_profile(profile).name
+
+
+def _change_indexes(  # pylint: disable=too-many-arguments
+    obj: "AttributeDict",
+    fields: "Tuple[str]",
+    explain: bool,
+    silent: bool,
+    action: str,
+    change: "Callable[[list[str], list[str]], list[str]]",
+) -> None:
+    """Create or drop indexes, reporting the estimated cost of the canonical
+    queries before and after"""
+    from aiida.cmdline.utils import echo
+
+    from aiida_optimade.indexes import explain_canonical_queries
+
+    # The default aiida.cmdline loglevel inherit from aiida loglevel is REPORT
+    # Here we use INFO loglevel for the operations
+    echo.CMDLINE_LOGGER.setLevel("INFO")
+
+    profile = _load_profile(obj)
+    fields = list(fields or sorted(INDEXES))
+
+    try:
+        with disable_logging():
+            from aiida_optimade.routers.structures import STRUCTURES
+
+        costs_before = explain_canonical_queries(STRUCTURES) if explain else {}
+
+        if not silent:
+            echo.echo_info(
+                f"{'Creating' if action == 'create' else 'Dropping'} indexes for "
+                f"{', '.join(fields)} in {profile!r}."
+            )
+            if action == "create":
+                echo.echo_warning("This may take several minutes!")
+        names = change(fields, STRUCTURES.entities)
+
+        costs_after = explain_canonical_queries(STRUCTURES) if explain else {}
+    except Exception as exc:  # pylint: disable=broad-except
+        import traceback
+
+        exception = traceback.format_exc()
+
+        LOGGER.error(
+            "Full exception from 'aiida-optimade index %s' CLI:\n%s", action, exception
+        )
+        echo.echo_critical(
+            f"An exception happened while trying to {action} indexes for {profile!r} "
+            f"(see log for more details):\n{exc!r}"
+        )
+
+    if explain and not silent:
+        echo.echo_info("Estimated query cost (before -> after):")
+        for query, cost_before in costs_before.items():
+            cost_after = costs_after.get(query, None)
+            echo.echo(
+                f"    {query or '(no filter)'}: {_format_cost(cost_before)} -> "
+                f"{_format_cost(cost_after)}"
+            )
+
+    if not silent:
+        echo.echo_success(
+            f"{'Created' if action == 'create' else 'Dropped'} indexes: "
+            f"{', '.join(names)}."
+        )
+
+
+def _format_cost(cost: "Optional[float]") -> str:
+    """Format an estimated query cost"""
+    return "unknown" if cost is None else f"{cost:.2f}"
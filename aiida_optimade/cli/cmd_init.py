@@ -6,11 +6,20 @@ import click
 from tqdm import tqdm
 
 from aiida_optimade.cli.cmd_aiida_optimade import cli
+from aiida_optimade.cli.options import (
+    CHUNK_SIZE,
+    NODE_MAX_MEMORY,
+    NODE_TIMEOUT,
+    RESUME,
+    SINCE_MTIME,
+    SINCE_PK,
+    WORKERS,
+)
 from aiida_optimade.common.logger import LOGGER, disable_logging
 
 if TYPE_CHECKING:  # pragma: no cover
     from collections.abc import Generator, Iterator
-    from typing import IO, List, Union
+    from typing import IO, List, Optional, Union
 
     from aiida.common.extendeddicts import AttributeDict
 
@@ -43,17 +52,56 @@ if TYPE_CHECKING:  # pragma: no cover
         "Node extra."
     ),
 )
+@click.option(
+    "--structures-table",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help=(
+        "Materialize the OPTIMADE fields in a dedicated, typed, and indexed table. "
+        "This is always done if the `structures_table` server option is enabled."
+    ),
+)
 @click.option(
     "--filename",
     type=click.Path(exists=True, dir_okay=False, readable=True, resolve_path=True),
     help="Filename to load as database (currently only usable for MongoDB).",
 )
+@WORKERS
+@CHUNK_SIZE
+@RESUME
+@SINCE_PK
+@SINCE_MTIME
+@NODE_TIMEOUT
+@NODE_MAX_MEMORY
 @click.pass_obj
-def init(obj: "AttributeDict", force: bool, silent: bool, mongo: bool, filename: str):
+def init(  # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+    obj: "AttributeDict",
+    force: bool,
+    silent: bool,
+    mongo: bool,
+    structures_table: bool,
+    filename: str,
+    workers: int,
+    chunk_size: int,
+    resume: bool,
+    since_pk: "Optional[str]",
+    since_mtime: "Optional[str]",
+    node_timeout: float,
+    node_max_memory: int,
+):
     """Initialize an AiiDA database to be served with AiiDA-OPTIMADE."""
     from aiida import load_profile
     from aiida.cmdline.utils import echo
 
+    from aiida_optimade.cli.utils import get_journal_filters, set_calculation_limits
+    from aiida_optimade.journal import Journal
+
+    if force and (resume or since_pk or since_mtime):
+        raise click.UsageError(
+            "--force cannot be combined with --resume, --since-pk, or --since-mtime."
+        )
+
     # The default aiida.cmdline loglevel inherit from aiida loglevel is REPORT
     # Here we use INFO loglevel for the operations
     echo.CMDLINE_LOGGER.setLevel("INFO")
@@ -69,9 +117,23 @@ def init(obj: "AttributeDict", force: bool, silent: bool, mongo: bool, filename:
             profile = None
         profile = load_profile(profile).name
 
+    journal = Journal.for_profile("init", profile)
+    filters = get_journal_filters(journal, resume, since_pk, since_mtime)
+    set_calculation_limits(node_timeout, node_max_memory)
+
     try:
         with disable_logging():
+            from aiida_optimade.config import CONFIG as SERVER_CONFIG
             from aiida_optimade.routers.structures import STRUCTURES
+            from aiida_optimade.tables import StructuresTable
+
+            table = None
+            if not mongo and (structures_table or SERVER_CONFIG.structures_table):
+                table = STRUCTURES.table or StructuresTable(
+                    entities=STRUCTURES.entities,
+                    group=STRUCTURES.group,
+                    project_prefix=STRUCTURES.resource_mapper.PROJECT_PREFIX,
+                )
 
             if mongo:
                 from optimade.server.config import CONFIG, SupportedBackend
@@ -127,6 +189,11 @@ def init(obj: "AttributeDict", force: bool, silent: bool, mongo: bool, filename:
                         "Nodes."
                     )
 
+                if table is not None:
+                    if not silent:
+                        echo.echo_info(f"Dropping table {table.table.name!r}.")
+                    table.drop()
+
         if not silent:
             echo.echo_info(f"Initializing {profile}.")
             echo.echo_warning("This may take several minutes!")
@@ -188,19 +255,43 @@ def init(obj: "AttributeDict", force: bool, silent: bool, mongo: bool, filename:
                 }
                 entries = [[_] for _ in entries]
 
-            STRUCTURES._extras_fields = {
-                STRUCTURES.resource_mapper.get_backend_field(_)[
-                    len(STRUCTURES.resource_mapper.PROJECT_PREFIX) :
-                ]
-                for _ in STRUCTURES.resource_mapper.ALL_ATTRIBUTES
-                if STRUCTURES.resource_mapper.get_backend_field(_).startswith(
-                    STRUCTURES.resource_mapper.PROJECT_PREFIX
+            STRUCTURES._extras_fields = STRUCTURES._all_extras_fields()
+            if mongo and workers > 1 and not silent:
+                echo.echo_warning(
+                    "Multiple workers are not supported with --mongo. Using a single "
+                    "process."
+                )
+            if mongo and filters and not silent:
+                echo.echo_warning(
+                    "--resume, --since-pk, and --since-mtime are not supported with "
+                    "--mongo. Handling all Nodes."
+                )
+            if resume and not silent:
+                echo.echo_info(
+                    f"Resuming from {journal.filename} (last committed PK: "
+                    f"{journal.last_pk}, Nodes in failed chunks: "
+                    f"{len(journal.failures)})."
                 )
-            }
+            content_cache_hits = STRUCTURES._content_cache_hits
             updated_pks = STRUCTURES._check_and_calculate_entities(
                 cli=not silent,
                 entries=entries if mongo else None,
+                chunk_size=chunk_size,
+                workers=workers,
+                filters=filters,
+                journal=journal,
             )
+            content_cache_hits = STRUCTURES._content_cache_hits - content_cache_hits
+            quarantined = [] if mongo else STRUCTURES.quarantined()
+
+            if table is not None:
+                table.create()
+                materialized_pks = STRUCTURES.sync_table(table=table, cli=not silent)
+                if not silent:
+                    echo.echo_info(
+                        f"Wrote {len(materialized_pks)} rows in table "
+                        f"{table.table.name!r}."
+                    )
     except Exception as exc:  # pylint: disable=broad-except
         import traceback
 
@@ -219,6 +310,19 @@ def init(obj: "AttributeDict", force: bool, silent: bool, mongo: bool, filename:
                 f"{len(updated_pks)} StructureData and CifData Nodes or MongoDB "
                 "documents have been initialized."
             )
+            if not filename and not mongo:
+                echo.echo_info(
+                    "Reused the OPTIMADE fields of identical structures for "
+                    f"{content_cache_hits} of {len(updated_pks)} Nodes (dedup hit "
+                    f"rate: {content_cache_hits / len(updated_pks):.1%})."
+                )
+                if quarantined:
+                    echo.echo_warning(
+                        f"{len(quarantined)} Node"
+                        f"{'s are' if len(quarantined) > 1 else ' is'} quarantined, "
+                        "since the OPTIMADE fields could not be calculated. Run "
+                        "`aiida-optimade quarantine list` for details."
+                    )
         else:
             echo.echo_info(
                 "No new StructureData and CifData Nodes or MongoDB documents found to "
@@ -0,0 +1,112 @@
+from typing import TYPE_CHECKING
+
+import click
+
+from aiida_optimade.cli.cmd_aiida_optimade import cli
+from aiida_optimade.cli.options import CHUNK_SIZE
+from aiida_optimade.common.logger import LOGGER, disable_logging
+
+if TYPE_CHECKING:  # pragma: no cover
+    from aiida.common.extendeddicts import AttributeDict
+
+
+@cli.command("migrate-floats")
+@click.option(
+    "--to",
+    "storage",
+    type=click.Choice(["native", "hex"]),
+    default="native",
+    show_default=True,
+    help=(
+        "Store the float-valued OPTIMADE fields as native JSON numbers or as hex "
+        "strings."
+    ),
+)
+@click.option(
+    "-y",
+    "--force-yes",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Do not ask for confirmation when rewriting the Node extras.",
+)
+@click.option(
+    "-q",
+    "--silent",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Suppress informational output.",
+)
+@CHUNK_SIZE
+@click.pass_obj
+def migrate_floats(
+    obj: "AttributeDict",
+    storage: str,
+    force_yes: bool,
+    silent: bool,
+    chunk_size: int,
+):
+    """Convert the stored float-valued OPTIMADE fields in the AiiDA database.
+
+    Afterwards, set `float_storage` in the server configuration accordingly.
+    """
+    from aiida import load_profile
+    from aiida.cmdline.utils import echo
+
+    # The default aiida.cmdline loglevel inherit from aiida loglevel is REPORT
+    # Here we use INFO loglevel for the operations
+    echo.CMDLINE_LOGGER.setLevel("INFO")
+
+    try:
+        profile: str = obj.profile.name
+    except AttributeError:
+        profile = None
+    profile = load_profile(profile).name
+
+    representation = "native JSON numbers" if storage == "native" else "hex strings"
+
+    try:
+        with disable_logging():
+            from aiida_optimade.routers.structures import STRUCTURES
+
+        if not force_yes:
+            click.confirm(
+                "Are you sure you want to store the float-valued OPTIMADE fields in "
+                f"{profile!r} as {representation}?",
+                default=True,
+                abort=True,
+                show_default=True,
+            )
+
+        if not silent:
+            fields = sorted(STRUCTURES.resource_mapper.FLOAT_ATTRIBUTES)
+            echo.echo_warning(
+                f"Converting {', '.join(fields)} to {representation}. This may take "
+                "several minutes!"
+            )
+        updated_pks = STRUCTURES.migrate_floats(
+            native=storage == "native", chunk_size=chunk_size, cli=not silent
+        )
+    except click.Abort:
+        echo.echo_warning("Aborted!")
+        return
+    except Exception as exc:  # pylint: disable=broad-except
+        import traceback
+
+        exception = traceback.format_exc()
+
+        LOGGER.error(
+            "Full exception from 'aiida-optimade migrate-floats' CLI:\n%s", exception
+        )
+        echo.echo_critical(
+            f"An exception happened while trying to migrate {profile!r} (see log for "
+            f"more details):\n{exc!r}"
+        )
+
+    if not silent:
+        echo.echo_success(
+            f"Migrated the floats of {len(updated_pks)} Node"
+            f"{'' if len(updated_pks) == 1 else 's'} in {profile!r}. Set "
+            f"`float_storage` to {storage!r} in the server configuration."
+        )
@@ -0,0 +1,193 @@
+# pylint: disable=protected-access
+from typing import TYPE_CHECKING
+
+import click
+
+from aiida_optimade.cli.cmd_aiida_optimade import cli
+from aiida_optimade.cli.options import CHUNK_SIZE, NODE_MAX_MEMORY, NODE_TIMEOUT
+from aiida_optimade.common.logger import LOGGER, disable_logging
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Tuple
+
+    from aiida.common.extendeddicts import AttributeDict
+
+
+@cli.group()
+def quarantine():
+    """Nodes for which the OPTIMADE fields could not be calculated.
+
+    Quarantined Nodes are skipped when calculating missing OPTIMADE fields, both by
+    `aiida-optimade init` and while handling requests.
+    """
+
+
+@quarantine.command("list")
+@click.pass_obj
+def list_quarantined(obj: "AttributeDict"):
+    """List the quarantined Nodes."""
+    from aiida import load_profile
+    from aiida.cmdline.utils import echo
+    from tabulate import tabulate
+
+    try:
+        profile: str = obj.profile.name
+    except AttributeError:
+        profile = None
+    profile = load_profile(profile).name
+
+    try:
+        with disable_logging():
+            from aiida_optimade.routers.structures import STRUCTURES
+
+        quarantined = STRUCTURES.quarantined()
+    except Exception as exc:  # pylint: disable=broad-except
+        import traceback
+
+        exception = traceback.format_exc()
+
+        LOGGER.error(
+            "Full exception from 'aiida-optimade quarantine list' CLI:\n%s", exception
+        )
+        echo.echo_critical(
+            f"An exception happened while trying to list the quarantined Nodes in "
+            f"{profile!r} (see log for more details):\n{exc!r}"
+        )
+
+    if not quarantined:
+        echo.echo_info(f"No quarantined Nodes in {profile!r}.")
+        return
+
+    echo.echo(
+        tabulate(
+            [
+                [
+                    pk,
+                    node_type.rsplit(".", 2)[-2],
+                    record.get("time"),
+                    record.get("seconds"),
+                    record.get("error"),
+                ]
+                for pk, node_type, record in quarantined
+            ],
+            headers=["PK", "Type", "Quarantined", "Seconds", "Error"],
+        )
+    )
+
+
+@quarantine.command()
+@click.argument("pks", type=click.INT, nargs=-1)
+@click.option(
+    "-y",
+    "--force-yes",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Do not ask for confirmation when retrying the quarantined Nodes.",
+)
+@click.option(
+    "-q",
+    "--silent",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Suppress informational output.",
+)
+@CHUNK_SIZE
+@NODE_TIMEOUT
+@NODE_MAX_MEMORY
+@click.pass_obj
+def retry(  # pylint: disable=too-many-arguments
+    obj: "AttributeDict",
+    pks: "Tuple[int]",
+    force_yes: bool,
+    silent: bool,
+    chunk_size: int,
+    node_timeout: float,
+    node_max_memory: int,
+):
+    """Release quarantined Nodes and calculate their OPTIMADE fields again.
+
+    PKS are the PKs of the Nodes to retry. By default, all quarantined Nodes are
+    retried. Nodes for which the fields still cannot be calculated are quarantined
+    again.
+    """
+    from aiida import load_profile
+    from aiida.cmdline.utils import echo
+
+    from aiida_optimade.cli.utils import set_calculation_limits
+
+    # The default aiida.cmdline loglevel inherit from aiida loglevel is REPORT
+    # Here we use INFO loglevel for the operations
+    echo.CMDLINE_LOGGER.setLevel("INFO")
+
+    try:
+        profile: str = obj.profile.name
+    except AttributeError:
+        profile = None
+    profile = load_profile(profile).name
+    set_calculation_limits(node_timeout, node_max_memory)
+
+    try:
+        with disable_logging():
+            from aiida_optimade.routers.structures import STRUCTURES
+
+        quarantined = [pk for pk, _, _ in STRUCTURES.quarantined()]
+        if pks:
+            unknown = sorted(set(pks) - set(quarantined))
+            if unknown and not silent:
+                echo.echo_warning(
+                    f"Not quarantined: {', '.join(str(_) for _ in unknown)}."
+                )
+            quarantined = sorted(set(pks) & set(quarantined))
+
+        if not quarantined:
+            if not silent:
+                echo.echo_info(f"No quarantined Nodes to retry in {profile!r}.")
+            return
+
+        if not force_yes:
+            click.confirm(
+                f"Are you sure you want to retry {len(quarantined)} quarantined Node"
+                f"{'' if len(quarantined) == 1 else 's'}?",
+                default=True,
+                abort=True,
+                show_default=True,
+            )
+
+        released = STRUCTURES.release_quarantined(quarantined)
+
+        STRUCTURES._extras_fields = STRUCTURES._all_extras_fields()
+        STRUCTURES._check_and_calculate_entities(
+            cli=not silent,
+            entries=[[pk] for pk in released],
+            chunk_size=chunk_size,
+        )
+        failed = sorted(set(released) & {pk for pk, _, _ in STRUCTURES.quarantined()})
+    except click.Abort:
+        echo.echo_warning("Aborted!")
+        return
+    except Exception as exc:  # pylint: disable=broad-except
+        import traceback
+
+        exception = traceback.format_exc()
+
+        LOGGER.error(
+            "Full exception from 'aiida-optimade quarantine retry' CLI:\n%s",
+            exception,
+        )
+        echo.echo_critical(
+            f"An exception happened while trying to retry the quarantined Nodes in "
+            f"{profile!r} (see log for more details):\n{exc!r}"
+        )
+
+    if not silent:
+        echo.echo_success(
+            f"Calculated the OPTIMADE fields for {len(released) - len(failed)} of "
+            f"{len(released)} released Node{'' if len(released) == 1 else 's'}."
+        )
+        if failed:
+            echo.echo_warning(
+                f"Quarantined again: {', '.join(str(_) for _ in failed)}. See "
+                "`aiida-optimade quarantine list` for the errors."
+            )
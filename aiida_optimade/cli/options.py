@@ -1,7 +1,92 @@
 import logging
 
+import click
+
 from aiida_optimade.cli.utils import get_aiida_profiles
 
 AIIDA_PROFILES = get_aiida_profiles()
 
 LOGGING_LEVELS = [logging.getLevelName(level).lower() for level in range(0, 51, 10)]
+
+WORKERS = click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help=(
+        "Number of processes to use for calculating the OPTIMADE fields (only used "
+        "when storing them as Node extras)."
+    ),
+)
+
+CHUNK_SIZE = click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=1_000,
+    show_default=True,
+    help=(
+        "Number of Nodes to retrieve, calculate, and store at a time. With several "
+        "workers, this is the number of Nodes handled per worker task."
+    ),
+)
+
+RESUME = click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help=(
+        "Continue an interrupted run from its checkpoint journal, i.e., only handle "
+        "Nodes after the last committed PK and Nodes in failed chunks."
+    ),
+)
+
+SINCE_PK = click.option(
+    "--since-pk",
+    type=str,
+    is_flag=False,
+    flag_value="last",
+    default=None,
+    metavar="[PK]",
+    help=(
+        "Only handle Nodes with a PK above PK. If PK is not given, use the largest PK "
+        "at the start of the last run."
+    ),
+)
+
+SINCE_MTIME = click.option(
+    "--since-mtime",
+    type=str,
+    is_flag=False,
+    flag_value="last",
+    default=None,
+    metavar="[DATETIME]",
+    help=(
+        "Only handle Nodes modified after DATETIME (ISO 8601 format). If DATETIME is "
+        "not given, use the start of the last run."
+    ),
+)
+
+NODE_TIMEOUT = click.option(
+    "--node-timeout",
+    type=click.FloatRange(min=0),
+    default=300.0,
+    show_default=True,
+    help=(
+        "Maximum time in seconds to spend parsing the file of a single CifData Node, "
+        "which is done in a separate process. Nodes exceeding it are quarantined. Set "
+        "to 0 for no limit."
+    ),
+)
+
+NODE_MAX_MEMORY = click.option(
+    "--node-max-memory",
+    type=click.IntRange(min=0),
+    default=4_096,
+    show_default=True,
+    help=(
+        "Maximum memory in MB that parsing the file of a single CifData Node may "
+        "allocate. Nodes exceeding it are quarantined. Set to 0 for no limit."
+    ),
+)
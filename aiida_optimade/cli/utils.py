@@ -1,10 +1,14 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
 
+import click
 from aiida.common.exceptions import ConfigurationError, MissingConfigurationError
 from aiida.manage.configuration import get_config
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import List
+    from typing import Any, Dict, List, Optional
+
+    from aiida_optimade.journal import Journal
 
 AIIDA_OPTIMADE_TEST_PROFILE = "aiida-optimade_test"
 
@@ -21,3 +25,86 @@ def get_aiida_profiles() -> "List[str]":
         return []
 
     return sorted([profile.name for profile in config.profiles])
+
+
+def set_calculation_limits(node_timeout: float, node_max_memory: int) -> None:
+    """Set the limits for calculating the OPTIMADE fields of a single Node
+
+    The limits are not set in the server configuration by default, since they are
+    applied by parsing the CIF files in a separate process.
+
+    Parameters:
+        node_timeout: Maximum time in seconds to spend parsing a CIF file. If 0, there
+            is no limit.
+        node_max_memory: Maximum memory in MB that parsing a CIF file may allocate.
+            If 0, there is no limit.
+
+    """
+    from aiida_optimade.config import CONFIG
+
+    CONFIG.node_calculation_timeout = node_timeout or None
+    CONFIG.node_calculation_max_memory = node_max_memory or None
+
+
+def get_journal_filters(
+    journal: "Journal",
+    resume: bool = False,
+    since_pk: "Optional[str]" = None,
+    since_mtime: "Optional[str]" = None,
+) -> "Optional[Dict[str, Any]]":
+    """Create QueryBuilder filters for the Nodes to handle based on the checkpoint
+    journal
+
+    Parameters:
+        journal: The checkpoint journal of the last run.
+        resume: Only handle Nodes after the last committed PK and in failed chunks.
+        since_pk: Only handle Nodes with a larger PK. If `"last"`, use the largest PK
+            at the start of the last run.
+        since_mtime: Only handle Nodes modified after this ISO 8601 datetime. If
+            `"last"`, use the start of the last run.
+
+    Returns:
+        The filters, or `None` if all Nodes should be handled.
+
+    """
+    if (resume or "last" in (since_pk, since_mtime)) and not journal.exists:
+        raise click.UsageError(
+            f"No journal of a previous run found at {journal.filename}."
+        )
+
+    filters = []
+    if resume and journal.last_pk is not None:
+        resume_filters = [{"id": {">": journal.last_pk}}]
+        if journal.failures:
+            resume_filters.append({"id": {"in": journal.failures}})
+        filters.append({"or": resume_filters})
+
+    if since_pk is not None:
+        if since_pk == "last":
+            if journal.max_pk is not None:
+                filters.append({"id": {">": journal.max_pk}})
+        else:
+            try:
+                filters.append({"id": {">": int(since_pk)}})
+            except ValueError as exc:
+                raise click.BadParameter(
+                    f"{since_pk!r} is not a valid PK.", param_hint="'--since-pk'"
+                ) from exc
+
+    if since_mtime is not None:
+        try:
+            mtime = (
+                journal.started
+                if since_mtime == "last"
+                else datetime.fromisoformat(since_mtime)
+            )
+        except ValueError as exc:
+            raise click.BadParameter(
+                f"{since_mtime!r} is not a valid ISO 8601 datetime.",
+                param_hint="'--since-mtime'",
+            ) from exc
+        if mtime.tzinfo is None:
+            mtime = mtime.astimezone()
+        filters.append({"mtime": {">": mtime}})
+
+    return {"and": filters} if filters else None
@@ -1,6 +1,14 @@
 # pylint: disable=undefined-variable
+from .cache import *  # noqa: F403
 from .exceptions import *  # noqa: F403
+from .limits import *  # noqa: F403
 from .logger import LOGGER  # noqa: F401
 from .warnings import *  # noqa: F403
 
-__all__ = ("LOGGER",) + exceptions.__all__ + warnings.__all__  # noqa: F405
+__all__ = (
+    ("LOGGER",)
+    + cache.__all__  # noqa: F405
+    + exceptions.__all__  # noqa: F405
+    + limits.__all__  # noqa: F405
+    + warnings.__all__  # noqa: F405
+)
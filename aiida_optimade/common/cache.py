@@ -0,0 +1,547 @@
+"""Caches used throughout AiiDA-OPTIMADE"""
+
+import gzip
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from aiida_optimade.common.logger import LOGGER
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, Hashable, Optional, Union
+
+__all__ = (
+    "LRUCache",
+    "SqliteCache",
+    "CountCache",
+    "ResponseCache",
+    "CachedResponse",
+    "normalize_cache_key",
+)
+
+_MISSING = object()
+
+
+def normalize_cache_key(value: "Any") -> str:
+    """Create a deterministic string representation of a (nested) value
+
+    Dictionaries are sorted by key, meaning two semantically equal filters will result
+    in the same key, independent of the order in which they were written.
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class LRUCache:
+    """Thread-safe in-process least-recently-used cache
+
+    Parameters:
+        maxsize: Maximum number of entries to keep.
+        ttl: Time-to-live in seconds for each entry. If `None`, entries never expire.
+
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: "Optional[float]" = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: "Hashable", default: "Any" = None) -> "Any":
+        """Retrieve the value for `key`, marking it as most recently used"""
+        with self._lock:
+            stored = self._data.get(key, _MISSING)
+            if stored is not _MISSING:
+                stored_at, value = stored
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: "Hashable", value: "Any") -> None:
+        """Store `value` for `key`, evicting the least recently used entries"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: "Hashable", default: "Any" = None) -> "Any":
+        """Remove `key` from the cache and return its value"""
+        with self._lock:
+            stored = self._data.pop(key, _MISSING)
+        return default if stored is _MISSING else stored[1]
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        """Cache statistics"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def __contains__(self, key: "Hashable") -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class SqliteCache:
+    """Key-value cache stored in a SQLite database file
+
+    Since SQLite handles locking of the database file, the cache can be shared by
+    several processes, e.g., multiple uvicorn workers.
+    Values MUST be JSON-serializable.
+
+    Parameters:
+        filename: Path to the SQLite database file. It will be created if it does not
+            exist.
+        table: Name of the table to use within the database file. This allows several
+            caches to share a single database file.
+        ttl: Time-to-live in seconds for each entry. If `None`, entries never expire.
+        maxsize: Maximum number of entries to keep. When storing an entry, expired
+            entries are removed, and, every `maxsize / 10` entries stored by this
+            instance, the oldest entries beyond `maxsize`.
+            If `None`, the number of entries is not bounded.
+
+    """
+
+    def __init__(
+        self,
+        filename: "Union[str, Path]",
+        table: str = "cache",
+        ttl: "Optional[float]" = None,
+        maxsize: "Optional[int]" = None,
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid SQLite table name: {table!r}")
+
+        self.filename = Path(filename).expanduser().resolve()
+        self.table = table
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+        self._local = threading.local()
+        self._sets = 0
+
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection as connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_stored_at "
+                f"ON {self.table} (stored_at)"
+            )
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """A SQLite connection for the current thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.filename), timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, default: "Any" = None) -> "Any":
+        """Retrieve the value for `key`"""
+        row = self._connection.execute(
+            f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return default
+        value, stored_at = row
+        if self.ttl is not None and time.time() - stored_at >= self.ttl:
+            self.pop(key)
+            return default
+        return json.loads(value)
+
+    def set(self, key: str, value: "Any") -> None:
+        """Store `value` for `key`, removing expired and the oldest excess entries
+
+        Entries are otherwise only removed when they are retrieved after expiring,
+        which never happens for keys that are not used again, e.g., since they embed
+        a database watermark.
+        """
+        now = time.time()
+        with self._connection as connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(value), now),
+            )
+            if self.ttl is not None:
+                connection.execute(
+                    f"DELETE FROM {self.table} WHERE stored_at <= ?",
+                    (now - self.ttl,),
+                )
+            self._sets += 1
+            if self.maxsize is not None and not self._sets % max(1, self.maxsize // 10):
+                connection.execute(
+                    f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM "
+                    f"{self.table} ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (max(self.maxsize, 1),),
+                )
+
+    def pop(self, key: str, default: "Any" = None) -> "Any":
+        """Remove `key` from the cache and return its value"""
+        row = self._connection.execute(
+            f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        with self._connection as connection:
+            connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        return default if row is None else json.loads(row[0])
+
+    def keys(self) -> list[str]:
+        """All keys currently in the cache"""
+        return [
+            row[0] for row in self._connection.execute(f"SELECT key FROM {self.table}")
+        ]
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._connection as connection:
+            connection.execute(f"DELETE FROM {self.table}")
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return self._connection.execute(
+            f"SELECT COUNT(*) FROM {self.table}"
+        ).fetchone()[0]
+
+
+class CountCache:
+    """Cache for the number of entries matching a query
+
+    The cache consists of an in-process `LRUCache` and, optionally, a `SqliteCache`
+    shared between processes.
+    Entries are keyed by the normalized query and a database "watermark", i.e., a
+    value that changes whenever entries are added, removed, or modified.
+    Hence, counts are invalidated at most `watermark_interval` seconds after the
+    database has changed.
+
+    Parameters:
+        maxsize: Maximum number of counts to keep in the in-process cache, as well as
+            in the SQLite database file.
+        ttl: Time-to-live in seconds for each count.
+        filename: Path to a SQLite database file for sharing counts across processes.
+            If `None`, counts are only cached in-process.
+        watermark: Function retrieving the current database watermark.
+            If `None`, counts are only invalidated through their time-to-live.
+        watermark_interval: Minimum time in seconds between retrievals of the database
+            watermark.
+
+    """
+
+    QUERY_KEYS = ("filters", "limit", "offset")
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: "Optional[float]" = None,
+        filename: "Optional[Union[str, Path]]" = None,
+        watermark: "Optional[Callable[[], Any]]" = None,
+        watermark_interval: float = 0.0,
+    ):
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared = (
+            SqliteCache(filename=filename, table="counts", ttl=ttl, maxsize=maxsize)
+            if filename
+            else None
+        )
+
+        self._watermark_func = watermark
+        self._watermark_interval = watermark_interval
+        self._watermark: "Any" = None
+        self._watermark_retrieved_at: "Optional[float]" = None
+        self._lock = threading.Lock()
+        # Locks for the counts currently being performed, with the number of threads
+        # waiting for each
+        self._counting: "dict[str, list[Any]]" = {}
+
+    @property
+    def watermark(self) -> "Any":
+        """The current database watermark, retrieved at most every
+        `watermark_interval` seconds."""
+        if self._watermark_func is None:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._watermark_retrieved_at is None
+                or now - self._watermark_retrieved_at >= self._watermark_interval
+            ):
+                self._watermark = self._watermark_func()
+                self._watermark_retrieved_at = now
+            return self._watermark
+
+    def key(self, criteria: dict) -> str:
+        """Create the cache key for the given query criteria
+
+        Only the criteria affecting the count are considered.
+        The `node_type` filter is disregarded, since it is always added for the
+        served entities.
+        """
+        filters = dict(criteria.get("filters") or {})
+        filters.pop("node_type", None)
+        return normalize_cache_key(
+            [
+                self.watermark,
+                filters,
+                criteria.get("limit", None),
+                criteria.get("offset", None) or None,
+            ]
+        )
+
+    def get(self, criteria: dict) -> "Optional[int]":
+        """Retrieve a cached count"""
+        key = self.key(criteria)
+        count = self.local.get(key)
+        if count is None and self.shared is not None:
+            count = self.shared.get(key)
+            if count is not None:
+                self.local.set(key, count)
+        return count
+
+    def set(self, criteria: dict, count: int) -> None:
+        """Store a count"""
+        key = self.key(criteria)
+        self.local.set(key, count)
+        if self.shared is not None:
+            self.shared.set(key, count)
+
+    def get_or_count(self, criteria: dict, counter: "Callable[[], int]") -> int:
+        """Retrieve a cached count or perform (and cache) the count using `counter`
+
+        Concurrent calls for the same criteria only perform the count once, the other
+        threads wait for and reuse its result.
+        """
+        criteria = {key: criteria.get(key, None) for key in self.QUERY_KEYS}
+        count = self.get(criteria)
+        if count is None:
+            lock_key = normalize_cache_key(criteria)
+            with self._lock:
+                lock = self._counting.setdefault(lock_key, [threading.Lock(), 0])
+                lock[1] += 1
+            try:
+                with lock[0]:
+                    count = self.get(criteria)
+                    if count is None:
+                        LOGGER.debug("Count cache miss for: %s", criteria)
+                        count = counter()
+                        self.set(criteria, count)
+                        return count
+            finally:
+                with self._lock:
+                    lock[1] -= 1
+                    if not lock[1]:
+                        del self._counting[lock_key]
+        LOGGER.debug("Count cache hit for: %s", criteria)
+        return count
+
+    def clear(self) -> None:
+        """Clear all counts and force the watermark to be retrieved anew"""
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+        with self._lock:
+            self._watermark = None
+            self._watermark_retrieved_at = None
+
+
+class CachedResponse:
+    """A serialized response stored in a `ResponseCache`
+
+    Parameters:
+        status_code: The HTTP status code.
+        headers: The raw HTTP headers, excluding `content-length`.
+        body: The response body.
+        watermark: The database watermark when the response was created.
+        compress: Whether or not to also store the gzip-compressed body.
+
+    """
+
+    __slots__ = ("status_code", "headers", "body", "gzip_body", "watermark", "created")
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: "list[tuple[bytes, bytes]]",
+        body: bytes,
+        watermark: "Any",
+        compress: bool = False,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.gzip_body = gzip.compress(body) if compress else None
+        self.watermark = watermark
+        self.created = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        """The number of bytes of the stored bodies"""
+        return len(self.body) + len(self.gzip_body or b"")
+
+    @property
+    def age(self) -> float:
+        """Time in seconds since the response was created"""
+        return time.monotonic() - self.created
+
+
+class ResponseCache:
+    """Thread-safe in-process least-recently-used cache of serialized responses
+
+    The cache is bounded by the total size of the stored bodies.
+    Responses are invalidated when the database watermark changes.
+    Responses older than `ttl` are stale, but may still be served for another
+    `stale_while_revalidate` seconds while they are being refreshed.
+
+    Parameters:
+        max_bytes: Maximum total size of the stored bodies.
+        ttl: Time in seconds a response is fresh. If `None`, responses are only
+            invalidated by a change of the database watermark.
+        stale_while_revalidate: Time in seconds a stale response may be served.
+        compress: Whether or not to also store gzip-compressed bodies.
+
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: "Optional[float]" = None,
+        stale_while_revalidate: float = 0.0,
+        compress: bool = False,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.compress = compress
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+        self._data: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._refreshing: "set[str]" = set()
+        self._lock = threading.RLock()
+
+    def get(
+        self, key: str, watermark: "Any"
+    ) -> "tuple[Optional[CachedResponse], bool]":
+        """Retrieve the response for `key`, marking it as most recently used
+
+        Returns:
+            The response (or `None`) and whether or not it is stale.
+
+        """
+        with self._lock:
+            entry = self._data.get(key, None)
+            if entry is not None:
+                age = entry.age
+                if entry.watermark != watermark or (
+                    self.ttl is not None
+                    and age >= self.ttl + self.stale_while_revalidate
+                ):
+                    self._remove(key)
+                else:
+                    self._data.move_to_end(key)
+                    stale = self.ttl is not None and age >= self.ttl
+                    if stale:
+                        self.stale_hits += 1
+                    else:
+                        self.hits += 1
+                    return entry, stale
+            self.misses += 1
+            return None, False
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        """Store `response` for `key`, evicting the least recently used responses"""
+        if response.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = response
+            self._size += response.size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._data)))
+
+    def start_refresh(self, key: str) -> bool:
+        """Mark `key` as being refreshed
+
+        Returns:
+            Whether or not the caller should refresh the response, i.e., `False` if
+            it is already being refreshed.
+
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def finish_refresh(self, key: str) -> None:
+        """Mark `key` as no longer being refreshed"""
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def _remove(self, key: str) -> None:
+        """Remove `key`, which must be in the cache (the lock must be held)"""
+        self._size -= self._data.pop(key).size
+
+    def clear(self) -> None:
+        """Remove all responses and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        """Cache statistics"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -1,9 +1,15 @@
+from optimade.exceptions import OptimadeHTTPException
+
 __all__ = (
     "AiidaOptimadeException",
     "AiidaEntityNotFound",
     "OptimadeIntegrityError",
     "CausationError",
     "AiidaError",
+    "FieldCalculationError",
+    "CalculationBudgetExceeded",
+    "CalculationLimitExceeded",
+    "ServiceUnavailable",
 )
 
 
@@ -31,3 +37,42 @@ class CausationError(AiidaOptimadeException):
 
 class AiidaError(AiidaOptimadeException):
     """Error related to AiiDA data or information."""
+
+
+class FieldCalculationError(AiidaOptimadeException):
+    """The OPTIMADE fields could not be calculated for some AiiDA entities."""
+
+
+class CalculationBudgetExceeded(AiidaOptimadeException):
+    """The budget for calculating OPTIMADE fields was exceeded.
+
+    Parameters:
+        calculated: The number of entities for which the fields were calculated.
+        remaining: The number of entities for which the fields were not calculated.
+        seconds: The time spent calculating.
+
+    """
+
+    def __init__(self, calculated: int, remaining: int, seconds: float):
+        super().__init__(
+            f"Calculated OPTIMADE fields for {calculated} entities in {seconds:.2f} s, "
+            f"but {remaining} entities remain."
+        )
+        self.calculated = calculated
+        self.remaining = remaining
+        self.seconds = seconds
+
+
+class CalculationLimitExceeded(AiidaOptimadeException):
+    """The time or memory limit for calculating the OPTIMADE fields of a single
+    AiiDA entity was exceeded."""
+
+
+class ServiceUnavailable(OptimadeHTTPException):
+    """503 Service Unavailable
+
+    Use the `Retry-After` header to tell the client when to try again.
+    """
+
+    status_code: int = 503
+    title: str = "Service Unavailable"
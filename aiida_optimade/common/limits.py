@@ -0,0 +1,146 @@
+"""Run expensive calculations under a time and memory limit"""
+
+import multiprocessing
+import os
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+from aiida_optimade.common.exceptions import CalculationLimitExceeded
+
+if TYPE_CHECKING:  # pragma: no cover
+    from multiprocessing.connection import Connection
+    from typing import Any, Callable, Optional
+
+__all__ = ("run_with_limits",)
+
+
+def _memory_in_use() -> int:
+    """The virtual memory size of the current process in bytes, or 0 if unknown"""
+    try:
+        with open("/proc/self/statm", encoding="utf8") as handle:
+            pages = int(handle.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _limit_memory(max_memory: int) -> None:
+    """Limit the memory the current process may allocate to `max_memory` MB more than
+    it currently uses
+
+    The limit is not applied on platforms without the `resource` module.
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return
+
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = _memory_in_use() + max_memory * 1024**2
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _run_limited(
+    connection: "Connection",
+    max_memory: "Optional[int]",
+    func: "Callable[..., Any]",
+    args: tuple,
+    kwargs: dict,
+) -> None:
+    """Run `func` in the child process and send the outcome to the parent process"""
+    if max_memory is not None:
+        _limit_memory(max_memory)
+    try:
+        outcome = (True, func(*args, **kwargs))
+    except MemoryError:
+        outcome = (
+            False,
+            CalculationLimitExceeded(f"Exceeded the memory limit of {max_memory} MB."),
+        )
+    except Exception as exc:  # pylint: disable=broad-except
+        outcome = (False, exc)
+
+    try:
+        connection.send(outcome)
+    except Exception as exc:  # pylint: disable=broad-except
+        # E.g., an exception that cannot be pickled
+        connection.send((False, RuntimeError(repr(exc))))
+    finally:
+        connection.close()
+
+
+def run_with_limits(
+    func: "Callable[..., Any]",
+    *args: "Any",
+    timeout: "Optional[float]" = None,
+    max_memory: "Optional[int]" = None,
+    **kwargs: "Any",
+) -> "Any":
+    """Call `func(*args, **kwargs)` in a separate process under a time and memory
+    limit
+
+    The process is killed when the time limit is exceeded, meaning `func` cannot
+    stall the calling process.
+    If no limit is given, `func` is called in the calling process.
+    `func`, its arguments, and its return value must be picklable, and `func` must be
+    importable from its module.
+
+    Parameters:
+        func: The function to call.
+        timeout: The maximum time in seconds to wait for the result.
+        max_memory: The maximum memory in MB that `func` may allocate.
+
+    Returns:
+        The return value of `func`.
+
+    Raises:
+        CalculationLimitExceeded: If a limit is exceeded, or the process died without
+            returning a result.
+
+    Any exception raised by `func` is raised again in the calling process.
+
+    """
+    if timeout is None and max_memory is None:
+        return func(*args, **kwargs)
+
+    # Forking is much faster than spawning a new interpreter, and the child process
+    # never uses the database connections of the parent process. However, forking a
+    # process running other threads (e.g., a server) may copy locks held by them, so
+    # the child is then forked from a single-threaded server process instead.
+    if not sys.platform.startswith("linux"):
+        context = multiprocessing.get_context("spawn")
+    elif threading.active_count() > 1:
+        context = multiprocessing.get_context("forkserver")
+    else:
+        context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_limited,
+        args=(sender, max_memory, func, args, kwargs),
+        daemon=True,
+    )
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise CalculationLimitExceeded(f"Exceeded the time limit of {timeout} s.")
+        try:
+            success, outcome = receiver.recv()
+        except EOFError as exc:
+            process.join()
+            raise CalculationLimitExceeded(
+                f"The calculation process died (exit code {process.exitcode}), e.g., "
+                "since it exceeded the memory limit."
+            ) from exc
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+
+    if success:
+        return outcome
+    raise outcome
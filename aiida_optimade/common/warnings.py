@@ -1,6 +1,6 @@
 from optimade.server.warnings import OptimadeWarning
 
-__all__ = ("AiidaOptimadeWarning", "NotImplementedWarning")
+__all__ = ("AiidaOptimadeWarning", "NotImplementedWarning", "FieldsNotCalculated")
 
 
 class AiidaOptimadeWarning(OptimadeWarning):
@@ -13,3 +13,10 @@ class AiidaOptimadeWarning(OptimadeWarning):
 
 class NotImplementedWarning(AiidaOptimadeWarning):
     """A feature is not implemented."""
+
+
+class FieldsNotCalculated(AiidaOptimadeWarning):
+    """OPTIMADE fields could not be calculated for all entities within the budget.
+
+    The returned data may be incomplete.
+    """
@@ -1,4 +1,5 @@
-from typing import Optional
+from pathlib import Path
+from typing import Literal, Optional
 
 from optimade.server.config import ServerConfig
 from pydantic import Field
@@ -9,6 +10,174 @@ class CustomServerConfig(ServerConfig):
         None,
         description="The AiiDA Group containing the data that will be served, allowing one to serve a curated set of data from a given database.",
     )
+    count_cache_size: int = Field(
+        128,
+        description="Maximum number of entry counts (one per normalized filter) to keep in the in-process count cache, as well as in `count_cache_file`. Expired counts and the oldest counts beyond this number are removed from the file whenever a count is stored.",
+    )
+    count_cache_ttl: Optional[float] = Field(
+        3600.0,
+        description="Time-to-live in seconds for cached entry counts. Set to `null` to only invalidate counts when the database changes.",
+    )
+    count_cache_file: Optional[Path] = Field(
+        None,
+        description="Path to a SQLite database file used to share cached entry counts between server processes, e.g., several uvicorn workers. Set to `null` to only cache counts in-process.",
+    )
+    count_cache_watermark_interval: float = Field(
+        5.0,
+        description="Minimum time in seconds between checks of the database for new or modified entries, which invalidates cached entry counts.",
+    )
+    filter_cache_size: int = Field(
+        1024,
+        description="Maximum number of parsed and transformed `filter` values to keep in the in-process filter cache. Set to 0 to disable the cache.",
+    )
+    optimize_filters: bool = Field(
+        True,
+        description="Rewrite the transformed `filter` values into equivalent, more index-friendly QueryBuilder filters: nested boolean operators are flattened and deduplicated, equalities of the same field combined with OR become a single `in`, and LENGTH comparisons of `elements` and the site lists become comparisons of `nelements` and `nsites`.",
+    )
+    entry_cache_size: int = Field(
+        0,
+        description="Maximum number of mapped entries to keep in the in-process cache of the `/structures/{entry_id}` endpoint, keyed by PK and modification time. Each cache lookup costs a query for the modification time of the Node, but saves retrieving and mapping its OPTIMADE fields. Set to 0 to disable the cache.",
+    )
+    structures_table: bool = Field(
+        False,
+        description="Query the OPTIMADE structure fields from a dedicated, typed, and indexed table (materialized by `aiida-optimade init`) instead of from the JSONB Node extras. Filters and sorting that cannot be expressed in terms of the table's columns fall back to querying the Node extras.",
+    )
+
+    content_cache_size: int = Field(
+        1_000,
+        description="Maximum number of distinct Node contents (e.g., the kinds, sites, and cell of a StructureData Node, or the MD5 checksum of a CifData Node) for which to keep the calculated OPTIMADE fields, so they are reused for other Nodes with the same content instead of being calculated again. Each entry holds all calculated fields of a Node, including its site positions. Set to 0 to calculate the fields for every Node.",
+    )
+
+    content_cache_file_size: int = Field(
+        100_000,
+        description="Maximum number of distinct Node contents for which to also keep the calculated OPTIMADE fields (see `content_cache_size`) in a SQLite database file in the `logs` folder, so they are reused by all processes, e.g., several uvicorn workers, the `--workers` of `aiida-optimade init`, and later runs of `aiida-optimade init` and `aiida-optimade calc`. Set to 0 to only keep them in-process.",
+    )
+
+    cif_cache: bool = Field(
+        True,
+        description="Keep the structures parsed from the files of CifData Nodes (keyed by the MD5 checksum of the file and the parser parameters) in a SQLite database file in the `logs` folder, so each CIF file is parsed only once, also across runs of `aiida-optimade init` and `aiida-optimade calc`.",
+    )
+
+    node_calculation_timeout: Optional[float] = Field(
+        None,
+        description="Maximum time in seconds the server may spend parsing the file of a single CifData Node. The file is then parsed in a separate process, which is stopped when the limit is exceeded. The Node is then quarantined: its OPTIMADE fields are not calculated again until it is released with `aiida-optimade quarantine retry`. Set to `null` to parse the files in the server process without a time limit. The `aiida-optimade init`, `calc`, and `quarantine retry` commands use their `--node-timeout` option instead.",
+    )
+    node_calculation_max_memory: Optional[int] = Field(
+        None,
+        description="Maximum memory in MB that parsing the file of a single CifData Node may allocate in the server. The file is then parsed in a separate process, and the Node is quarantined if the limit is exceeded (see `node_calculation_timeout`). Set to `null` for no memory limit. The `aiida-optimade init`, `calc`, and `quarantine retry` commands use their `--node-max-memory` option instead.",
+    )
+
+    background_indexer: bool = Field(
+        False,
+        description="Calculate the OPTIMADE fields of new or modified Nodes in a background thread of the server, instead of while handling a request filtering on these fields. Only used when storing the OPTIMADE fields in the Node extras.",
+    )
+    background_indexer_interval: float = Field(
+        60.0,
+        description="Time in seconds between the passes of the background indexer, each checking the database for Nodes added or modified since the last pass.",
+    )
+    background_indexer_chunk_size: int = Field(
+        1000,
+        description="Number of Nodes for which the background indexer calculates and stores the OPTIMADE fields at a time.",
+    )
+    request_time_calculation: bool = Field(
+        True,
+        description="Calculate missing OPTIMADE fields while handling a request filtering on these fields. If disabled, Nodes that are missing the fields (e.g., since the background indexer has not yet handled them) do not match such filters.",
+    )
+
+    request_time_calculation_max_nodes: Optional[int] = Field(
+        None,
+        description="Maximum number of Nodes to calculate missing OPTIMADE fields for while handling a single request. Set to `null` for no limit.",
+    )
+    request_time_calculation_max_seconds: Optional[float] = Field(
+        10.0,
+        description="Maximum time in seconds to spend calculating missing OPTIMADE fields while handling a single request. The calculation stops after the chunk of Nodes during which the time runs out. Set to `null` for no limit.",
+    )
+    request_time_calculation_chunk_size: int = Field(
+        100,
+        description="Number of Nodes to calculate and store the OPTIMADE fields for at a time while handling a request.",
+    )
+    request_time_calculation_exceeded: Literal["partial", "unavailable"] = Field(
+        "partial",
+        description="What to do if the request-time calculation budget is exceeded: `partial` responds with the Nodes that currently match the filter and a warning, while `unavailable` responds with 503 Service Unavailable and a `Retry-After` header. In both cases, the calculated fields are stored and the calculation continues with the next request.",
+    )
+
+    db_pool_size: int = Field(
+        5,
+        description="Number of connections to keep open in the SQLAlchemy connection pool of the AiiDA profile storage.",
+    )
+    db_pool_max_overflow: int = Field(
+        10,
+        description="Number of connections the SQLAlchemy connection pool may open beyond `db_pool_size` under load.",
+    )
+    db_pool_recycle: Optional[int] = Field(
+        None,
+        description="Time in seconds after which a pooled connection is replaced, e.g., to stay below the idle timeout of the database server or a proxy. Set to `null` to never replace connections.",
+    )
+    db_pool_pre_ping: bool = Field(
+        False,
+        description="Test pooled connections before using them, replacing connections that have been closed by the database server.",
+    )
+    db_executor_workers: Optional[int] = Field(
+        None,
+        description="Number of threads running the database work of requests, each reusing its AiiDA session between requests. Defaults to the size of the connection pool (`db_pool_size + db_pool_max_overflow`).",
+    )
+
+    trusted_serialization: bool = Field(
+        False,
+        description="Serialize the entries of the `/structures` endpoints directly from the mapped database entries, skipping their (repeated) validation against the pydantic models. The OPTIMADE fields stored by AiiDA-OPTIMADE are trusted to be valid.",
+    )
+    trusted_serialization_validation_rate: float = Field(
+        0.01,
+        ge=0,
+        le=1,
+        description="Fraction of requests that are still fully validated when `trusted_serialization` is enabled, to catch schema regressions.",
+    )
+
+    conditional_requests: bool = Field(
+        True,
+        description="Add `ETag` headers to the responses of the `/structures` endpoints, and respond to matching `If-None-Match` requests with 304 Not Modified without querying the entries. The `ETag` changes whenever the served entries are added, removed, or modified (checked at most every `count_cache_watermark_interval` seconds).",
+    )
+    cache_control: str = Field(
+        "public, no-cache",
+        description="The `Cache-Control` header of the responses of the `/structures` endpoints, when `conditional_requests` is enabled. The default lets clients and proxies store responses, but revalidate them on every use.",
+    )
+
+    response_cache: bool = Field(
+        False,
+        description="Serve repeated requests to the `/structures` endpoints from an in-process cache of serialized responses, keyed by the normalized URL (sorted query parameters and canonical filter). Cached responses are invalidated when the served entries are added, removed, or modified (checked at most every `count_cache_watermark_interval` seconds).",
+    )
+    response_cache_max_bytes: int = Field(
+        64 * 1024**2,
+        description="Maximum total size in bytes of the cached response bodies (including compressed bodies).",
+    )
+    response_cache_ttl: Optional[float] = Field(
+        300.0,
+        description="Time in seconds a cached response is served without being refreshed. Set to `null` to only invalidate responses when the database changes.",
+    )
+    response_cache_stale_while_revalidate: float = Field(
+        60.0,
+        description="Time in seconds after `response_cache_ttl` during which a cached response is still served, while it is refreshed in the background.",
+    )
+    response_cache_compress: bool = Field(
+        False,
+        description="Also store gzip-compressed response bodies, which are served to clients accepting the gzip content encoding.",
+    )
+
+    streaming_page_limit: Optional[int] = Field(
+        None,
+        gt=0,
+        description="Stream the responses of the `/structures` endpoint for requests with a `page_limit` of at least this value, retrieving, mapping, and serializing the entries in batches of `streaming_batch_size`, so the memory used does not depend on the page size. Set to `null` to never stream responses.",
+    )
+    streaming_batch_size: int = Field(
+        100,
+        gt=0,
+        description="Number of entries to retrieve from the database and send to the client at a time when streaming responses.",
+    )
+
+    float_storage: Literal["hex", "native"] = Field(
+        "hex",
+        description="How to store the float-valued OPTIMADE fields (`lattice_vectors`, `cartesian_site_positions`, and `elements_ratios`) in the Node extras: `hex` stores them as hex strings, while `native` stores them as JSON numbers, which are smaller, need no decoding when responding, and can be compared numerically in filters. Run `aiida-optimade migrate-floats` to convert existing extras before changing this setting.",
+    )
 
 
 CONFIG: ServerConfig = CustomServerConfig()
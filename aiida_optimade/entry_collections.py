@@ -1,25 +1,128 @@
+import copy
+import json
+import math
+import threading
+import time
 import warnings
-from typing import Any, Optional, Union
+from contextlib import nullcontext
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence, Union
 
+from aiida.common import timezone
+from aiida.manage.manager import get_manager
 from aiida.orm import Group
+from aiida.orm.entities import EntityTypes
 from aiida.orm.nodes import Node
 from aiida.orm.querybuilder import QueryBuilder
 from optimade.models import EntryResource
-from optimade.server.entry_collections import EntryCollection
+from optimade.server.config import CONFIG as OPTIMADE_CONFIG
+from optimade.server.config import SupportedBackend
+from optimade.server.entry_collections import EntryCollection, PaginationMechanism
 from optimade.server.exceptions import BadRequest, NotFound
 from optimade.server.query_params import EntryListingQueryParams, SingleEntryQueryParams
-from optimade.server.warnings import UnknownProviderProperty
+from optimade.server.warnings import QueryParamNotUsed, UnknownProviderProperty
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
 from tqdm import tqdm
 
-from aiida_optimade.common import CausationError
-from aiida_optimade.common.logger import LOGGER
-from aiida_optimade.mappers import ResourceMapper
-from aiida_optimade.transformers import AiidaTransformer
+from aiida_optimade import __version__
+from aiida_optimade.common import (
+    CalculationBudgetExceeded,
+    CausationError,
+    CountCache,
+    FieldCalculationError,
+    FieldsNotCalculated,
+    LRUCache,
+    ServiceUnavailable,
+    SqliteCache,
+    normalize_cache_key,
+)
+from aiida_optimade.common.logger import LOGGER, LOGS_DIR
+from aiida_optimade.config import CONFIG
+from aiida_optimade.journal import Journal
+from aiida_optimade.mappers import ResourceMapper, RowPlan
+from aiida_optimade.tables import StructuresTable, UnsupportedQuery
+from aiida_optimade.transformers import AiidaTransformer, FilterOptimizer
+from aiida_optimade.translators.entities import AiidaEntityTranslator
+from aiida_optimade.translators.utils import store_floats
 from aiida_optimade.utils import retrieve_queryable_properties
 
+if TYPE_CHECKING:  # pragma: no cover
+    from aiida.orm.implementation import StorageBackend
+
+
+# Calculated OPTIMADE fields by Node content, shared by all processes, see
+# `_get_content_cache()`
+CONTENT_CACHE_FILE = LOGS_DIR.joinpath("content_cache.sqlite")
+_CONTENT_CACHE: Optional[SqliteCache] = None
+
+
+def _get_content_cache() -> Optional[SqliteCache]:
+    """The cache of calculated OPTIMADE fields shared by all processes, or `None` if
+    it is disabled"""
+    global _CONTENT_CACHE  # pylint: disable=global-statement
+    if CONFIG.content_cache_size <= 0 or CONFIG.content_cache_file_size <= 0:
+        return None
+    if _CONTENT_CACHE is None:
+        _CONTENT_CACHE = SqliteCache(
+            filename=CONTENT_CACHE_FILE,
+            table="content_fields",
+            maxsize=CONFIG.content_cache_file_size,
+        )
+    return _CONTENT_CACHE
+
+
+def content_cache_key(
+    node_type: str,
+    content_hash: str,
+    fields: set[str],
+    content_version: Optional[dict[str, Any]] = None,
+) -> str:
+    """The key of the OPTIMADE `fields` calculated for a Node with `content_hash`
+
+    The key includes the AiiDA-OPTIMADE version, the float storage, and the
+    `content_version` of the translator (see `AiidaEntityTranslator.content_version()`),
+    since the calculated fields may differ between these.
+    """
+    return normalize_cache_key(
+        {
+            "node_type": node_type,
+            "content": content_hash,
+            "content_version": content_version or {},
+            "fields": sorted(fields),
+            "version": __version__,
+            "float_storage": CONFIG.float_storage,
+        }
+    )
+
+
+class QueryContext:
+    """The state of a single query on an `AiidaCollection`
+
+    A new context is created for every query, and is only accessible from the thread
+    handling the query, see `AiidaCollection.context`.
+    """
+
+    def __init__(self):
+        self.filters: Optional[dict[str, Any]] = None
+        self.extras_fields: set[str] = set()
+        self.data_available: Optional[int] = None
+        self.data_returned: Optional[int] = None
+        self.page_cursors: Optional[dict[str, Optional[str]]] = None
+        self.more_data_available: Optional[bool] = None
+        # Whether or not all entries matching the filter could be considered, i.e.,
+        # no OPTIMADE fields needed for the filter were left uncalculated
+        self.complete: bool = True
+
 
 class AiidaCollection(EntryCollection):
-    """Collection of AiiDA entities"""
+    """Collection of AiiDA entities
+
+    A single collection serves all requests for its endpoint, which are handled
+    concurrently by FastAPI's threadpool.
+    The state of a query is therefore kept in a `QueryContext` per thread, while the
+    caches shared by all queries are guarded by locks.
+    """
 
     CAST_MAPPING = {
         "string": "t",
@@ -29,29 +132,76 @@ class AiidaCollection(EntryCollection):
         "date-time": "d",
     }
 
+    # Node columns that are never null and can therefore be used for keyset
+    # (value-based) pagination through `page_above` and `page_below`.
+    KEYSET_COLUMNS = {"id", "uuid", "mtime", "ctime"}
+
+    # Bounds in seconds of the `Retry-After` header sent when the request-time
+    # calculation budget is exceeded, see `_retry_after()`
+    RETRY_AFTER_BOUNDS = (5, 3600)
+
+    pagination_mechanism = PaginationMechanism("page_above")
+
     def __init__(
         self,
         entities: Union[str, list[str]],
         group: Optional[str],
         resource_cls: EntryResource,
         resource_mapper: ResourceMapper,
+        table: Optional[type[StructuresTable]] = None,
     ):
         super().__init__(
             resource_cls=resource_cls,
             resource_mapper=resource_mapper,
-            transformer=AiidaTransformer(mapper=resource_mapper),
+            transformer=AiidaTransformer(
+                mapper=resource_mapper,
+                native_floats=CONFIG.float_storage == "native",
+            ),
+        )
+
+        self.optimizer = FilterOptimizer(
+            length_aliases={
+                resource_mapper.get_backend_field(field): (
+                    resource_mapper.get_backend_field(alias)
+                )
+                for field, alias in resource_mapper.all_length_aliases()
+            }
         )
 
         self.entities = entities if isinstance(entities, list) else [entities]
         self.group = group
+        self.table = (
+            table(
+                entities=self.entities,
+                group=self.group,
+                project_prefix=self.resource_mapper.PROJECT_PREFIX,
+            )
+            if table
+            else None
+        )
+
+        self._local = threading.local()
 
-        # "Cache"
+        # Caches shared by all queries
+        self._lock = threading.Lock()
+        self._calculation_lock = threading.Lock()
+        self._table_lock = threading.Lock()
         self._data_available: int = None
-        self._data_returned: int = None
-        self._extras_fields: set[str] = None
-        self._latest_filter: dict[str, Any] = None
-        self._count: dict[str, Any] = None
         self._checked_extras_filter_fields: set = set()
+        self._count_cache = CountCache(
+            maxsize=CONFIG.count_cache_size,
+            ttl=CONFIG.count_cache_ttl,
+            filename=CONFIG.count_cache_file,
+            watermark=self._get_watermark,
+            watermark_interval=CONFIG.count_cache_watermark_interval,
+        )
+        self._filter_cache = LRUCache(maxsize=CONFIG.filter_cache_size)
+        self._entry_cache = LRUCache(maxsize=CONFIG.entry_cache_size)
+        # Calculated OPTIMADE fields by Node content, see `_calculate_attributes()`
+        self._content_cache = LRUCache(maxsize=CONFIG.content_cache_size)
+        self._content_cache_hits = 0
+        self._table_exists: bool = None
+        self._table_watermark: Any = None
 
         self._all_fields: set[str] = None
 
@@ -61,55 +211,109 @@ class AiidaCollection(EntryCollection):
             self._all_fields = super().all_fields
         return self._all_fields
 
+    @property
+    def context(self) -> QueryContext:
+        """The context of the latest query handled by the current thread"""
+        context = getattr(self._local, "context", None)
+        if context is None:
+            context = self._local.context = QueryContext()
+        return context
+
+    def _new_context(self) -> QueryContext:
+        """Start a new query context for the current thread"""
+        self._local.context = QueryContext()
+        return self._local.context
+
+    @property
+    def _extras_fields(self) -> set[str]:
+        """The fields stored in the Node extras used by the current query"""
+        return self.context.extras_fields
+
+    @_extras_fields.setter
+    def _extras_fields(self, value: set[str]) -> None:
+        self.context.extras_fields = value
+
+    @property
+    def watermark(self) -> list[Any]:
+        """The number of served entities, their highest PK, and their latest
+        modification time
+
+        The value is retrieved at most every `count_cache_watermark_interval` seconds.
+        """
+        return self._count_cache.watermark
+
+    def entry_exists(self, entry_id: int) -> bool:
+        """Whether or not the entry with PK `entry_id` is served"""
+        return bool(self._find_all(filters={"id": {"==": entry_id}}, project=["id"]))
+
     @property
     def data_available(self) -> int:
         """Get amount of data available under endpoint"""
-        if self._data_available is None:
+        if self.context.data_available is None:
             raise CausationError(
                 "data_available MUST be set before it can be retrieved."
             )
-        return self._data_available
+        return self.context.data_available
 
     def set_data_available(self):
-        """Set _data_available if it has not yet been set"""
-        if not self._data_available:
+        """Set data_available, re-counting only if the database has changed"""
+        data_available = self.count()
+        if data_available != self._data_available:
             LOGGER.debug("Setting data_available!")
-            self._data_available = self.count()
+            self._data_available = data_available
+        self.context.data_available = data_available
 
     @property
     def data_returned(self) -> int:
         """Get amount of data returned for query"""
-        if self._data_returned is None:
+        if self.context.data_returned is None:
             raise CausationError(
                 "data_returned MUST be set before it can be retrieved."
             )
-        return self._data_returned
+        return self.context.data_returned
+
+    @property
+    def page_cursors(self) -> Optional[dict[str, Optional[str]]]:
+        """Get the `page_below` ("prev") and `page_above` ("next") values for the
+        latest query.
+
+        This is `None` if the latest query cannot be paginated by value, e.g., when
+        sorting on a field that is not a (non-nullable) Node column.
+        """
+        return self.context.page_cursors
 
     def set_data_returned(self, **criteria):
-        """Set _data_returned if it has not yet been set or new filter does not equal
-        latest filter.
+        """Set data_returned for the filter in `criteria`"""
+        for key in ["limit", "offset"]:
+            criteria.pop(key, None)
+        LOGGER.debug(
+            "Setting data_returned using filter: %s", criteria.get("filters", {})
+        )
+        self.context.data_returned = self.count(**criteria)
+
+    def _set_data_returned_from_page(self, data_returned: int, **criteria) -> None:
+        """Set data_returned from the result of a page query that reached the end of
+        the matching entries.
 
-        NB! Nested lists in filters are not accounted for.
+        The count cache is updated as well, so that subsequent count requests using
+        the same filter will not result in a new QueryBuilder call.
         """
-        if self._data_returned is None or (
-            self._latest_filter is not None
-            and criteria.get("filters", {}) != self._latest_filter
-        ):
-            for key in ["limit", "offset"]:
-                if key in list(criteria.keys()):
-                    del criteria[key]
-            self._latest_filter = criteria.get("filters", {}).copy()
-            LOGGER.debug("Setting data_returned using filter: %s", self._latest_filter)
-            self._data_returned = self.count(**criteria)
+        LOGGER.debug("Setting data_returned from page query: %d", data_returned)
+        self.context.data_returned = data_returned
+        self._count_cache.set({"filters": criteria.get("filters", {})}, data_returned)
 
     def _clear_cache(self) -> None:
-        """Clear in-memory attributes cache"""
-        self._data_available: int = None
-        self._data_returned: int = None
-        self._extras_fields: set = None
-        self._latest_filter: dict = None
-        self._count: dict = None
-        self._checked_extras_filter_fields: set = set()
+        """Clear in-memory attributes cache
+
+        Only the query context of the current thread is reset.
+        """
+        self._new_context()
+        with self._lock:
+            self._data_available: int = None
+            self._checked_extras_filter_fields: set = set()
+        self._count_cache.clear()
+        self._table_exists: bool = None
+        self._table_watermark: Any = None
 
     def __len__(self) -> int:
         return self.data_available
@@ -121,78 +325,306 @@ class AiidaCollection(EntryCollection):
 
     def count(self, **kwargs) -> int:
         LOGGER.debug("Calling count function in EntryCollection.")
-        if self._count is None:
-            LOGGER.debug("self._count is None")
-            self._count = {
-                "count": self._perform_count(**kwargs),
-                "filters": kwargs.get("filters", {}),
-                "limit": kwargs.get("limit", None),
-                "offset": kwargs.get("offset", None),
-            }
+        return self._count_cache.get_or_count(
+            kwargs, lambda: self._perform_count(**kwargs)
+        )
+
+    def find(  # pylint: disable=too-many-branches
+        self,
+        params: Union[EntryListingQueryParams, SingleEntryQueryParams],
+        validate: bool = True,
+    ) -> tuple[
+        Union[list[EntryResource], EntryResource, dict[str, Any], None],
+        int,
+        bool,
+        set[str],
+        set[str],
+    ]:
+        """Perform the query on the collection, see `EntryCollection.find()`
+
+        Parameters:
+            params: The query parameters of the request.
+            validate: Whether or not to validate the results by deserializing them
+                into `resource_cls` instances. If `False`, the results are the
+                (trusted) dictionaries mapped back by the resource mapper.
+
+        """
+        context = self._new_context()
+        criteria, keyset, response_fields = self._start_query(params)
+        single_entry = isinstance(params, SingleEntryQueryParams)
+
+        results, more_data_available = self._run_db_query(
+            criteria=criteria, single_entry=single_entry, keyset=keyset
+        )
+
+        context.page_cursors = (
+            None
+            if single_entry
+            else self._get_page_cursors(
+                results,
+                criteria,
+                keyset=keyset,
+                more_data_available=more_data_available,
+            )
+        )
+        if keyset and keyset["below"]:
+            # The sentinel entry lies before the page, while the entries after the
+            # page are known to exist, since they include the `page_below` entry.
+            more_data_available = True
+
+        offset = criteria.get("offset", 0) or 0
+        if not keyset and not more_data_available and (results or not offset):
+            # The page query reached the end of the matching entries, meaning the total
+            # number of matching entries is known without performing a COUNT query.
+            self._set_data_returned_from_page(offset + len(results), **criteria)
         else:
-            for limiting_param in {"filters", "limit", "offset"}:
-                if kwargs.get(limiting_param, None) != self._count.get(
-                    limiting_param, None
-                ):
-                    if limiting_param == "filters":
-                        # As the `node_type` field is added to the filters in
-                        # `_prepare_query()`, this will make sure to check the *actual*
-                        # requested filter fields.
-                        count_copy = self._count.get(limiting_param, {}).copy()
-                        kwargs_copy = kwargs.get(limiting_param, {}).copy()
-                        count_copy.pop("node_type", None)
-                        kwargs_copy.pop("node_type", None)
-                        if kwargs_copy == count_copy:
-                            continue
-                    elif limiting_param == "offset":
-                        if not kwargs.get(limiting_param, None) and not self._count.get(
-                            limiting_param, None
-                        ):
-                            # This will check also if offset in either is set to 0.
-                            # There is no difference if the default page_offset is
-                            # requested.
-                            continue
-                    LOGGER.debug(
-                        "%s was not the same as was found in self._count:\n"
-                        "self._count[%s] = %s\nkwargs[%s] = %s",
-                        limiting_param,
-                        limiting_param,
-                        self._count.get(limiting_param, None),
-                        limiting_param,
-                        kwargs.get(limiting_param, None),
-                    )
-                    self._count = {
-                        "count": self._perform_count(**kwargs),
-                        "filters": kwargs.get("filters", {}),
-                        "limit": kwargs.get("limit", None),
-                        "offset": kwargs.get("offset", None),
-                    }
-                    break
-            else:
-                LOGGER.debug("Using self._count")
+            self.set_data_returned(**criteria)
 
-        return self._count.get("count", 0)
+        if single_entry:
+            if len(results) > 1:
+                raise NotFound(
+                    detail=f"Instead of a single entry, {len(results)} entries were "
+                    "found",
+                )
 
-    def find(  # pylint: disable=too-many-branches
-        self, params: Union[EntryListingQueryParams, SingleEntryQueryParams]
+            results = results[0] if results else None
+
+        include_fields = self._check_response_fields(response_fields)
+
+        if results:
+            plan = self.resource_mapper.row_plan(tuple(criteria["project"]))
+            results = (
+                self._map_back(results, plan, validate)
+                if single_entry
+                else [self._map_back(row, plan, validate) for row in results]
+            )
+
+        return (
+            results,
+            self.data_returned,
+            more_data_available,
+            self.all_fields - response_fields,
+            include_fields,
+        )
+
+    def find_by_id(
+        self,
+        entry_id: int,
+        params: SingleEntryQueryParams,
+        validate: bool = True,
     ) -> tuple[
-        Union[list[EntryResource], EntryResource, None], int, bool, set[str], set[str]
+        Union[EntryResource, dict[str, Any], None], int, bool, set[str], set[str]
     ]:
+        """Retrieve the entry with PK `entry_id`, see `find()`
+
+        Unlike `find()` with an `id` filter, no filter is parsed, no OPTIMADE fields
+        are calculated, and the matching entries are not counted.
+        The entry is retrieved with a single query by PK, which also checks the Node
+        type and Group membership.
+
+        Parameters:
+            entry_id: The PK of the Node.
+            params: The query parameters of the request.
+            validate: See `find()`.
+
+        """
+        context = self._new_context()
         self.set_data_available()
 
         criteria = self.handle_query_params(params)
-        single_entry = isinstance(params, SingleEntryQueryParams)
         response_fields = criteria.pop("fields", set())
+        include_fields = self._check_response_fields(response_fields)
+
+        entry = self._get_entry(entry_id, criteria["project"])
+        context.data_returned = 0 if entry is None else 1
+        if entry is not None and validate:
+            entry = self.resource_mapper.ENTRY_RESOURCE_CLASS(**entry)
+
+        return (
+            entry,
+            self.data_returned,
+            False,
+            self.all_fields - response_fields,
+            include_fields,
+        )
+
+    def _get_entry(self, pk: int, project: list[str]) -> Optional[dict[str, Any]]:
+        """Retrieve the trusted mapped entry with PK `pk`
 
-        if criteria.get("filters", {}) and self._extras_fields:
-            for requested_extras_field in self._extras_fields:
+        If `entry_cache_size` is non-zero, the mapped entries are cached by PK,
+        modification time, and projection.
+
+        Returns:
+            The trusted mapped entry (see `_map_back()`), or `None` if there is no
+            such entry.
+
+        """
+        key = None
+        if self._entry_cache.maxsize > 0:
+            found = self._find_all(filters={"id": {"==": pk}}, project=["mtime"])
+            if not found:
+                return None
+            key = (pk, found[0][0], tuple(project))
+            entry = self._entry_cache.get(key, None)
+            if entry is not None:
+                return copy.deepcopy(entry)
+
+        found = self._find_all(filters={"id": {"==": pk}}, project=project)
+        if not found:
+            return None
+        entry = self._map_back(
+            found[0], self.resource_mapper.row_plan(tuple(project)), validate=False
+        )
+        if key is not None:
+            self._entry_cache.set(key, copy.deepcopy(entry))
+        return entry
+
+    def iterfind(
+        self,
+        params: EntryListingQueryParams,
+        validate: bool = True,
+        batch_size: int = 100,
+    ) -> tuple[Iterator[Union[EntryResource, dict[str, Any]]], set[str], set[str]]:
+        """Perform the query on the collection, iterating over the results
+
+        Unlike `find()`, the entries are retrieved in batches of `batch_size` using a
+        server-side cursor, and each entry is mapped (and validated) as it is
+        retrieved, so the memory used does not depend on the page size.
+        Only entries retrieved with `page_below` are collected, since they are
+        retrieved in reverse order.
+
+        The query is prepared when calling this method, raising any errors for
+        invalid parameters.
+        Once the iterator is exhausted, `data_returned`, `page_cursors`, and
+        `more_data_available` of the query context are set.
+        Since AiiDA's SQLAlchemy session is scoped to the thread, the iterator must be
+        consumed in the thread calling this method.
+
+        Parameters:
+            params: The query parameters of the request.
+            validate: See `find()`.
+            batch_size: The number of entries to retrieve from the database at a time.
+
+        Returns:
+            An iterator over the entries, the fields to exclude from the entries, and
+            the fields to include in the entries.
+
+        """
+        self._new_context()
+        criteria, keyset, response_fields = self._start_query(params)
+        include_fields = self._check_response_fields(response_fields)
+        return (
+            self._iter_results(criteria, keyset, validate, batch_size),
+            self.all_fields - response_fields,
+            include_fields,
+        )
+
+    def _iter_results(
+        self,
+        criteria: dict[str, Any],
+        keyset: Optional[dict[str, Any]],
+        validate: bool,
+        batch_size: int,
+    ) -> Iterator[Union[EntryResource, dict[str, Any]]]:
+        """Iterate over the mapped entries of a query, see `iterfind()`"""
+        context = self.context
+        limit = criteria.get("limit", None)
+
+        query_criteria = criteria.copy()
+        if keyset:
+            query_criteria.update(self._keyset_criteria(criteria, **keyset))
+        if limit:
+            # Retrieve a single sentinel entry beyond the requested page, see
+            # `_run_db_query()`
+            query_criteria["limit"] = limit + 1
+
+        entities = self._iter_all_from_table(batch_size, **query_criteria)
+        if entities is None:
+            entities = self._iter_all(batch_size, **query_criteria)
+
+        more_data_available = False
+        if keyset and keyset["below"]:
+            # The entries are retrieved in reverse order
+            entities = list(entities)
+            if limit and len(entities) > limit:
+                more_data_available = True
+                del entities[limit:]
+            entities.reverse()
+
+        plan = self.resource_mapper.row_plan(tuple(criteria["project"]))
+        first = last = None
+        nresults = 0
+        for row in entities:
+            if limit and nresults == limit:
+                more_data_available = True
+                break
+            if first is None:
+                first = row
+            last = row
+            nresults += 1
+            yield self._map_back(row, plan, validate)
+
+        context.page_cursors = self._get_page_cursors(
+            [first, last] if nresults else [],
+            criteria,
+            keyset=keyset,
+            more_data_available=more_data_available,
+        )
+        if keyset and keyset["below"]:
+            more_data_available = True
+
+        offset = criteria.get("offset", 0) or 0
+        if not keyset and not more_data_available and (nresults or not offset):
+            self._set_data_returned_from_page(offset + nresults, **criteria)
+        else:
+            self.set_data_returned(**criteria)
+        context.more_data_available = more_data_available
+
+    def _start_query(
+        self, params: Union[EntryListingQueryParams, SingleEntryQueryParams]
+    ) -> tuple[dict[str, Any], Optional[dict[str, Any]], set[str]]:
+        """Prepare the query for `params` in the current query context
+
+        The materialized table is synced (for Nodes with calculated OPTIMADE fields)
+        and OPTIMADE fields needed for the filter are calculated, if necessary.
+
+        Returns:
+            The query criteria, the decoded `page_above` or `page_below` value (see
+            `_parse_page_cursor()`), and the requested response fields.
+
+        """
+        context = self.context
+
+        if self._use_table():
+            watermark = self.watermark
+            if watermark != self._table_watermark:
+                with self._table_lock:
+                    # The table may have been synced by a concurrent query
+                    if watermark != self._table_watermark:
+                        # Calculating the OPTIMADE fields of new Nodes is left to
+                        # `aiida-optimade init` and the background indexer, so the
+                        # lock is only held for writing rows
+                        self.sync_table(calculate=False)
+                        self._table_watermark = watermark
+
+        self.set_data_available()
+
+        criteria = self.handle_query_params(params)
+        response_fields = criteria.pop("fields", set())
+        keyset = criteria.pop("keyset", None)
+
+        if (
+            CONFIG.request_time_calculation
+            and criteria.get("filters", {})
+            and context.extras_fields
+        ):
+            for requested_extras_field in context.extras_fields:
                 if requested_extras_field not in self._checked_extras_filter_fields:
                     LOGGER.debug(
                         "Checking all extras fields have been calculated (and possibly "
                         "calculate them)."
                     )
-                    self._check_and_calculate_entities()
-                    self._checked_extras_filter_fields |= self._extras_fields
+                    self._calculate_within_budget()
                     break
             else:
                 LOGGER.debug(
@@ -201,24 +633,21 @@ class AiidaCollection(EntryCollection):
         else:
             LOGGER.debug(
                 "Not checking extras fields. No filter and/or no extras fields "
-                "requested."
+                "requested, or request-time calculation is disabled."
             )
 
-        self.set_data_returned(**criteria)
+        return criteria, keyset, response_fields
 
-        results, more_data_available = self._run_db_query(
-            criteria=criteria, single_entry=single_entry
-        )
+    def _check_response_fields(self, response_fields: set[str]) -> set[str]:
+        """Check the requested response fields are known
 
-        if single_entry:
-            if len(results) > 1:
-                raise NotFound(
-                    detail=f"Instead of a single entry, {len(results)} entries were "
-                    "found",
-                )
+        Returns:
+            The requested fields that are not top-level fields.
 
-            results = results[0] if results else None
+        Raises:
+            BadRequest: If unknown OPTIMADE fields are requested.
 
+        """
         include_fields = (
             response_fields - self.resource_mapper.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
         )
@@ -254,46 +683,219 @@ class AiidaCollection(EntryCollection):
                 )
             )
 
-        if results:
-            results = self.resource_mapper.deserialize(results)
+        return include_fields
 
-        return (
-            results,
-            self.data_returned,
-            more_data_available,
-            self.all_fields - response_fields,
-            include_fields,
-        )
+    def _map_back(
+        self, row: Sequence[Any], plan: RowPlan, validate: bool
+    ) -> Union[EntryResource, dict[str, Any]]:
+        """Map a raw QueryBuilder row back to OPTIMADE
+
+        Parameters:
+            row: The projected values.
+            plan: The row-mapping plan of the projection, see
+                `ResourceMapper.row_plan()`.
+            validate: Whether or not to deserialize the entry into a `resource_cls`
+                instance. If `False`, the (trusted) mapped dictionary is returned.
+                The only coercion done by the model for mapped entries is of the PK
+                to a string `id`, which is therefore done here.
+
+        """
+        entry = self.resource_mapper.map_back_row(row, plan)
+        if validate:
+            return self.resource_mapper.ENTRY_RESOURCE_CLASS(**entry)
+        entry["id"] = str(entry["id"])
+        return entry
 
     def _run_db_query(
-        self, criteria: dict[str, Any], single_entry: bool = False
-    ) -> tuple[list[dict[str, Any]], bool]:
+        self,
+        criteria: dict[str, Any],
+        single_entry: bool = False,
+        keyset: Optional[dict[str, Any]] = None,
+    ) -> tuple[list[Sequence[Any]], bool]:
         """Run the query on the backend and collect the results.
 
         Arguments:
             criteria: A dictionary representation of the query parameters.
             single_entry: Whether or not the caller is expecting a single entry
                 response.
+            keyset: The decoded `page_above` or `page_below` value, see
+                `_parse_page_cursor()`.
 
         Returns:
-            The list of entries from the database (without any re-mapping) and a
-            boolean for whether or not there is more data available.
+            The list of rows from the database (the values projected in
+            `criteria["project"]`, without any re-mapping) and a boolean for whether
+            or not there is more data available (in the paging direction).
 
         """
-        results = []
-        for entity in self._find_all(**criteria):
-            results.append(dict(zip(criteria["project"], entity)))
+        limit = criteria.get("limit", None)
 
-        if single_entry:
+        query_criteria = criteria.copy()
+        if keyset:
+            query_criteria.update(self._keyset_criteria(criteria, **keyset))
+        if limit and not single_entry:
+            # Retrieve a single sentinel entry beyond the requested page to determine
+            # `more_data_available` without having to perform a COUNT query.
+            query_criteria["limit"] = limit + 1
+
+        results = self._find_all_from_table(**query_criteria)
+        if results is None:
+            results = self._find_all(**query_criteria)
+
+        if single_entry or not limit:
             more_data_available = False
         else:
-            criteria_copy = criteria.copy()
-            criteria_copy.pop("limit", None)
-            offset = criteria_copy.pop("offset", 0)
-            more_data_available = len(results) < (self.count(**criteria_copy) - offset)
+            more_data_available = len(results) > limit
+            del results[limit:]
+
+        if keyset and keyset["below"]:
+            # The entries were retrieved in reverse order
+            results.reverse()
 
         return results, more_data_available
 
+    def _keyset_fields(
+        self, order_by: Optional[list[dict[str, dict[str, str]]]]
+    ) -> Optional[list[tuple[str, str]]]:
+        """Determine the fields and directions defining the position of an entry for
+        keyset pagination.
+
+        The `id` is always included as the final tie-breaker.
+
+        Returns:
+            A list of `(backend field, direction)` tuples, or `None` if any of the sort
+            fields cannot be used for keyset pagination.
+
+        """
+        fields = []
+        for sort_field in order_by or []:
+            field, spec = next(iter(sort_field.items()))
+            if field not in self.KEYSET_COLUMNS:
+                return None
+            fields.append((field, spec.get("order", "asc")))
+        if "id" not in {field for field, _ in fields}:
+            fields.append(("id", "asc"))
+        return fields
+
+    def _parse_page_cursor(
+        self, cursor: str, order_by: Optional[list[dict[str, dict[str, str]]]]
+    ) -> list[Any]:
+        """Decode a `page_above` or `page_below` value.
+
+        Without a `sort`, the value is the `id` of an entry.
+        Otherwise, the value is a JSON array of the entry's values for the sort fields
+        followed by its `id`.
+
+        Raises:
+            BadRequest: If the value is invalid or the sort fields do not support
+                keyset pagination.
+
+        """
+        fields = self._keyset_fields(order_by)
+        if fields is None:
+            raise BadRequest(
+                detail="`page_above` and `page_below` are only supported when sorting "
+                "on the fields: id, immutable_id, last_modified, and _aiida_ctime."
+            )
+
+        try:
+            values = [int(cursor)] if len(fields) == 1 else json.loads(cursor)
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError(f"Expected {len(fields)} values")
+            for index, (field, _) in enumerate(fields):
+                if field == "id":
+                    values[index] = int(values[index])
+                elif field in ("mtime", "ctime"):
+                    values[index] = datetime.fromisoformat(values[index])
+                elif not isinstance(values[index], str):
+                    raise ValueError(f"Expected a string for {field!r}")
+        except (TypeError, ValueError) as exc:
+            raise BadRequest(
+                detail=f"Invalid `page_above`/`page_below` value {cursor!r}: {exc}"
+            ) from exc
+
+        return values
+
+    def _keyset_criteria(
+        self, criteria: dict[str, Any], values: list[Any], below: bool
+    ) -> dict[str, Any]:
+        """Create the filters and ordering retrieving the entries following (or
+        preceding, if `below` is `True`) the entry positioned at `values`.
+
+        The filter is the usual expansion of a row-value comparison, e.g., for
+        `sort=-last_modified`:
+        `mtime < value OR (mtime == value AND id > value)`.
+        """
+        fields = self._keyset_fields(criteria.get("order_by"))
+        if below:
+            fields = [
+                (field, "desc" if order == "asc" else "asc") for field, order in fields
+            ]
+
+        conditions = []
+        for index, (field, order) in enumerate(fields):
+            condition = [{fields[_][0]: {"==": values[_]}} for _ in range(index)]
+            condition.append({field: {">" if order == "asc" else "<": values[index]}})
+            conditions.append(
+                {"and": condition} if len(condition) > 1 else condition[0]
+            )
+        keyset_filter = {"or": conditions} if len(conditions) > 1 else conditions[0]
+
+        filters = criteria.get("filters", {})
+        return {
+            "filters": {"and": [filters, keyset_filter]} if filters else keyset_filter,
+            "order_by": [{field: {"order": order}} for field, order in fields],
+            "offset": None,
+        }
+
+    def _get_page_cursors(
+        self,
+        results: list[Sequence[Any]],
+        criteria: dict[str, Any],
+        keyset: Optional[dict[str, Any]],
+        more_data_available: bool,
+    ) -> Optional[dict[str, Optional[str]]]:
+        """Determine the `page_below` ("prev") and `page_above` ("next") values for
+        the pages neighbouring `results`, the rows projected in `criteria["project"]`.
+
+        Returns:
+            A dictionary with the keys `"prev"` and `"next"`, or `None` if the query
+            cannot be paginated by value.
+
+        """
+        fields = self._keyset_fields(criteria.get("order_by"))
+        if fields is None or criteria.get("offset"):
+            return None
+
+        project = criteria["project"]
+
+        def _encode(row: Sequence[Any]) -> Optional[str]:
+            values = []
+            for field, _ in fields:
+                value = row[project.index(field)] if field in project else None
+                if value is None:
+                    return None
+                if isinstance(value, datetime):
+                    value = value.isoformat()
+                elif not isinstance(value, int):
+                    value = str(value)
+                values.append(value)
+            return str(values[0]) if len(fields) == 1 else json.dumps(values)
+
+        cursors = {"prev": None, "next": None}
+        if not results:
+            return cursors
+
+        if keyset and keyset["below"]:
+            cursors["next"] = _encode(results[-1])
+            if more_data_available:
+                cursors["prev"] = _encode(results[0])
+        else:
+            if keyset:
+                cursors["prev"] = _encode(results[0])
+            if more_data_available:
+                cursors["next"] = _encode(results[-1])
+        return cursors
+
     @staticmethod
     def _prepare_query(
         node_types: list[str], group: Optional[str] = None, **kwargs
@@ -307,7 +909,9 @@ class AiidaCollection(EntryCollection):
                 )
 
         filters = kwargs.get("filters", {})
-        filters["node_type"] = {"or": [{"==": node_type} for node_type in node_types]}
+        filters["node_type"] = (
+            {"in": node_types} if len(node_types) > 1 else {"==": node_types[0]}
+        )
         order_by = kwargs.get("order_by", None)
         order_by = {Node: order_by} if order_by else {Node: {"id": "asc"}}
         limit = kwargs.get("limit", None)
@@ -334,8 +938,236 @@ class AiidaCollection(EntryCollection):
         del query
         return res
 
+    def _use_table(self) -> bool:
+        """Whether or not to query the materialized table"""
+        if self.table is None:
+            return False
+        if self._table_exists is None:
+            self._table_exists = self.table.exists()
+            if not self._table_exists:
+                LOGGER.warning(
+                    "The %s table does not exist, querying the Node extras instead. "
+                    "Run `aiida-optimade init` to create it.",
+                    self.table.table.name,
+                )
+        return self._table_exists
+
+    def _find_all_from_table(self, **kwargs) -> Optional[list]:
+        """Execute the query using the materialized table, if possible.
+
+        The PKs of the matching Nodes are retrieved from the table, while the
+        projected values are retrieved with a QueryBuilder query for these PKs.
+
+        Returns:
+            All results, or `None` if the query cannot be run using the table.
+
+        """
+        project = kwargs.get("project", [])
+        if (
+            not self._use_table()
+            or not isinstance(project, list)
+            or "id" not in project
+        ):
+            return None
+
+        pks = self._find_ids_from_table(**kwargs)
+        if pks is None:
+            return None
+        return self._find_all_by_ids(pks, project)
+
+    def _find_ids_from_table(self, **kwargs) -> Optional[list[int]]:
+        """Retrieve the PKs of the matching Nodes from the materialized table
+
+        Returns:
+            The PKs, or `None` if the query cannot be run using the table.
+
+        """
+        try:
+            return self.table.find_ids(
+                filters=kwargs.get("filters", None),
+                order_by=kwargs.get("order_by", None),
+                limit=kwargs.get("limit", None),
+                offset=kwargs.get("offset", None),
+            )
+        except UnsupportedQuery as exc:
+            LOGGER.debug("Not using the %s table: %s", self.table.table.name, exc)
+            return None
+
+    def _find_all_by_ids(self, pks: list[int], project: list[str]) -> list:
+        """Retrieve the projected values of the Nodes `pks`, in the order of `pks`"""
+        if not pks:
+            return []
+        id_index = project.index("id")
+        entities = {
+            entity[id_index]: entity
+            for entity in self._find_all(filters={"id": {"in": pks}}, project=project)
+        }
+        return [entities[pk] for pk in pks if pk in entities]
+
+    def _iter_all(self, batch_size: int, **kwargs) -> Iterator[list]:
+        """Execute AiiDA QueryBuilder query, iterating over the results in batches"""
+        LOGGER.debug(
+            "Using QueryBuilder to iterate over projected values from found entries."
+        )
+        query = self._prepare_query(self.entities, self.group, **kwargs)
+        yield from query.iterall(batch_size=batch_size)
+
+    def _iter_all_from_table(
+        self, batch_size: int, **kwargs
+    ) -> Optional[Iterator[list]]:
+        """Execute the query using the materialized table, if possible, iterating over
+        the results in batches
+
+        See `_find_all_from_table()`.
+
+        Returns:
+            An iterator over all results, or `None` if the query cannot be run using
+            the table.
+
+        """
+        project = kwargs.get("project", [])
+        if (
+            not self._use_table()
+            or not isinstance(project, list)
+            or "id" not in project
+        ):
+            return None
+
+        pks = self._find_ids_from_table(**kwargs)
+        if pks is None:
+            return None
+        return (
+            entity
+            for start in range(0, len(pks), batch_size)
+            for entity in self._find_all_by_ids(
+                pks[start : start + batch_size], project
+            )
+        )
+
+    def _all_extras_fields(self) -> set[str]:
+        """All fields stored in the Node extras"""
+        prefix = self.resource_mapper.PROJECT_PREFIX
+        return {
+            self.resource_mapper.get_backend_field(field)[len(prefix) :]
+            for field in self.resource_mapper.ALL_ATTRIBUTES
+            if self.resource_mapper.get_backend_field(field).startswith(prefix)
+        }
+
+    def sync_table(
+        self,
+        table: Optional[StructuresTable] = None,
+        cli: bool = False,
+        chunk_size: int = 10_000,
+        calculate: bool = True,
+    ) -> list[int]:
+        """Write the missing and outdated rows of the materialized table
+
+        Since the rows are built from the Node extras, missing OPTIMADE extras are
+        calculated first.
+        Otherwise, only the rows of Nodes for which all OPTIMADE extras have already
+        been calculated are written.
+        The other Nodes are written once their extras have been calculated, e.g., by
+        `aiida-optimade init` or the background indexer, which updates their
+        modification time.
+
+        Parameters:
+            table: The materialized table. Defaults to the collection's table.
+            cli: Whether or not this method is run through the CLI.
+            chunk_size: The maximum number of rows to write at a time.
+            calculate: Whether or not to calculate missing OPTIMADE extras.
+
+        Returns:
+            The PKs of the Nodes for which rows were written.
+
+        """
+        table = table or self.table
+        node_pks = table.outdated_node_ids()
+        if not node_pks:
+            LOGGER.debug("The %s table is up to date.", table.table.name)
+            return []
+
+        extras_key = self.resource_mapper.PROJECT_PREFIX.rstrip(".")
+        if calculate:
+            extras_fields = self._extras_fields
+            self._extras_fields = self._all_extras_fields()
+            try:
+                self._check_and_calculate_entities(cli=cli)
+            finally:
+                self._extras_fields = extras_fields
+            calculated_filters = {}
+        else:
+            calculated_filters = {
+                extras_key: {
+                    "and": [
+                        {"has_key": field}
+                        for field in sorted(self._all_extras_fields())
+                    ]
+                }
+            }
+
+        written = []
+        chunks = range(0, len(node_pks), chunk_size)
+        if cli:
+            chunks = tqdm(chunks, desc=f"Writing {table.table.name!r}", leave=False)
+        for start in chunks:
+            rows = [
+                {"node_id": pk, "node_mtime": mtime, **(optimade or {})}
+                for pk, mtime, optimade in self._find_all(
+                    filters={
+                        "id": {"in": node_pks[start : start + chunk_size]},
+                        **calculated_filters,
+                    },
+                    project=["id", "mtime", extras_key],
+                )
+            ]
+            table.upsert(rows)
+            written.extend(row["node_id"] for row in rows)
+        if len(written) < len(node_pks):
+            LOGGER.debug(
+                "Not writing the rows of %d Nodes in table %s, since their OPTIMADE "
+                "fields have not yet been calculated.",
+                len(node_pks) - len(written),
+                table.table.name,
+            )
+        return written
+
+    def _get_watermark(self) -> list[Any]:
+        """Retrieve a value that changes whenever served entities are added, removed,
+        or modified.
+
+        The watermark consists of the number of entities, the highest PK, and the
+        latest modification time.
+        """
+        LOGGER.debug("Retrieving database watermark.")
+        query = QueryBuilder()
+        filters = {"node_type": {"in": self.entities}}
+        project = [
+            {"id": {"func": "count"}},
+            {"id": {"func": "max"}},
+            {"mtime": {"func": "max"}},
+        ]
+        if self.group:
+            query.append(Group, filters={"label": self.group}, tag="group")
+            query.append(Node, with_group="group", filters=filters, project=project)
+        else:
+            query.append(Node, filters=filters, project=project)
+        res = query.first()
+        del query
+        return list(res) if res else []
+
     def _perform_count(self, **kwargs) -> int:
         """Instantiate new QueryBuilder object and perform count()"""
+        if self._use_table():
+            try:
+                count = self.table.count(filters=kwargs.get("filters", None))
+            except UnsupportedQuery as exc:
+                LOGGER.debug("Not using the %s table: %s", self.table.table.name, exc)
+            else:
+                count = max(count - (kwargs.get("offset", None) or 0), 0)
+                if kwargs.get("limit", None) is not None:
+                    count = min(count, kwargs["limit"])
+                return count
+
         LOGGER.debug("Using QueryBuilder to COUNT all found entries.")
         query = self._prepare_query(self.entities, self.group, **kwargs)
         res = query.count()
@@ -360,17 +1192,26 @@ class AiidaCollection(EntryCollection):
             A dictionary representation of the query parameters.
 
         """
-        cursor_kwargs: dict = super().handle_query_params(params)
+        # Let the parent method skip the filter, which is transformed (and cached) by
+        # `transform_filter()` instead
+        optimade_filter = getattr(params, "filter", None)
+        if optimade_filter:
+            params.filter = None
+        try:
+            cursor_kwargs: dict = super().handle_query_params(params)
+        finally:
+            if optimade_filter:
+                params.filter = optimade_filter
 
         # Remove Mongo-specific fields introduced in the parent method
         cursor_kwargs.get("projection", {}).pop("_id", None)
 
         # filter
-        if cursor_kwargs.get("filter", False):
-            cursor_kwargs["filters"] = cursor_kwargs.pop("filter")
+        cursor_kwargs.pop("filter", None)
+        if optimade_filter:
+            cursor_kwargs["filters"] = self.transform_filter(optimade_filter)
+            self.context.filters = cursor_kwargs["filters"]
             self._find_extras_fields(cursor_kwargs["filters"])
-        else:
-            cursor_kwargs.pop("filter", None)
 
         # response_fields
         cursor_kwargs["project"] = list(cursor_kwargs.pop("projection", {}).keys())
@@ -378,13 +1219,62 @@ class AiidaCollection(EntryCollection):
         # sort
         if cursor_kwargs.get("sort", False):
             cursor_kwargs["order_by"] = cursor_kwargs.pop("sort")
+            if "id" not in {
+                field
+                for sort_field in cursor_kwargs["order_by"]
+                for field in sort_field
+            }:
+                # Use the `id` as tie-breaker to ensure a deterministic order
+                cursor_kwargs["order_by"].append({"id": {"order": "asc"}})
 
         # page_offset
         if "skip" in cursor_kwargs:
             cursor_kwargs["offset"] = cursor_kwargs.pop("skip")
 
+        # page_above and page_below
+        page_above = cursor_kwargs.pop("page_above", None)
+        page_below = getattr(params, "page_below", None)
+        if isinstance(page_below, str) and ("offset" in cursor_kwargs or page_above):
+            warnings.warn(
+                message="Multiple pagination keys were provided, not using "
+                "'page_below'.",
+                category=QueryParamNotUsed,
+            )
+            page_below = None
+        if page_above is not None or isinstance(page_below, str):
+            cursor_kwargs["keyset"] = {
+                "values": self._parse_page_cursor(
+                    page_above if page_above is not None else page_below,
+                    cursor_kwargs.get("order_by"),
+                ),
+                "below": page_above is None,
+            }
+
         return cursor_kwargs
 
+    def transform_filter(self, optimade_filter: str) -> dict[str, Any]:
+        """Parse and transform an OPTIMADE filter into QueryBuilder filters
+
+        Unless disabled (`optimize_filters`), the transformed filters are rewritten
+        into an equivalent, more index-friendly form, see `FilterOptimizer`.
+        The transformed filters are kept in an LRU cache (`filter_cache_size`), and a
+        copy is returned, since the filters are modified when building a query.
+        Filters on properties treated as UNKNOWN are not cached, since transforming
+        them may emit a warning.
+
+        Raises:
+            BadRequest: If the filter cannot be parsed.
+
+        """
+        filters = self._filter_cache.get(optimade_filter, None)
+        if filters is None:
+            filters = self.transformer.transform(self.parser.parse(optimade_filter))
+            if CONFIG.optimize_filters:
+                filters = self.optimizer.optimize(filters)
+            if AiidaTransformer.UNKNOWN_PROPERTY not in normalize_cache_key(filters):
+                self._filter_cache.set(optimade_filter, filters)
+        return copy.deepcopy(filters)
+
     def parse_sort_params(self, sort_params: str) -> list[dict[str, dict[str, str]]]:
         """Handles any sort parameters passed to the collection,
         resolving aliases and dealing with any invalid fields.
@@ -440,6 +1330,8 @@ class AiidaCollection(EntryCollection):
         """
         from copy import deepcopy
 
+        extras_fields = set()
+
         def __filter_fields_util(  # pylint: disable=unused-private-member
             _filters: Union[dict, list]
         ) -> Union[dict, list]:
@@ -451,11 +1343,11 @@ class AiidaCollection(EntryCollection):
                         if isinstance(value, (dict, list))
                         else value
                     )
-                self._extras_fields |= {
+                extras_fields.update(
                     key[len(self.resource_mapper.PROJECT_PREFIX) :]
                     for key in _filters
                     if key.startswith(self.resource_mapper.PROJECT_PREFIX)
-                }
+                )
             elif isinstance(_filters, list):
                 res = [
                     (
@@ -471,25 +1363,125 @@ class AiidaCollection(EntryCollection):
                 )
             return res
 
-        self._extras_fields = set()
         __filter_fields_util(deepcopy(filters))
+        self._extras_fields = extras_fields
+
+    def _calculate_within_budget(self) -> None:
+        """Calculate missing OPTIMADE fields while handling a request
+
+        The calculation is bounded by the request-time calculation budget in the
+        server configuration.
+        Only one query calculates fields at a time, so concurrent queries for the same
+        fields do not calculate (and store) them for the same Nodes.
+
+        Raises:
+            ServiceUnavailable: If the budget is exceeded and the server is
+                configured to respond with 503 Service Unavailable.
+
+        """
+        with self._calculation_lock:
+            if self._extras_fields <= self._checked_extras_filter_fields:
+                LOGGER.debug(
+                    "Not checking extras fields. Fields have been checked by a "
+                    "concurrent query."
+                )
+                return
+            try:
+                self._check_and_calculate_entities(
+                    chunk_size=CONFIG.request_time_calculation_chunk_size,
+                    max_nodes=CONFIG.request_time_calculation_max_nodes,
+                    max_seconds=CONFIG.request_time_calculation_max_seconds,
+                )
+            except CalculationBudgetExceeded as exc:
+                LOGGER.info("Request-time calculation budget exceeded: %s", exc)
+                if CONFIG.request_time_calculation_exceeded == "unavailable":
+                    raise ServiceUnavailable(
+                        detail=(
+                            "The server is calculating OPTIMADE fields needed for the "
+                            f"filter ({exc.remaining} entities remain). Please try "
+                            "again later."
+                        ),
+                        headers={"Retry-After": str(self._retry_after(exc))},
+                    ) from exc
+                self.context.complete = False
+                warnings.warn(
+                    FieldsNotCalculated(
+                        detail=(
+                            "The OPTIMADE fields needed for the filter have not yet "
+                            f"been calculated for {exc.remaining} entities, which are "
+                            "therefore not included in the results. The fields will "
+                            "be calculated when handling subsequent requests."
+                        )
+                    )
+                )
+            else:
+                with self._lock:
+                    self._checked_extras_filter_fields = (
+                        self._checked_extras_filter_fields | self._extras_fields
+                    )
+
+    def _retry_after(self, exc: CalculationBudgetExceeded) -> int:
+        """Estimate the time in seconds until the fields of the remaining Nodes have
+        been calculated
+
+        The estimate is the number of remaining Nodes times the time per Node
+        measured while exceeding the budget.
+        If no Node was calculated, the background indexer interval (if enabled) or
+        the request-time calculation time budget is used instead.
+        The estimate is bounded by `RETRY_AFTER_BOUNDS`.
+        """
+        if exc.calculated:
+            estimate = exc.remaining * exc.seconds / exc.calculated
+        elif CONFIG.background_indexer:
+            estimate = CONFIG.background_indexer_interval
+        else:
+            estimate = CONFIG.request_time_calculation_max_seconds or 0
+        minimum, maximum = self.RETRY_AFTER_BOUNDS
+        return min(max(minimum, math.ceil(estimate)), maximum)
 
     def _check_and_calculate_entities(
-        self, cli: bool = False, entries: list[list[int]] = None
+        self,
+        cli: bool = False,
+        entries: list[list[int]] = None,
+        chunk_size: int = 1_000,
+        workers: int = 1,
+        filters: Optional[dict[str, Any]] = None,
+        journal: Optional[Journal] = None,
+        max_nodes: Optional[int] = None,
+        max_seconds: Optional[float] = None,
     ) -> list[int]:
         """Check all entities have OPTIMADE extras, else calculate them
 
         For a bit of optimization, we only care about a field if it has specifically
         been queried for using "filter".
+        Quarantined Nodes (see `_calculate_chunk()`) are not checked, unless they are
+        passed as `entries`.
 
         Parameters:
             cli: Whether or not this method is run through the CLI.
             entries: AiiDA Node PKs.
+            chunk_size: The number of Nodes to retrieve, calculate, and update at a
+                time when storing the OPTIMADE fields in the Node extras.
+            workers: The number of processes to use for calculating the OPTIMADE
+                fields when storing them in the Node extras.
+            filters: Additional QueryBuilder filters restricting the Nodes to check,
+                e.g., to Nodes with a PK above a certain value.
+            journal: A checkpoint journal to record the progress in, when storing the
+                OPTIMADE fields in the Node extras.
+            max_nodes: The maximum number of Nodes to calculate the fields for, when
+                storing them in the Node extras in a single process.
+            max_seconds: The maximum time to spend calculating the fields (checked
+                after each chunk), when storing them in the Node extras in a single
+                process.
 
         Returns:
             A list of the Node PKs representing the Nodes that were necessary to
             calculate the given fields for.
 
+        Raises:
+            CalculationBudgetExceeded: If `max_nodes` or `max_seconds` is exceeded.
+                The fields have been stored for the Nodes handled until then.
+
         """
 
         def _update_entities(entities: list[list[Any]], fields: list[str]):
@@ -513,25 +1505,88 @@ class AiidaCollection(EntryCollection):
             key for key in self.resource_mapper.PROJECT_PREFIX.split(".") if key
         ]
         filter_fields = [{"!has_key": field} for field in self._extras_fields]
-        necessary_entity_ids = (
-            self._find_all(
-                filters={
+        missing_filters = {
+            "and": [
+                {extras_keys[0]: {"!has_key": AiidaEntityTranslator.QUARANTINE_KEY}},
+                {
                     "or": [
                         {extras_keys[0]: {"!has_key": extras_keys[1]}},
                         {".".join(extras_keys): {"or": filter_fields}},
                     ]
                 },
+            ]
+        }
+
+        if OPTIMADE_CONFIG.database_backend == SupportedBackend.MONGODB:
+            journal = None
+        max_pk = self._get_watermark()[1] if journal is not None else None
+
+        necessary_entity_ids = (
+            self._find_all(
+                filters=(
+                    {"and": [missing_filters, filters]} if filters else missing_filters
+                ),
                 project="id",
             )
             if entries is None
             else entries
         )
 
+        if journal is not None:
+            journal.start(
+                fields=list(self._extras_fields),
+                chunks=[
+                    [pk[0] for pk in necessary_entity_ids[index : index + chunk_size]]
+                    for index in range(0, len(necessary_entity_ids), chunk_size)
+                ],
+                max_pk=max_pk,
+                filters=filters,
+            )
+
         if necessary_entity_ids:
             # Necessary entities for the OPTIMADE query exist with unknown OPTIMADE
             # fields.
             necessary_entity_ids = [pk[0] for pk in necessary_entity_ids]
 
+            if OPTIMADE_CONFIG.database_backend != SupportedBackend.MONGODB:
+                try:
+                    if workers > 1 and len(necessary_entity_ids) > chunk_size:
+                        return self._calculate_entities_in_parallel(
+                            necessary_entity_ids,
+                            workers=workers,
+                            chunk_size=chunk_size,
+                            cli=cli,
+                            journal=journal,
+                        )
+                    start = time.monotonic()
+                    if cli:
+                        with warnings.catch_warnings():
+                            warnings.simplefilter("ignore")
+                            calculated = self._calculate_entities_in_chunks(
+                                necessary_entity_ids[:max_nodes],
+                                chunk_size=chunk_size,
+                                cli=cli,
+                                journal=journal,
+                                max_seconds=max_seconds,
+                            )
+                    else:
+                        calculated = self._calculate_entities_in_chunks(
+                            necessary_entity_ids[:max_nodes],
+                            chunk_size=chunk_size,
+                            journal=journal,
+                            max_seconds=max_seconds,
+                        )
+                    if len(calculated) < len(necessary_entity_ids):
+                        raise CalculationBudgetExceeded(
+                            calculated=len(calculated),
+                            remaining=len(necessary_entity_ids) - len(calculated),
+                            seconds=time.monotonic() - start,
+                        )
+                    return necessary_entity_ids
+                finally:
+                    if journal is not None:
+                        journal.finish()
+
             # Create the missing OPTIMADE fields
             fields = {"id", "type"}
             fields |= self.get_attribute_fields()
@@ -555,4 +1610,562 @@ class AiidaCollection(EntryCollection):
                 _update_entities(entities, fields)
             return necessary_entity_ids
 
+        if journal is not None:
+            journal.finish()
         return []
+
+    def _calculate_entities_in_chunks(
+        self,
+        entity_ids: list[int],
+        chunk_size: int = 1_000,
+        cli: bool = False,
+        journal: Optional[Journal] = None,
+        max_seconds: Optional[float] = None,
+    ) -> list[int]:
+        """Calculate the missing OPTIMADE fields and store them in the Node extras
+
+        Instead of handling one Node at a time, the Node properties needed by the
+        translators are retrieved for `chunk_size` Nodes in a single query, and the
+        updated extras are written back in a single bulk update per chunk.
+
+        Parameters:
+            entity_ids: The PKs of the Nodes to calculate the fields for.
+            chunk_size: The number of Nodes to handle at a time.
+            cli: Whether or not this method is run through the CLI.
+            journal: A checkpoint journal to record each committed chunk in.
+            max_seconds: Do not start a new chunk after this time has passed.
+
+        Returns:
+            The PKs of the Nodes that were handled.
+
+        """
+        extras_key = self.resource_mapper.PROJECT_PREFIX.split(".")[1]
+        node_properties = []
+        for translator in self.resource_mapper.TRANSLATORS.values():
+            for node_property in [
+                *getattr(translator, "NODE_PROPERTIES", []),
+                *getattr(translator, "CONTENT_PROPERTIES", []),
+            ]:
+                if node_property not in node_properties:
+                    node_properties.append(node_property)
+        storage = get_manager().get_profile_storage()
+
+        progress = (
+            tqdm(total=len(entity_ids), desc="Calculating fields", leave=False)
+            if cli
+            else None
+        )
+        deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        handled = 0
+        for index in range(0, len(entity_ids), chunk_size):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            chunk_ids = entity_ids[index : index + chunk_size]
+            start = time.monotonic()
+            try:
+                self._calculate_chunk(chunk_ids, extras_key, node_properties, storage)
+            except Exception:
+                if journal is not None:
+                    journal.record_chunk(
+                        chunk_ids, time.monotonic() - start, failed=True
+                    )
+                raise
+            if journal is not None:
+                journal.record_chunk(chunk_ids, time.monotonic() - start)
+            handled += len(chunk_ids)
+            if progress is not None:
+                progress.update(len(chunk_ids))
+
+        if progress is not None:
+            progress.close()
+        return entity_ids[:handled]
+
+    def _calculate_chunk(
+        self,
+        entity_ids: list[int],
+        extras_key: str,
+        node_properties: list[str],
+        storage: "StorageBackend",
+    ) -> None:
+        """Calculate and store the missing OPTIMADE fields for a chunk of Nodes
+
+        A Node for which the fields cannot be calculated due to its data, e.g., since
+        parsing its CIF file exceeds the `node_calculation_timeout` (see
+        `AiidaEntityTranslator.QUARANTINE_ERRORS`), is quarantined instead: the error
+        is stored in the `AiidaEntityTranslator.QUARANTINE_KEY` Node extra, and the
+        Node is not selected for calculation again until it is released, see
+        `release_quarantined()`.
+        Any other error is raised, leaving the whole chunk unchanged.
+
+        Parameters:
+            entity_ids: The PKs of the Nodes in the chunk.
+            extras_key: The key of the OPTIMADE fields in the Node extras.
+            node_properties: The Node properties to retrieve for the translators.
+            storage: The AiiDA profile storage to update the Nodes in.
+
+        """
+        chunk = self._find_all(
+            filters={"id": {"in": entity_ids}},
+            project=["id", "node_type"] + node_properties,
+        )
+
+        updates = []
+        for pk, node_type, *properties in chunk:
+            translator = self.resource_mapper.TRANSLATORS.get(
+                node_type, AiidaEntityTranslator
+            )
+            start = time.monotonic()
+            try:
+                new_attributes = self._calculate_attributes(
+                    pk, node_type, dict(zip(node_properties, properties))
+                )
+            except translator.QUARANTINE_ERRORS as exc:
+                LOGGER.warning(
+                    "Quarantining Node %s, since its OPTIMADE fields could not be "
+                    "calculated: %r",
+                    pk,
+                    exc,
+                )
+                updates.append(
+                    (
+                        pk,
+                        AiidaEntityTranslator.QUARANTINE_KEY,
+                        {
+                            "error": repr(exc),
+                            "fields": sorted(self._extras_fields),
+                            "seconds": round(time.monotonic() - start, 3),
+                            "time": datetime.now().astimezone().isoformat(),
+                        },
+                    )
+                )
+                continue
+            if not new_attributes:
+                continue
+            LOGGER.debug("Updating Node %s in AiiDA DB!", pk)
+            updates.append((pk, extras_key, new_attributes))
+        del chunk
+
+        self._update_extras(storage, merge=updates)
+
+    @staticmethod
+    def _update_extras(
+        storage: "StorageBackend",
+        merge: Optional[list[tuple[int, str, dict[str, Any]]]] = None,
+        remove: Optional[list[tuple[int, str]]] = None,
+    ) -> None:
+        """Update single top-level keys of the Node extras
+
+        Other processes may update the extras of the same Nodes concurrently, e.g.,
+        request-time calculation, the background indexer, or users setting their own
+        extras.
+        Hence, on PostgreSQL, only the given keys are updated in place by a single
+        `UPDATE` per Node, instead of writing back the whole (previously retrieved)
+        extras.
+        Otherwise, the extras are retrieved again right before being written.
+
+        Parameters:
+            storage: The AiiDA profile storage to update the Nodes in.
+            merge: The PK, extras key, and the values to merge into the (dictionary)
+                value of the key, for each Node.
+            remove: The PK and extras key to remove, for each Node.
+
+        """
+        merge = merge or []
+        remove = remove or []
+        if not merge and not remove:
+            return
+
+        get_session = getattr(storage, "get_session", None)
+        if get_session is not None and get_session().bind.dialect.name == "postgresql":
+            mtime = timezone.now()
+            session = get_session()
+            with nullcontext() if storage.in_transaction else storage.transaction():
+                if merge:
+                    session.execute(
+                        text(
+                            "UPDATE db_dbnode SET mtime = :mtime, extras = jsonb_set("
+                            "COALESCE(extras, '{}'::jsonb), ARRAY[CAST(:key AS TEXT)], "
+                            "COALESCE(extras -> CAST(:key AS TEXT), '{}'::jsonb) "
+                            "|| CAST(:value AS JSONB)) WHERE id = :pk"
+                        ).bindparams(bindparam("value", type_=JSONB)),
+                        [
+                            {"pk": pk, "key": key, "value": value, "mtime": mtime}
+                            for pk, key, value in merge
+                        ],
+                    )
+                if remove:
+                    session.execute(
+                        text(
+                            "UPDATE db_dbnode SET mtime = :mtime, "
+                            "extras = extras - CAST(:key AS TEXT) WHERE id = :pk"
+                        ),
+                        [{"pk": pk, "key": key, "mtime": mtime} for pk, key in remove],
+                    )
+            return
+
+        rows: dict[int, dict[str, Any]] = {}
+        pks = [_[0] for _ in merge] + [_[0] for _ in remove]
+        for pk, extras in (
+            QueryBuilder()
+            .append(Node, filters={"id": {"in": pks}}, project=["id", "extras"])
+            .iterall()
+        ):
+            rows[pk] = extras or {}
+        for pk, key, value in merge:
+            if pk in rows:
+                rows[pk][key] = {**(rows[pk].get(key) or {}), **value}
+        for pk, key in remove:
+            if pk in rows:
+                rows[pk].pop(key, None)
+        storage.bulk_update(
+            EntityTypes.NODE,
+            [{"id": pk, "extras": extras} for pk, extras in rows.items()],
+        )
+
+    def _calculate_attributes(
+        self, pk: int, node_type: str, node_properties: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Calculate the missing OPTIMADE fields of a Node
+
+        The fields calculated for a Node are kept by the content hash of the Node
+        (see `AiidaEntityTranslator.content_hash()`), and reused for other Nodes
+        with the same content, e.g., copies of the same structure.
+        They are kept in-process, as well as in a SQLite database file shared by all
+        processes, see `_get_content_cache()`.
+
+        Parameters:
+            pk: The PK of the Node.
+            node_type: The Node type of the Node.
+            node_properties: The Node properties retrieved for the translators.
+
+        Returns:
+            The newly calculated fields, as they should be stored in the Node extras.
+
+        """
+        translator = self.resource_mapper.TRANSLATORS.get(node_type)
+        content_hash = (
+            translator.content_hash(node_properties) if translator is not None else None
+        )
+        key = None
+        shared = _get_content_cache()
+        if content_hash is not None:
+            key = content_cache_key(
+                node_type,
+                content_hash,
+                self._extras_fields,
+                translator.content_version(),
+            )
+            new_attributes = self._content_cache.get(key)
+            if new_attributes is None and shared is not None:
+                new_attributes = shared.get(key)
+                if new_attributes is not None:
+                    self._content_cache.set(key, new_attributes)
+            if new_attributes is not None:
+                self._content_cache_hits += 1
+                return new_attributes
+
+        new_attributes = self.resource_mapper.calculate_attributes(
+            entry_pk=pk,
+            node_type=node_type,
+            missing_attributes=self._extras_fields,
+            node_properties=node_properties,
+        )
+        if key is not None:
+            self._content_cache.set(key, new_attributes)
+            if shared is not None:
+                shared.set(key, new_attributes)
+        return new_attributes
+
+    def quarantined(self) -> list[tuple[int, str, dict[str, Any]]]:
+        """The quarantined Nodes, see `_calculate_chunk()`
+
+        Returns:
+            The PK, Node type, and quarantine record (the error, the fields being
+            calculated, the time spent, and the time of quarantining) of each
+            quarantined Node, ordered by PK.
+
+        """
+        quarantine_key = AiidaEntityTranslator.QUARANTINE_KEY
+        return sorted(
+            (
+                (pk, node_type, record)
+                for pk, node_type, record in self._find_all(
+                    filters={"extras": {"has_key": quarantine_key}},
+                    project=["id", "node_type", f"extras.{quarantine_key}"],
+                )
+            ),
+            key=lambda entity: entity[0],
+        )
+
+    def release_quarantined(self, pks: Optional[list[int]] = None) -> list[int]:
+        """Remove Nodes from the quarantine
+
+        Afterwards, the OPTIMADE fields of the Nodes are calculated again whenever
+        they are missing.
+
+        Parameters:
+            pks: The PKs of the Nodes to release. Defaults to all quarantined Nodes.
+
+        Returns:
+            The PKs of the released Nodes.
+
+        """
+        if pks is not None and not pks:
+            return []
+        quarantine_key = AiidaEntityTranslator.QUARANTINE_KEY
+        filters: dict[str, Any] = {"extras": {"has_key": quarantine_key}}
+        if pks is not None:
+            filters = {"and": [filters, {"id": {"in": list(pks)}}]}
+
+        released = sorted(pk for (pk,) in self._find_all(filters=filters, project="id"))
+        self._update_extras(
+            get_manager().get_profile_storage(),
+            remove=[(pk, quarantine_key) for pk in released],
+        )
+        return released
+
+    def migrate_floats(
+        self, native: bool, chunk_size: int = 1_000, cli: bool = False
+    ) -> list[int]:
+        """Rewrite the float-valued OPTIMADE fields stored in the Node extras
+
+        The `FLOAT_ATTRIBUTES` of the resource mapper are converted to native JSON
+        numbers or hex strings, see the `float_storage` configuration.
+        The Nodes are retrieved and updated in bulk, `chunk_size` Nodes at a time.
+        Fields already stored in the requested representation are left untouched,
+        meaning an interrupted migration can simply be run again.
+
+        Parameters:
+            native: Whether to store the floats as JSON numbers (or hex strings).
+            chunk_size: The number of Nodes to retrieve and update at a time.
+            cli: Whether or not this method is run through the CLI.
+
+        Returns:
+            The PKs of the Nodes that were updated.
+
+        """
+        fields = sorted(self.resource_mapper.FLOAT_ATTRIBUTES)
+        if not fields:
+            return []
+        extras_key = self.resource_mapper.PROJECT_PREFIX.split(".")[1]
+        entity_ids = [
+            pk
+            for (pk,) in self._find_all(
+                filters={
+                    "and": [
+                        {"extras": {"has_key": extras_key}},
+                        {
+                            f"extras.{extras_key}": {
+                                "or": [{"has_key": field} for field in fields]
+                            }
+                        },
+                    ]
+                },
+                project="id",
+            )
+        ]
+        storage = get_manager().get_profile_storage()
+
+        progress = (
+            tqdm(total=len(entity_ids), desc="Migrating floats", leave=False)
+            if cli
+            else None
+        )
+        updated_pks = []
+        for index in range(0, len(entity_ids), chunk_size):
+            chunk_ids = entity_ids[index : index + chunk_size]
+            updates = []
+            for pk, optimade in self._find_all(
+                filters={"id": {"in": chunk_ids}},
+                project=["id", f"extras.{extras_key}"],
+            ):
+                updated = {}
+                for field in fields:
+                    if not optimade.get(field):
+                        continue
+                    value = store_floats(optimade[field], native=native)
+                    if value != optimade[field]:
+                        updated[field] = value
+                if updated:
+                    updates.append((pk, extras_key, updated))
+            self._update_extras(storage, merge=updates)
+            updated_pks.extend(pk for pk, _, _ in updates)
+            if progress is not None:
+                progress.update(len(chunk_ids))
+
+        if progress is not None:
+            progress.close()
+        return updated_pks
+
+    def _calculate_entities_in_parallel(
+        self,
+        entity_ids: list[int],
+        workers: int,
+        chunk_size: int = 1_000,
+        cli: bool = False,
+        max_attempts: int = 2,
+        journal: Optional[Journal] = None,
+    ) -> list[int]:
+        """Calculate and store the missing OPTIMADE fields using a process pool
+
+        The Nodes are split into shards of `chunk_size` Nodes, which are handled by
+        separate processes, each with their own AiiDA profile storage session.
+        Each shard is committed to the database on its own, meaning a failing shard
+        does not affect the other shards.
+        If a worker process dies, the pool is restarted and the unfinished shards
+        are retried.
+
+        Parameters:
+            entity_ids: The PKs of the Nodes to calculate the fields for.
+            workers: The number of worker processes.
+            chunk_size: The number of Nodes per shard.
+            cli: Whether or not this method is run through the CLI.
+            max_attempts: The number of times a shard is tried if its worker process
+                dies.
+            journal: A checkpoint journal to record each committed shard in.
+
+        Returns:
+            The PKs of the Nodes for which the fields were calculated.
+
+        Raises:
+            FieldCalculationError: If the fields could not be calculated for some
+                shards. The results of all other shards have been stored.
+
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from concurrent.futures.process import BrokenProcessPool
+
+        shards = [
+            entity_ids[index : index + chunk_size]
+            for index in range(0, len(entity_ids), chunk_size)
+        ]
+        pending = set(range(len(shards)))
+        attempts = {shard: 0 for shard in pending}
+        started = {}
+        calculated: list[int] = []
+        failed: list[int] = []
+
+        progress = (
+            tqdm(total=len(entity_ids), desc="Calculating fields", leave=False)
+            if cli
+            else None
+        )
+        while pending:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(pending)),
+                # Do not share the database connections with the workers
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_calculation_worker,
+                initargs=(
+                    get_manager().get_profile().name,
+                    self.entities,
+                    self.resource_cls,
+                    self.resource_mapper,
+                    self._extras_fields,
+                    (
+                        CONFIG.node_calculation_timeout,
+                        CONFIG.node_calculation_max_memory,
+                    ),
+                ),
+            ) as executor:
+                futures = {}
+                for shard in sorted(pending):
+                    futures[
+                        executor.submit(
+                            _calculate_entities_worker, shards[shard], chunk_size
+                        )
+                    ] = shard
+                    started[shard] = time.monotonic()
+                for future in as_completed(futures):
+                    shard = futures[future]
+                    shard_failed = True
+                    try:
+                        self._content_cache_hits += future.result()
+                    except BrokenProcessPool:
+                        attempts[shard] += 1
+                        if attempts[shard] < max_attempts:
+                            continue
+                        LOGGER.error(
+                            "A worker process died while calculating fields for the "
+                            "Nodes %s.",
+                            shards[shard],
+                        )
+                    except Exception as exc:  # pylint: disable=broad-except
+                        LOGGER.error(
+                            "Could not calculate fields for the Nodes %s: %r",
+                            shards[shard],
+                            exc,
+                        )
+                    else:
+                        shard_failed = False
+
+                    (failed if shard_failed else calculated).extend(shards[shard])
+                    pending.discard(shard)
+                    if journal is not None:
+                        journal.record_chunk(
+                            shards[shard],
+                            time.monotonic() - started[shard],
+                            failed=shard_failed,
+                        )
+                    if progress is not None:
+                        progress.update(len(shards[shard]))
+
+        if progress is not None:
+            progress.close()
+
+        if failed:
+            raise FieldCalculationError(
+                f"Could not calculate the OPTIMADE fields for {len(failed)} Nodes (see "
+                f"log for more details). The fields were stored for the other "
+                f"{len(calculated)} Nodes."
+            )
+        return calculated
+
+
+# The collection used by a process pool worker, see `_init_calculation_worker()`
+_WORKER_COLLECTION: Optional[AiidaCollection] = None
+
+
+def _init_calculation_worker(
+    profile: str,
+    entities: list[str],
+    resource_cls: EntryResource,
+    resource_mapper: ResourceMapper,
+    extras_fields: set[str],
+    limits: tuple[Optional[float], Optional[int]],
+) -> None:
+    """Load the AiiDA profile and set up the collection in a worker process
+
+    The `limits` are the `node_calculation_timeout` and `node_calculation_max_memory`
+    of the main process, which may differ from the server configuration, e.g., when
+    set by the CLI.
+    """
+    global _WORKER_COLLECTION  # pylint: disable=global-statement
+    from aiida import load_profile
+
+    load_profile(profile, allow_switch=True)
+    CONFIG.node_calculation_timeout, CONFIG.node_calculation_max_memory = limits
+    # Warnings are emitted per Node and are not propagated to the main process
+    warnings.simplefilter("ignore")
+
+    _WORKER_COLLECTION = AiidaCollection(
+        entities=entities,
+        group=None,
+        resource_cls=resource_cls,
+        resource_mapper=resource_mapper,
+    )
+    _WORKER_COLLECTION._extras_fields = extras_fields
+
+
+def _calculate_entities_worker(entity_ids: list[int], chunk_size: int) -> int:
+    """Calculate and store the missing OPTIMADE fields in a worker process
+
+    Returns:
+        The number of Nodes for which the fields of a Node with the same content
+        were reused.
+
+    """
+    hits = _WORKER_COLLECTION._content_cache_hits
+    _WORKER_COLLECTION._calculate_entities_in_chunks(entity_ids, chunk_size=chunk_size)
+    return _WORKER_COLLECTION._content_cache_hits - hits
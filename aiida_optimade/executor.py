@@ -0,0 +1,103 @@
+"""Bounded executor for the database work of requests
+
+AiiDA's QueryBuilder uses a SQLAlchemy session scoped to the current thread.
+Running the database work of all requests in a dedicated, bounded pool of threads
+means each thread keeps and reuses its session (and, through it, its pooled
+connection) across requests, while the number of threads never exceeds the number
+of connections the SQLAlchemy pool can provide.
+Between requests, the session of the thread is rolled back, ending its transaction
+and returning the connection to the pool.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from aiida.manage.manager import get_manager
+
+from aiida_optimade.common.logger import LOGGER
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable
+
+    from aiida_optimade.config import CustomServerConfig
+
+__all__ = ("DatabaseExecutor", "engine_kwargs")
+
+
+def engine_kwargs(config: "CustomServerConfig") -> "dict[str, Any]":
+    """The SQLAlchemy engine keyword arguments for the pool settings in `config`"""
+    kwargs = {
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_pool_max_overflow,
+        "pool_pre_ping": config.db_pool_pre_ping,
+    }
+    if config.db_pool_recycle is not None:
+        kwargs["pool_recycle"] = config.db_pool_recycle
+    return kwargs
+
+
+class DatabaseExecutor:
+    """Thread pool running database work with reused, per-thread sessions
+
+    Parameters:
+        max_workers: The number of threads. This should not exceed the number of
+            connections in the SQLAlchemy pool (`pool_size + max_overflow`), since a
+            thread otherwise waits for a connection while holding a slot.
+
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="aiida-optimade-db"
+        )
+        self._lock = threading.Lock()
+        self._active = 0
+        self._tasks = 0
+
+    def metrics(self) -> "dict[str, Any]":
+        """The current state of the executor"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "tasks": self._tasks,
+            }
+
+    async def run(self, func: "Callable[..., Any]", *args, **kwargs) -> "Any":
+        """Run `func` in the executor and await its result
+
+        The context variables of the caller are available to `func`, like for
+        FastAPI's (Starlette's) `run_in_threadpool()`.
+        """
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            functools.partial(context.run, self._call, func, *args, **kwargs),
+        )
+
+    def _call(self, func: "Callable[..., Any]", *args, **kwargs) -> "Any":
+        """Run `func`, then reset the session of the current thread"""
+        with self._lock:
+            self._active += 1
+            self._tasks += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            try:
+                get_manager().get_profile_storage().get_session().rollback()
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception("Could not roll back the AiiDA session.")
+            with self._lock:
+                self._active -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the executor
+
+        The sessions of the threads are closed with the AiiDA profile storage.
+        """
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,187 @@
+"""Background indexer keeping the OPTIMADE fields in the Node extras up to date
+
+Without the indexer, the OPTIMADE fields of new Nodes are only calculated when a
+client filters on one of them, meaning the calculation happens while handling the
+request.
+The indexer instead polls the database in a background thread for Nodes added or
+modified since its last pass (using the largest PK and the latest modification time
+as watermarks), and calculates their missing fields in chunks.
+"""
+
+import threading
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from aiida.manage.manager import get_manager
+
+from aiida_optimade.common.logger import LOGGER
+
+if TYPE_CHECKING:  # pragma: no cover
+    from datetime import datetime
+    from typing import Any, Optional
+
+    from aiida_optimade.entry_collections import AiidaCollection
+
+__all__ = ("BackgroundIndexer",)
+
+
+class BackgroundIndexer:
+    """Calculate missing OPTIMADE fields in a background thread
+
+    Parameters:
+        collection: The collection to keep up to date. The indexer uses its own
+            copy of the collection, since calculating fields changes its state.
+        interval: Time in seconds between the end of a pass and the start of the
+            next one.
+        chunk_size: The number of Nodes to calculate and store at a time.
+
+    """
+
+    # The modification times of Nodes are set by the clocks of the processes writing
+    # them, which may be skewed. Hence, Nodes modified up to this long before the
+    # latest modification time seen in the previous pass are checked again.
+    MTIME_MARGIN = timedelta(minutes=5)
+
+    def __init__(
+        self, collection: "AiidaCollection", interval: float, chunk_size: int = 1_000
+    ):
+        from aiida_optimade.entry_collections import AiidaCollection
+
+        self.collection = AiidaCollection(
+            entities=collection.entities,
+            group=collection.group,
+            resource_cls=collection.resource_cls,
+            resource_mapper=collection.resource_mapper,
+        )
+        self.interval = interval
+        self.chunk_size = chunk_size
+
+        self._thread: "Optional[threading.Thread]" = None
+        self._stop = threading.Event()
+
+        # Watermarks: Everything up to these (as stored in the database at the start
+        # of the last pass) has been handled
+        self._max_pk: "Optional[int]" = None
+        self._mtime: "Optional[datetime]" = None
+        # The (epoch) time up to which all Nodes have been handled
+        self._covered_until: "Optional[float]" = None
+
+        self._passes = 0
+        self._last_pass_nodes = 0
+        self._total_nodes = 0
+        self._last_error: "Optional[str]" = None
+
+    @property
+    def running(self) -> bool:
+        """Whether or not the background thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def lag(self) -> "Optional[float]":
+        """Time in seconds since the start of the last successful pass
+
+        Nodes added or modified within this time may not have had their OPTIMADE
+        fields calculated yet. `None` if no pass has been successful yet.
+        """
+        if self._covered_until is None:
+            return None
+        return time.time() - self._covered_until
+
+    def metrics(self) -> "dict[str, Any]":
+        """The current state of the indexer"""
+        lag = self.lag
+        return {
+            "running": self.running,
+            "lag_seconds": None if lag is None else round(lag, 3),
+            "passes": self._passes,
+            "last_pass_nodes": self._last_pass_nodes,
+            "total_nodes": self._total_nodes,
+            "last_error": self._last_error,
+        }
+
+    def start(self) -> None:
+        """Start the background thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="aiida-optimade-indexer", daemon=True
+        )
+        self._thread.start()
+        LOGGER.info(
+            "Started background indexer (interval: %s s, chunk size: %d).",
+            self.interval,
+            self.chunk_size,
+        )
+
+    def stop(self, timeout: "Optional[float]" = None) -> None:
+        """Stop the background thread, waiting for the current pass to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        LOGGER.info("Stopped background indexer.")
+
+    def run_once(self) -> list[int]:
+        """Calculate the missing OPTIMADE fields for new or modified Nodes
+
+        The first pass checks all Nodes.
+
+        Returns:
+            The PKs of the Nodes for which fields were calculated.
+
+        """
+        started = time.time()
+        # pylint: disable=protected-access
+        _, max_pk, mtime = (self.collection._get_watermark() + [None] * 3)[:3]
+
+        filters = None
+        if self._max_pk is not None:
+            filters = {
+                "or": [
+                    {"id": {">": self._max_pk}},
+                    {"mtime": {">=": self._mtime - self.MTIME_MARGIN}},
+                ]
+            }
+
+        # Only calculate fields implemented by all translators.
+        # Otherwise, a warning is emitted per Node, which the `AddWarnings` middleware
+        # may add to the response of a concurrent request.
+        translators = self.collection.resource_mapper.TRANSLATORS.values()
+        self.collection._extras_fields = {
+            field
+            for field in self.collection._all_extras_fields()
+            if all(hasattr(translator, field) for translator in translators)
+        }
+        pks = self.collection._check_and_calculate_entities(
+            chunk_size=self.chunk_size, filters=filters
+        )
+
+        if max_pk is not None and mtime is not None:
+            self._max_pk = max_pk
+            self._mtime = mtime
+        self._covered_until = started
+        self._passes += 1
+        self._last_pass_nodes = len(pks)
+        self._total_nodes += len(pks)
+        self._last_error = None
+        LOGGER.debug(
+            "Background indexer calculated fields for %d Nodes (lag: %.3f s).",
+            len(pks),
+            self.lag,
+        )
+        return pks
+
+    def _run(self) -> None:
+        """The loop of the background thread"""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.exception("Background indexer pass failed.")
+                self._last_error = repr(exc)
+            finally:
+                # Close the SQLAlchemy session scoped to this thread
+                get_manager().get_profile_storage().get_session().close()
+            self._stop.wait(self.interval)
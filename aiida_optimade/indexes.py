@@ -0,0 +1,257 @@
+"""Indexes for the OPTIMADE fields in the AiiDA database
+
+The OPTIMADE fields are stored in the JSONB `extras` column of the AiiDA Nodes.
+PostgreSQL does not index these out of the box, meaning all filters and sorting on
+them result in sequential scans.
+The indexes defined here are created on `db_dbnode` with expressions matching the
+ones generated by AiiDA's QueryBuilder, and are partial on the served Node types.
+
+Note, the QueryBuilder wraps comparisons of JSONB values (`==`, `<`, `>`, `like`,
+`in`, ...) in a type check, e.g., `CASE WHEN jsonb_typeof(...) = 'number' THEN
+CAST(... AS FLOAT) = 3 ELSE false END`, which no B-tree index can serve.
+Hence, the B-tree indexes only serve sorting (and the default ordering by PK),
+while the GIN index on `elements` serves `HAS` and `HAS ALL` filters, which are
+translated into JSONB containment (`@>`).
+Filters on the other fields are served by the materialized structures table (see
+`aiida_optimade.tables`).
+"""
+
+import re
+from typing import TYPE_CHECKING
+
+from aiida.manage.manager import get_manager
+from sqlalchemy import text
+
+from aiida_optimade.common.logger import LOGGER
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Optional
+
+    from sqlalchemy.engine import Engine
+
+    from aiida_optimade.entry_collections import AiidaCollection
+
+__all__ = (
+    "INDEXES",
+    "CANONICAL_QUERIES",
+    "index_name",
+    "create_indexes",
+    "drop_indexes",
+    "list_indexes",
+    "explain_query",
+    "explain_canonical_queries",
+)
+
+INDEX_PREFIX = "ix_aiida_optimade_"
+
+# OPTIMADE field -> index method and expressions.
+# The expressions MUST match the SQL generated by the QueryBuilder, i.e., `contains`
+# filters and `cast` sorting on the extras, to be used by PostgreSQL.
+# The Node `id` is added to B-tree indexes, since it is used as tie-breaker (in
+# ascending order) when sorting.
+INDEXES: dict[str, str] = {
+    "elements": "USING gin ((extras #> '{optimade,elements}') jsonb_path_ops)",
+    "nelements": "((CAST(extras #>> '{optimade,nelements}' AS INTEGER)), id)",
+    "nsites": "((CAST(extras #>> '{optimade,nsites}' AS INTEGER)), id)",
+    "chemical_formula_descriptive": (
+        "((extras #>> '{optimade,chemical_formula_descriptive}'), id)"
+    ),
+    "chemical_formula_reduced": (
+        "((extras #>> '{optimade,chemical_formula_reduced}'), id)"
+    ),
+    "chemical_formula_hill": "((extras #>> '{optimade,chemical_formula_hill}'), id)",
+    "chemical_formula_anonymous": (
+        "((extras #>> '{optimade,chemical_formula_anonymous}'), id)"
+    ),
+    # Most often sorted in descending order, i.e., the latest entries first
+    "last_modified": "(mtime DESC, id)",
+    "ctime": "(ctime, id)",
+    # The default ordering of the served Nodes
+    "node_type": "(id)",
+}
+
+# `(filter, sort)` queries served by the indexes, used to report their effect
+CANONICAL_QUERIES: list[tuple[str, str]] = [
+    ("", ""),
+    ('elements HAS "Si"', ""),
+    ('elements HAS ALL "Si","O" AND nsites<20', ""),
+    ("", "nelements"),
+    ("nsites<20", "nsites"),
+    ("", "chemical_formula_reduced"),
+    ('chemical_formula_anonymous="A2B"', "chemical_formula_anonymous"),
+    ("", "-last_modified"),
+    ("", "_aiida_ctime"),
+]
+
+
+def index_name(field: str) -> str:
+    """The name of the index for an OPTIMADE field"""
+    return f"{INDEX_PREFIX}{field}"
+
+
+def _get_engine() -> "Engine":
+    """The SQLAlchemy engine used by AiiDA"""
+    return get_manager().get_profile_storage().get_session().get_bind()
+
+
+def _execute(statements: list[str], concurrently: bool) -> None:
+    """Execute `statements` in autocommit mode
+
+    This is necessary for `CREATE INDEX CONCURRENTLY`, which cannot be run inside a
+    transaction block.
+    """
+    engine = _get_engine()
+    with engine.connect() as connection:
+        if concurrently:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in statements:
+            LOGGER.debug("Executing: %s", statement)
+            connection.execute(text(statement))
+        if not concurrently:
+            connection.commit()
+
+
+def create_indexes(
+    fields: list[str], entities: list[str], concurrently: bool = True
+) -> list[str]:
+    """Create the indexes for the given OPTIMADE `fields`
+
+    Parameters:
+        fields: OPTIMADE fields, see `INDEXES`.
+        entities: The served AiiDA Node types. The indexes only cover these Nodes.
+        concurrently: Whether or not to create the indexes without locking writes to
+            the `db_dbnode` table (this is slower).
+
+    Returns:
+        The names of the indexes.
+
+    """
+    node_types = ", ".join("'" + _.replace("'", "''") + "'" for _ in entities)
+    statements = [
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+        f"{index_name(field)} ON db_dbnode {INDEXES[field]} "
+        f"WHERE node_type IN ({node_types})"
+        for field in fields
+    ]
+    _execute(statements + ["ANALYZE db_dbnode"], concurrently=concurrently)
+    return [index_name(field) for field in fields]
+
+
+def drop_indexes(fields: list[str], concurrently: bool = True) -> list[str]:
+    """Drop the indexes for the given OPTIMADE `fields`
+
+    Returns:
+        The names of the indexes.
+
+    """
+    statements = [
+        f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS "
+        f"{index_name(field)}"
+        for field in fields
+    ]
+    _execute(statements, concurrently=concurrently)
+    return [index_name(field) for field in fields]
+
+
+def list_indexes() -> list[dict[str, str]]:
+    """List the existing AiiDA-OPTIMADE indexes
+
+    Returns:
+        A list of dictionaries with the keys `"name"`, `"size"` (human readable),
+        and `"definition"`.
+
+    """
+    engine = _get_engine()
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text(
+                "SELECT indexname, pg_size_pretty(pg_relation_size("
+                "quote_ident(indexname)::regclass)), indexdef FROM pg_indexes "
+                "WHERE tablename = 'db_dbnode' AND indexname LIKE :prefix "
+                "ORDER BY indexname"
+            ),
+            {"prefix": f"{INDEX_PREFIX}%"},
+        ).fetchall()
+    return [
+        {"name": name, "size": size, "definition": defn} for name, size, defn in rows
+    ]
+
+
+def explain_query(
+    collection: "AiidaCollection",
+    filter_: str = "",
+    sort: str = "",
+    limit: "Optional[int]" = None,
+) -> str:
+    """Retrieve the planner's query plan for a request to the server
+
+    The query is built as for a request to the server, i.e., filtering the Node
+    extras and retrieving a single page.
+
+    Parameters:
+        collection: The collection to query.
+        filter_: The OPTIMADE filter.
+        sort: The OPTIMADE sort parameter.
+        limit: The page limit. Defaults to the server's default page limit.
+
+    Returns:
+        The output of `EXPLAIN` (without executing the query).
+
+    The transaction of the AiiDA session is ended afterwards, since it otherwise
+    keeps a lock on `db_dbnode`, blocking changes to its indexes.
+
+    """
+    from aiida_optimade.config import CONFIG
+
+    query_kwargs = {
+        "project": ["id"],
+        "limit": limit or CONFIG.page_limit,
+    }
+    if filter_:
+        query_kwargs["filters"] = collection.transform_filter(filter_)
+    if sort:
+        query_kwargs["order_by"] = collection.parse_sort_params(sort) + [
+            {"id": {"order": "asc"}}
+        ]
+
+    try:
+        return collection._prepare_query(  # pylint: disable=protected-access
+            collection.entities, collection.group, **query_kwargs
+        ).analyze_query(execute=False)
+    finally:
+        get_manager().get_profile_storage().get_session().rollback()
+
+
+def explain_canonical_queries(
+    collection: "AiidaCollection", limit: "Optional[int]" = None
+) -> dict[str, "Optional[float]"]:
+    """Retrieve the planner's estimated total cost of the `CANONICAL_QUERIES`
+
+    See `explain_query()`.
+
+    Parameters:
+        collection: The collection to query.
+        limit: The page limit. Defaults to the server's default page limit.
+
+    Returns:
+        A mapping of the canonical queries (as URL query strings) to their cost.
+        The cost is `None` if it could not be determined.
+
+    """
+    costs = {}
+    for filter_, sort in CANONICAL_QUERIES:
+        key = "&".join(
+            f"{param}={value}"
+            for param, value in (("filter", filter_), ("sort", sort))
+            if value
+        )
+        try:
+            plan = explain_query(collection, filter_, sort, limit=limit)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.debug("Could not EXPLAIN %r: %r", key, exc)
+            costs[key] = None
+            continue
+
+        match = re.search(r"cost=[0-9.]+\.\.([0-9.]+)", plan)
+        costs[key] = float(match.group(1)) if match else None
+    return costs
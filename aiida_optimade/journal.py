@@ -0,0 +1,163 @@
+"""Checkpoint journal for calculating the OPTIMADE fields
+
+The journal is a local JSON file recording the progress of an `aiida-optimade init`
+or `aiida-optimade calc` run.
+The Nodes to handle are split into chunks of consecutive PKs, which are committed to
+the database one at a time.
+After each committed (or failed) chunk, the journal is updated, making it possible
+to resume an interrupted run from the last committed PK, and to only handle Nodes
+added since the last run.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from aiida_optimade.common.logger import LOGS_DIR
+
+__all__ = ("Journal",)
+
+
+class Journal:
+    """Checkpoint journal for an `aiida-optimade init` or `calc` run
+
+    Parameters:
+        filename: The path to the JSON journal file.
+
+    """
+
+    def __init__(self, filename: Path):
+        self.filename = Path(filename)
+        self.data: dict[str, Any] = {}
+        if self.filename.exists():
+            with open(self.filename, encoding="utf8") as handle:
+                self.data = json.load(handle)
+
+    @classmethod
+    def for_profile(cls, command: str, profile: str) -> "Journal":
+        """The default journal for a CLI `command` and AiiDA `profile`"""
+        return cls(LOGS_DIR.joinpath(f"{command}_{profile}.journal.json"))
+
+    @property
+    def exists(self) -> bool:
+        """Whether or not a run has been recorded in the journal"""
+        return bool(self.data)
+
+    @property
+    def status(self) -> Optional[str]:
+        """The status of the recorded run: `"running"`, `"completed"`, or
+        `"failed"`"""
+        return self.data.get("status")
+
+    @property
+    def fields(self) -> list[str]:
+        """The OPTIMADE fields calculated in the recorded run"""
+        return self.data.get("fields", [])
+
+    @property
+    def started(self) -> Optional[datetime]:
+        """When the recorded run was started"""
+        started = self.data.get("started")
+        return datetime.fromisoformat(started) if started else None
+
+    @property
+    def max_pk(self) -> Optional[int]:
+        """The largest served Node PK when the recorded run was started"""
+        return self.data.get("max_pk")
+
+    @property
+    def failures(self) -> list[int]:
+        """The PKs of the Nodes in failed chunks"""
+        return self.data.get("failures", [])
+
+    @property
+    def last_pk(self) -> Optional[int]:
+        """The PK up to which all Nodes have been handled
+
+        This is the last PK of the longest sequence of handled chunks from the
+        start, since chunks may be committed out of order by several workers.
+        Nodes in failed chunks are recorded in `failures`.
+        """
+        last_pk = None
+        for chunk in self.data.get("chunks", []):
+            if chunk["status"] == "pending":
+                break
+            last_pk = chunk["last_pk"]
+        return last_pk
+
+    def start(
+        self,
+        fields: list[str],
+        chunks: list[list[int]],
+        max_pk: Optional[int],
+        **parameters: Any,
+    ) -> None:
+        """Start recording a new run, overwriting any previously recorded run
+
+        Parameters:
+            fields: The OPTIMADE fields to calculate.
+            chunks: The PKs of the Nodes to handle, split into chunks.
+            max_pk: The largest served Node PK.
+            **parameters: Parameters for the run to record, e.g., `since_pk`.
+
+        """
+        self.data = {
+            "status": "running",
+            "started": datetime.now(timezone.utc).isoformat(),
+            "finished": None,
+            "fields": sorted(fields),
+            "parameters": parameters,
+            "max_pk": max_pk,
+            "nodes": sum(len(chunk) for chunk in chunks),
+            "chunks": [
+                {
+                    "first_pk": chunk[0],
+                    "last_pk": chunk[-1],
+                    "nodes": len(chunk),
+                    "status": "pending",
+                    "seconds": None,
+                }
+                for chunk in chunks
+            ],
+            "failures": [],
+        }
+        self.save()
+
+    def record_chunk(
+        self, chunk: list[int], seconds: float, failed: bool = False
+    ) -> None:
+        """Record a chunk as committed or failed
+
+        Parameters:
+            chunk: The PKs of the Nodes in the chunk.
+            seconds: The time it took to handle the chunk.
+            failed: Whether or not handling the chunk failed.
+
+        """
+        for recorded in self.data["chunks"]:
+            if recorded["first_pk"] == chunk[0]:
+                recorded["status"] = "failed" if failed else "committed"
+                recorded["seconds"] = round(seconds, 3)
+                break
+        if failed:
+            self.data["failures"].extend(chunk)
+        self.save()
+
+    def finish(self) -> None:
+        """Record the run as finished"""
+        self.data["status"] = "failed" if self.data["failures"] else "completed"
+        self.data["finished"] = datetime.now(timezone.utc).isoformat()
+        self.save()
+
+    def save(self) -> None:
+        """Write the journal to file
+
+        The file is replaced atomically, so it is never left half-written.
+        """
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.filename.with_name(f"{self.filename.name}.tmp")
+        with open(temporary, "w", encoding="utf8") as handle:
+            json.dump(self.data, handle, indent=2, default=str)
+        os.replace(temporary, self.filename)
@@ -5,7 +5,8 @@ from pathlib import Path
 
 import bson.json_util
 from aiida import load_profile
-from fastapi import FastAPI
+from aiida.manage.manager import get_manager
+from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from lark.exceptions import VisitError
@@ -24,7 +25,6 @@ with warnings.catch_warnings(record=True) as w:
 
 import optimade.server.exception_handlers as exc_handlers
 from optimade.server.middleware import (
-    AddWarnings,
     CheckWronglyVersionedBaseUrls,
     EnsureQueryParamIntegrity,
     HandleApiHint,
@@ -32,8 +32,14 @@ from optimade.server.middleware import (
 from optimade.server.routers import versions
 from optimade.server.routers.utils import BASE_URL_PREFIXES, mongo_id_for_database
 
-from aiida_optimade.common import LOGGER
-from aiida_optimade.middleware import RedirectOpenApiDocs
+from aiida_optimade.common import LOGGER, ResponseCache, ServiceUnavailable
+from aiida_optimade.config import CONFIG as SERVER_CONFIG
+from aiida_optimade.executor import DatabaseExecutor, engine_kwargs
+from aiida_optimade.middleware import (
+    AddWarnings,
+    RedirectOpenApiDocs,
+    ResponseCacheMiddleware,
+)
 from aiida_optimade.routers import info, links, structures
 from aiida_optimade.utils import OPEN_API_ENDPOINTS
 
@@ -82,6 +88,20 @@ APP.add_middleware(CheckWronglyVersionedBaseUrls)
 APP.add_middleware(HandleApiHint)
 APP.add_middleware(AddWarnings)
 
+# The response cache must be the outermost middleware, so the cached responses are
+# those returned to the clients (including, e.g., the warnings)
+RESPONSE_CACHE = ResponseCache(
+    max_bytes=SERVER_CONFIG.response_cache_max_bytes,
+    ttl=SERVER_CONFIG.response_cache_ttl,
+    stale_while_revalidate=SERVER_CONFIG.response_cache_stale_while_revalidate,
+    compress=SERVER_CONFIG.response_cache_compress,
+)
+APP.add_middleware(
+    ResponseCacheMiddleware,
+    cache=RESPONSE_CACHE,
+    collections={"structures": structures.STRUCTURES},
+)
+
 
 # Add various exception handlers
 APP.add_exception_handler(StarletteHTTPException, exc_handlers.http_exception_handler)
@@ -94,6 +114,16 @@ APP.add_exception_handler(NotImplementedError, exc_handlers.not_implemented_hand
 APP.add_exception_handler(Exception, exc_handlers.general_exception_handler)
 
 
+def service_unavailable_handler(request: Request, exc: ServiceUnavailable):
+    """Handle a 503 Service Unavailable, keeping the `Retry-After` header"""
+    response = exc_handlers.general_exception(request, exc)
+    response.headers.update(exc.headers or {})
+    return response
+
+
+APP.add_exception_handler(ServiceUnavailable, service_unavailable_handler)
+
+
 # Add unversioned base URL endpoints
 APP.include_router(versions.router)
 for endpoint in (info, links, structures):
@@ -113,9 +143,40 @@ async def startup():
     """Things to do upon server startup"""
     # Load AiiDA profile
     profile_name = os.getenv("AIIDA_PROFILE")
-    load_profile(profile_name)
+    profile = load_profile(profile_name)
     LOGGER.info("AiiDA Profile: %s", profile_name)
 
+    # Configure the SQLAlchemy connection pool and the database executor
+    if CONFIG.database_backend != SupportedBackend.MONGODB:
+        if get_manager().profile_storage_loaded:
+            LOGGER.warning(
+                "The AiiDA profile storage is already loaded, not applying the "
+                "connection pool settings."
+            )
+        elif profile.storage_backend == "core.psql_dos":
+            profile.storage_config.setdefault("engine_kwargs", {}).update(
+                engine_kwargs(SERVER_CONFIG)
+            )
+        APP.state.db_executor = DatabaseExecutor(
+            max_workers=SERVER_CONFIG.db_executor_workers
+            or SERVER_CONFIG.db_pool_size + SERVER_CONFIG.db_pool_max_overflow
+        )
+
+    # Start the background indexer
+    APP.state.indexer = None
+    if (
+        SERVER_CONFIG.background_indexer
+        and CONFIG.database_backend != SupportedBackend.MONGODB
+    ):
+        from aiida_optimade.indexer import BackgroundIndexer
+
+        APP.state.indexer = BackgroundIndexer(
+            structures.STRUCTURES,
+            interval=SERVER_CONFIG.background_indexer_interval,
+            chunk_size=SERVER_CONFIG.background_indexer_chunk_size,
+        )
+        APP.state.indexer.start()
+
     # Load links
     with open(Path(__file__).parent.joinpath("data/links.json").resolve()) as handle:
         data = json.load(handle)
@@ -160,3 +221,13 @@ async def startup():
             links.LINKS.collection.insert_many(
                 bson.json_util.loads(bson.json_util.dumps(processed)),
             )
+
+
+@APP.on_event("shutdown")
+async def shutdown():
+    """Things to do upon server shutdown"""
+    if getattr(APP.state, "indexer", None) is not None:
+        APP.state.indexer.stop(timeout=SERVER_CONFIG.background_indexer_interval)
+    if getattr(APP.state, "db_executor", None) is not None:
+        APP.state.db_executor.shutdown()
+        APP.state.db_executor = None
@@ -1,11 +1,26 @@
 # pylint: disable=arguments-differ
-from typing import Any
+from functools import lru_cache
+from typing import Any, NamedTuple, Sequence
 
 from optimade.server.mappers import BaseResourceMapper as OptimadeResourceMapper
 
+from aiida_optimade.config import CONFIG
 from aiida_optimade.translators.entities import AiidaEntityTranslator
+from aiida_optimade.translators.utils import hex_to_floats
 
-__all__ = ("ResourceMapper",)
+__all__ = ("ResourceMapper", "RowPlan")
+
+
+class RowPlan(NamedTuple):
+    """How to map the rows of a QueryBuilder projection, see
+    `ResourceMapper.row_plan()`"""
+
+    # (OPTIMADE field, row index) of the top-level fields
+    top_level: tuple[tuple[str, int], ...]
+    # (OPTIMADE field, row index, whether to decode hex floats) of the attributes
+    attributes: tuple[tuple[str, int, bool], ...]
+    # Attributes that are not projected and need to be calculated
+    missing_attributes: frozenset[str]
 
 
 class ResourceMapper(OptimadeResourceMapper):
@@ -23,10 +38,27 @@ class ResourceMapper(OptimadeResourceMapper):
         "meta",
     }
 
+    # Attributes stored as (nested lists of) floats, see `hex_float_attributes()`
+    FLOAT_ATTRIBUTES: set[str] = set()
+
     @classmethod
+    def hex_float_attributes(cls) -> set[str]:
+        """The `FLOAT_ATTRIBUTES` stored as hex strings in the Node extras
+
+        With native float storage (the `float_storage` configuration), the floats
+        are stored as JSON numbers and need no decoding.
+        """
+        if CONFIG.float_storage == "native":
+            return set()
+        return cls.FLOAT_ATTRIBUTES
+
+    @classmethod
+    @lru_cache(maxsize=None)
     def all_aliases(cls) -> tuple[tuple[str, str]]:
         """Get all aliases as a tuple
         Also add `PROJECT_PREFIX` fields to the tuple
+
+        The aliases are computed once per mapper.
         """
         res = super().all_aliases()
         return res + tuple(
@@ -46,33 +78,78 @@ class ResourceMapper(OptimadeResourceMapper):
         Return:
             A resource object in OPTIMADE format.
 
+        """
+        return cls.map_back_row(
+            tuple(entity_properties.values()), cls.row_plan(tuple(entity_properties))
+        )
+
+    @classmethod
+    @lru_cache(maxsize=128)
+    def row_plan(cls, project: tuple[str, ...]) -> RowPlan:
+        """Determine how to map the rows of a QueryBuilder query projecting `project`
+
+        The plan is computed once per projection.
         """
         # We always need "id" and "node_type"
         for required_property in ["id", "node_type"]:
-            if required_property not in entity_properties:
+            if required_property not in project:
                 raise KeyError(
-                    f"{required_property!r} should be present in entity_properties: "
-                    f"{entity_properties}"
+                    f"{required_property!r} should be present in the projection: "
+                    f"{project}"
                 )
 
-        new_object = {
-            field: entity_properties[cls.get_backend_field(field)]
+        index = {field: position for position, field in enumerate(project)}
+        hex_float_attributes = cls.hex_float_attributes()
+        top_level = tuple(
+            (field, index[cls.get_backend_field(field)])
             for field in cls.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
-            if cls.get_backend_field(field) in entity_properties
-        }
-
-        new_object["attributes"] = cls.build_attributes(
-            retrieved_attributes={
-                alias: entity_properties[real]
-                for alias, real in cls.all_aliases()
-                if (
-                    real in entity_properties
-                    and alias not in cls.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
-                )
-            },
-            entry_pk=new_object["id"],
-            node_type=new_object["type"],
+            if cls.get_backend_field(field) in index
+        )
+        attributes = tuple(
+            (alias, index[real], alias in hex_float_attributes)
+            for alias, real in cls.all_aliases()
+            if real in index and alias not in cls.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
         )
+        missing_attributes = frozenset(
+            cls.ALL_ATTRIBUTES
+            - cls.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
+            - {alias for alias, _, _ in attributes}
+        )
+        return RowPlan(top_level, attributes, missing_attributes)
+
+    @classmethod
+    def map_back_row(cls, row: Sequence[Any], plan: RowPlan) -> dict:
+        """Map a QueryBuilder row from AiiDA to OPTIMADE
+
+        Parameters:
+            row: The projected values, in the order of the projection of `plan`.
+            plan: See `row_plan()`.
+
+        Return:
+            A resource object in OPTIMADE format.
+
+        """
+        new_object = {field: row[index] for field, index in plan.top_level}
+
+        if plan.missing_attributes:
+            new_object["attributes"] = cls.build_attributes(
+                retrieved_attributes={
+                    alias: row[index] for alias, index, _ in plan.attributes
+                },
+                entry_pk=new_object["id"],
+                node_type=new_object["type"],
+                missing_attributes=set(plan.missing_attributes),
+            )
+        else:
+            # Equivalent to `build_attributes()` without missing attributes
+            new_object["attributes"] = {
+                alias: (
+                    hex_to_floats(row[index])
+                    if hex_floats and row[index]
+                    else row[index]
+                )
+                for alias, index, hex_floats in plan.attributes
+            }
         new_object["type"] = cls.ENDPOINT
 
         return new_object
@@ -96,3 +173,28 @@ class ResourceMapper(OptimadeResourceMapper):
         :param node_type: The AiiDA Node's type
         :type node_type: str
         """
+
+    @classmethod
+    def calculate_attributes(
+        cls,
+        entry_pk: int,
+        node_type: str,
+        missing_attributes: set,
+        node_properties: dict = None,
+    ) -> dict:
+        """Calculate OPTIMADE attributes without storing them
+
+        :param entry_pk: The AiiDA Node's PK
+        :type entry_pk: int
+
+        :param node_type: The AiiDA Node's type
+        :type node_type: str
+
+        :param missing_attributes: The attributes to calculate
+        :type missing_attributes: set
+
+        :param node_properties: Already retrieved Node properties needed by the
+            translator
+        :type node_properties: dict
+        """
+        raise NotImplementedError
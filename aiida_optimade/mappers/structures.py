@@ -25,6 +25,18 @@ class StructureMapper(ResourceMapper):
     REQUIRED_ATTRIBUTES = set(StructureResourceAttributes.schema().get("required"))
     # This should be REQUIRED_FIELDS, but should be set as such in `optimade`
     ENTRY_RESOURCE_CLASS = StructureResource
+    FLOAT_ATTRIBUTES = {
+        "elements_ratios",
+        "lattice_vectors",
+        "cartesian_site_positions",
+    }
+    # Used to filter on the length of these lists, see `FilterOptimizer`
+    LENGTH_ALIASES = (
+        ("elements", "nelements"),
+        ("elements_ratios", "nelements"),
+        ("species_at_sites", "nsites"),
+        ("cartesian_site_positions", "nsites"),
+    )
 
     @classmethod
     def build_attributes(
@@ -49,12 +61,6 @@ class StructureMapper(ResourceMapper):
             newly calculated fields.
 
         """
-        float_fields = {
-            "elements_ratios",
-            "lattice_vectors",
-            "cartesian_site_positions",
-        }
-
         # Add existing attributes
         existing_attributes = set(retrieved_attributes.keys())
         if missing_attributes is None:
@@ -63,7 +69,7 @@ class StructureMapper(ResourceMapper):
                 - cls.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
                 - existing_attributes
             )
-        for field in float_fields:
+        for field in cls.hex_float_attributes():
             if field in existing_attributes and retrieved_attributes.get(field):
                 retrieved_attributes[field] = hex_to_floats(retrieved_attributes[field])
         res = retrieved_attributes.copy()
@@ -71,35 +77,7 @@ class StructureMapper(ResourceMapper):
         # Create and add new attributes
         if missing_attributes:
             translator = cls.TRANSLATORS[node_type](entry_pk)
-            for attribute in missing_attributes:
-                try:
-                    create_attribute = getattr(translator, attribute)
-                except AttributeError as exc:
-                    if CONFIG.database_backend != SupportedBackend.MONGODB:
-                        if attribute in cls.REQUIRED_ATTRIBUTES:
-                            translator = None
-                            raise NotImplementedError(
-                                f"Parsing required attribute {attribute!r} from "
-                                f"{translator.__class__.__name__} has not yet been "
-                                "implemented."
-                            ) from exc
-
-                        warnings.warn(
-                            f"Parsing optional attribute {attribute!r} from "
-                            f"{translator.__class__.__name__} has not yet been "
-                            "implemented.",
-                            NotImplementedWarning,
-                        )
-                    else:
-                        warnings.warn(
-                            f"Trying to parse attribute {attribute!r} from "
-                            f"{translator.__class__.__name__}, but is has not been "
-                            "implemented. This may be a mistake, but may also be fine, "
-                            "since a MongoDB is used.",
-                            NotImplementedWarning,
-                        )
-                else:
-                    res[attribute] = create_attribute()
+            res.update(cls._create_attributes(translator, missing_attributes))
             # Store new attributes in Node extras or MongoDB collection
             translator.store_attributes(
                 mongo=CONFIG.database_backend == SupportedBackend.MONGODB
@@ -107,3 +85,67 @@ class StructureMapper(ResourceMapper):
             del translator
 
         return res
+
+    @classmethod
+    def calculate_attributes(
+        cls,
+        entry_pk: int,
+        node_type: str,
+        missing_attributes: set,
+        node_properties: dict = None,
+    ) -> dict:
+        """Calculate attributes for OPTIMADE structure resource without storing them
+
+        Parameters:
+            entry_pk: The AiiDA Node's PK (`Node.pk`)
+            node_type: The AiiDA Node's type (`Node.node_type`)
+            missing_attributes: Attributes to be calculated.
+            node_properties: Already retrieved Node properties, see the translator's
+                `NODE_PROPERTIES`. If not supplied, they are retrieved from the
+                database.
+
+        Returns:
+            The newly calculated attributes as they should be stored in the Node
+            extras, i.e., with floats represented as configured by `float_storage`.
+
+        """
+        translator = cls.TRANSLATORS[node_type](entry_pk, properties=node_properties)
+        cls._create_attributes(translator, missing_attributes)
+        return translator.new_attributes
+
+    @classmethod
+    def _create_attributes(
+        cls, translator: AiidaEntityTranslator, missing_attributes: set
+    ) -> dict:
+        """Create `missing_attributes` using `translator`"""
+        res = {}
+        for attribute in missing_attributes:
+            try:
+                create_attribute = getattr(translator, attribute)
+            except AttributeError as exc:
+                if CONFIG.database_backend != SupportedBackend.MONGODB:
+                    if attribute in cls.REQUIRED_ATTRIBUTES:
+                        translator = None
+                        raise NotImplementedError(
+                            f"Parsing required attribute {attribute!r} from "
+                            f"{translator.__class__.__name__} has not yet been "
+                            "implemented."
+                        ) from exc
+
+                    warnings.warn(
+                        f"Parsing optional attribute {attribute!r} from "
+                        f"{translator.__class__.__name__} has not yet been "
+                        "implemented.",
+                        NotImplementedWarning,
+                    )
+                else:
+                    warnings.warn(
+                        f"Trying to parse attribute {attribute!r} from "
+                        f"{translator.__class__.__name__}, but is has not been "
+                        "implemented. This may be a mistake, but may also be fine, "
+                        "since a MongoDB is used.",
+                        NotImplementedWarning,
+                    )
+            else:
+                res[attribute] = create_attribute()
+        return res
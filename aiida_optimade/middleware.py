@@ -1,12 +1,26 @@
+import asyncio
 import urllib.parse
+from typing import TYPE_CHECKING
 
+from optimade.server.middleware import AddWarnings as OptimadeAddWarnings
 from optimade.server.routers.utils import BASE_URL_PREFIXES
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import RedirectResponse
+from starlette.responses import RedirectResponse, StreamingResponse
 
+from aiida_optimade.common import LOGGER, CachedResponse, normalize_cache_key
+from aiida_optimade.config import CONFIG
+from aiida_optimade.routers.utils import run_in_db_executor
 from aiida_optimade.utils import OPEN_API_ENDPOINTS
 
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Optional
+
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+    from aiida_optimade.common import ResponseCache
+    from aiida_optimade.entry_collections import AiidaCollection
+
 
 class RedirectOpenApiDocs(BaseHTTPMiddleware):
     """Redirect URLs from non-major version prefix URLs to major-version prefix URLs
@@ -33,3 +47,229 @@ class RedirectOpenApiDocs(BaseHTTPMiddleware):
                     return RedirectResponse(redirect_url)
         response = await call_next(request)
         return response
+
+
+class AddWarnings(OptimadeAddWarnings):
+    """Add OPTIMADE warnings to the responses, see optimade's `AddWarnings`
+
+    Adding the warnings means reading the whole response, which would defeat
+    streamed responses (see `aiida_optimade.routers.utils.stream_entries()`).
+    These are therefore passed through as they are, while the list of warnings of the
+    request is available as `request.state.optimade_warnings` for the streamed
+    response to add to its `meta`.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        streamed = None
+
+        async def _call_next(request: Request):
+            nonlocal streamed
+            request.state.optimade_warnings = self._warnings
+            response = await call_next(request)
+            if not getattr(request.state, "streaming", False):
+                return response
+            # Let optimade's `AddWarnings` handle an empty placeholder instead
+            streamed = response
+            return StreamingResponse(iter([b"{}"]))
+
+        response = await super().dispatch(request, _call_next)
+        return response if streamed is None else streamed
+
+
+class ResponseCacheMiddleware:
+    """Serve repeated requests to entry endpoints from a `ResponseCache`
+
+    The middleware should be added last, i.e., be the outermost middleware, so that
+    the cached bodies include the changes of all other middleware, e.g., the warnings
+    added by `AddWarnings`.
+    Only successful responses to GET requests without conditional headers are cached,
+    and not responses marked `no-store`.
+    Stale responses are served while being refreshed in the background.
+
+    Parameters:
+        app: The ASGI application.
+        cache: The response cache.
+        collections: The collections of the cached endpoints, by endpoint name.
+
+    """
+
+    CONDITIONAL_HEADERS = (b"if-none-match",)
+
+    def __init__(
+        self,
+        app: "ASGIApp",
+        cache: "ResponseCache",
+        collections: "dict[str, AiidaCollection]",
+    ):
+        self.app = app
+        self.cache = cache
+        self.collections = collections
+        self._refresh_tasks: "set[asyncio.Task]" = set()
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send"):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not CONFIG.response_cache
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        collection = self._get_collection(request.url.path)
+        if collection is None or any(
+            name in self.CONDITIONAL_HEADERS for name, _ in scope["headers"]
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key, watermark = await run_in_db_executor(
+            request, self._key_and_watermark, request, collection
+        )
+        response, stale = self.cache.get(key, watermark)
+        if response is None:
+            status_code, headers, body = await self._call_app(scope, receive)
+            if not self._cacheable(status_code, headers):
+                await self._send(send, status_code, headers, body)
+                return
+            response = CachedResponse(
+                status_code, headers, body, watermark, compress=self.cache.compress
+            )
+            self.cache.set(key, response)
+        elif stale and self.cache.start_refresh(key):
+            task = asyncio.create_task(self._refresh(scope, key, watermark))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+
+        await self._send_cached(send, request, response)
+
+    def _get_collection(self, path: str) -> "Optional[AiidaCollection]":
+        """The collection of the entry listing or single entry endpoint `path`"""
+        segments = [segment for segment in path.split("/") if segment]
+        for name, collection in self.collections.items():
+            if segments[-1:] == [name] and segments[-2:-1] != ["info"]:
+                return collection
+            if segments[-2:-1] == [name]:
+                return collection
+        return None
+
+    @staticmethod
+    def _key_and_watermark(
+        request: Request, collection: "AiidaCollection"
+    ) -> "tuple[str, Any]":
+        """The cache key for `request` and the current database watermark
+
+        The key consists of the URL with sorted query parameters, where the `filter` is
+        replaced by its parsed and transformed representation.
+        Since responses to requests with an `Origin` header have CORS headers, the
+        presence of this header is part of the key as well.
+        """
+        query = sorted(
+            (key, value)
+            for key, value in request.query_params.multi_items()
+            if key != "filter"
+        )
+        optimade_filter: "Any" = request.query_params.get("filter", None)
+        if optimade_filter:
+            try:
+                optimade_filter = collection.transform_filter(optimade_filter)
+            except Exception:  # pylint: disable=broad-except
+                # The request will fail, keep the original filter
+                pass
+        key = normalize_cache_key(
+            [
+                request.url.scheme,
+                request.url.netloc,
+                request.url.path,
+                query,
+                optimade_filter,
+                "origin" in request.headers,
+            ]
+        )
+        return key, collection.watermark
+
+    async def _call_app(
+        self, scope: "Scope", receive: "Receive"
+    ) -> "tuple[int, list[tuple[bytes, bytes]], bytes]":
+        """Call the application, collecting the response"""
+        status_code = 500
+        headers: "list[tuple[bytes, bytes]]" = []
+        body = []
+
+        async def _send(message: "Message") -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() != b"content-length"
+                ]
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+
+        await self.app(scope, receive, _send)
+        return status_code, headers, b"".join(body)
+
+    @staticmethod
+    def _cacheable(status_code: int, headers: "list[tuple[bytes, bytes]]") -> bool:
+        """Whether or not the response may be cached"""
+        return status_code == 200 and not any(
+            name.lower() == b"cache-control" and b"no-store" in value
+            for name, value in headers
+        )
+
+    async def _refresh(self, scope: "Scope", key: str, watermark: "Any") -> None:
+        """Refresh the cached response for `key` in the background"""
+
+        async def _receive() -> "Message":
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        try:
+            status_code, headers, body = await self._call_app(dict(scope), _receive)
+            if self._cacheable(status_code, headers):
+                self.cache.set(
+                    key,
+                    CachedResponse(
+                        status_code,
+                        headers,
+                        body,
+                        watermark,
+                        compress=self.cache.compress,
+                    ),
+                )
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception("Could not refresh the cached response.")
+        finally:
+            self.cache.finish_refresh(key)
+
+    async def _send_cached(
+        self, send: "Send", request: Request, response: CachedResponse
+    ) -> None:
+        """Send a cached response, compressed if possible"""
+        headers = list(response.headers)
+        body = response.body
+        if response.gzip_body is not None:
+            headers.append((b"vary", b"Accept-Encoding"))
+            if "gzip" in request.headers.get("accept-encoding", ""):
+                headers.append((b"content-encoding", b"gzip"))
+                body = response.gzip_body
+        headers.append((b"age", str(int(response.age)).encode()))
+        await self._send(send, response.status_code, headers, body)
+
+    @staticmethod
+    async def _send(
+        send: "Send",
+        status_code: int,
+        headers: "list[tuple[bytes, bytes]]",
+        body: bytes,
+    ) -> None:
+        """Send a complete response"""
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": headers + [(b"content-length", str(len(body)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
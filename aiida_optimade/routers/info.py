@@ -34,9 +34,19 @@ def get_info(request: Request):
     if CONFIG.root_path:
         root_path_str = f"/{CONFIG.root_path.strip('/')}"
 
+    provider_meta = {}
+    indexer = getattr(request.app.state, "indexer", None)
+    if indexer is not None:
+        provider_meta[f"_{CONFIG.provider.prefix}_indexer"] = indexer.metrics()
+
     return InfoResponse(
         meta=meta_values(
-            str(request.url), 1, 1, more_data_available=False, schema=CONFIG.schema_url
+            str(request.url),
+            1,
+            1,
+            more_data_available=False,
+            schema=CONFIG.schema_url,
+            **provider_meta,
         ),
         data=BaseInfoResource(
             id=BaseInfoResource.schema()["properties"]["id"]["default"],
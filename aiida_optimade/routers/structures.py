@@ -1,7 +1,7 @@
 # pylint: disable=missing-function-docstring
 from typing import Union
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 from optimade.models import ErrorResponse, StructureResponseMany, StructureResponseOne
 from optimade.server.config import SupportedBackend
 from optimade.server.entry_collections.mongo import MongoCollection
@@ -14,7 +14,14 @@ from aiida_optimade.config import CONFIG
 from aiida_optimade.entry_collections import AiidaCollection
 from aiida_optimade.mappers import StructureMapper
 from aiida_optimade.models import StructureResource
-from aiida_optimade.routers.utils import close_session, get_entries, get_single_entry
+from aiida_optimade.routers.utils import (
+    get_entries,
+    get_single_entry,
+    run_in_db_executor,
+    stream_entries,
+    use_streaming,
+)
+from aiida_optimade.tables import StructuresTable
 
 ROUTER = APIRouter(redirect_slashes=True)
 
@@ -23,6 +30,7 @@ STRUCTURES = AiidaCollection(
     entities=["data.core.cif.CifData.", "data.core.structure.StructureData."],
     resource_cls=StructureResource,
     resource_mapper=StructureMapper,
+    table=StructuresTable if CONFIG.structures_table else None,
 )
 STRUCTURES_MONGO = MongoCollection(
     name=CONFIG.structures_collection,
@@ -38,17 +46,24 @@ STRUCTURES_MONGO = MongoCollection(
     response_model_exclude_none=False,
     tags=["Structures"],
 )
-@close_session
-def get_structures(request: Request, params: EntryListingQueryParams = Depends()):
-    return get_entries(
-        collection=(
-            STRUCTURES_MONGO
-            if CONFIG.database_backend == SupportedBackend.MONGODB
-            else STRUCTURES
-        ),
+async def get_structures(
+    request: Request, response: Response, params: EntryListingQueryParams = Depends()
+):
+    collection = (
+        STRUCTURES_MONGO
+        if CONFIG.database_backend == SupportedBackend.MONGODB
+        else STRUCTURES
+    )
+    if use_streaming(collection, params):
+        return await stream_entries(collection, request=request, params=params)
+    return await run_in_db_executor(
+        request,
+        get_entries,
+        collection=collection,
         response=StructureResponseMany,
         request=request,
         params=params,
+        headers=response.headers,
     )
 
 
@@ -59,11 +74,15 @@ def get_structures(request: Request, params: EntryListingQueryParams = Depends()
     response_model_exclude_none=False,
     tags=["Structures"],
 )
-@close_session
-def get_single_structure(
-    request: Request, entry_id: int, params: SingleEntryQueryParams = Depends()
+async def get_single_structure(
+    request: Request,
+    response: Response,
+    entry_id: int,
+    params: SingleEntryQueryParams = Depends(),
 ):
-    return get_single_entry(
+    return await run_in_db_executor(
+        request,
+        get_single_entry,
         collection=(
             STRUCTURES_MONGO
             if CONFIG.database_backend == SupportedBackend.MONGODB
@@ -73,4 +92,5 @@ def get_single_structure(
         response=StructureResponseOne,
         request=request,
         params=params,
+        headers=response.headers,
     )
@@ -1,32 +1,195 @@
+import asyncio
 import functools
+import hashlib
+import json
+import random
+import threading
 import urllib.parse
+from datetime import date
+from enum import Enum
 from typing import TYPE_CHECKING
+from uuid import UUID
 
 from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from optimade.models import EntryResponseMany, EntryResponseOne, ToplevelLinks
 from optimade.server.config import CONFIG
 from optimade.server.entry_collections.mongo import MongoCollection
 from optimade.server.query_params import EntryListingQueryParams, SingleEntryQueryParams
 from optimade.server.routers.utils import handle_response_fields, meta_values
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
+from aiida_optimade import __version__
+from aiida_optimade.common import LOGGER, normalize_cache_key
+from aiida_optimade.config import CONFIG as SERVER_CONFIG
 from aiida_optimade.entry_collections import AiidaCollection
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Type, Union
+    from typing import Any, AsyncIterator, Callable, Optional, Type, Union
+
+    from starlette.datastructures import MutableHeaders
+
+
+class TrustedJSONResponse(JSONResponse):
+    """JSON response for content that is not validated by a FastAPI response model
+
+    Pydantic models in the content are serialized like FastAPI does for response
+    models, i.e., excluding unset fields and using aliases.
+    """
+
+    def render(self, content: "Any") -> bytes:
+        return _dumps(content)
+
+
+def _dumps(content: "Any") -> bytes:
+    """Serialize `content` like `TrustedJSONResponse`"""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_json_default,
+    ).encode("utf-8")
+
+
+def _json_default(value: "Any") -> "Any":
+    """Serialize the types that are not supported by `json`"""
+    if isinstance(value, BaseModel):
+        return value.dict(exclude_unset=True, by_alias=True)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def use_trusted_serialization(
+    collection: "Union[AiidaCollection, MongoCollection]",
+) -> bool:
+    """Whether or not to serialize the response without validating the entries
+
+    A fraction (`trusted_serialization_validation_rate`) of the requests is still
+    validated.
+    """
+    if not (
+        SERVER_CONFIG.trusted_serialization and isinstance(collection, AiidaCollection)
+    ):
+        return False
+    if random.random() < SERVER_CONFIG.trusted_serialization_validation_rate:
+        LOGGER.debug("Validating the response (sampled).")
+        return False
+    return True
+
+
+def get_cache_headers(
+    collection: "Union[AiidaCollection, MongoCollection]", request: Request
+) -> "Optional[dict[str, str]]":
+    """The HTTP caching headers for the response to `request`
+
+    The `ETag` is a hash of the request path and query parameters, and the collection
+    watermark (number of served entities, highest PK, and latest modification time).
+    Hence, it changes whenever the served entities are added, removed, or modified,
+    without having to run the query.
+    Since `meta.time_stamp` differs between otherwise equal responses, it is a weak
+    `ETag`.
+    No `Last-Modified` header is sent, since removing entities does not change the
+    latest modification time of the remaining ones, and the database does not record
+    when entities were removed.
+
+    Returns:
+        The `ETag` and `Cache-Control` headers, or `None` if conditional requests are
+        disabled or not supported for `collection`.
+
+    """
+    if not (
+        SERVER_CONFIG.conditional_requests and isinstance(collection, AiidaCollection)
+    ):
+        return None
+
+    watermark = collection.watermark
+    key = normalize_cache_key(
+        [
+            __version__,
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            watermark,
+        ]
+    )
+    return {
+        "ETag": f'W/"{hashlib.sha256(key.encode()).hexdigest()[:32]}"',
+        "Cache-Control": SERVER_CONFIG.cache_control,
+    }
+
+
+def is_not_modified(request: Request, cache_headers: "dict[str, str]") -> bool:
+    """Whether or not the client's cached response is still valid, according to
+    its `If-None-Match` header
+
+    `ETag`s are compared weakly. `If-Modified-Since` is ignored, see
+    `get_cache_headers()`.
+    """
+    if_none_match = request.headers.get("if-none-match", None)
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = cache_headers["ETag"].removeprefix("W/")
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def _cacheable(
+    collection: "Union[AiidaCollection, MongoCollection]",
+    cache_headers: "Optional[dict[str, str]]",
+) -> "Optional[dict[str, str]]":
+    """The caching headers for the response to the latest query on `collection`
+
+    Responses that are incomplete, since OPTIMADE fields were left uncalculated, are
+    not stored by clients.
+    """
+    if cache_headers is not None and not collection.context.complete:
+        return {"Cache-Control": "no-store"}
+    return cache_headers
 
 
 def handle_pagination(
-    request: Request, more_data_available: bool, nresults: int
+    request: Request,
+    more_data_available: bool,
+    nresults: int,
+    page_cursors: "Optional[dict[str, Optional[str]]]" = None,
 ) -> dict:
-    """Handle pagination for request with number of results equal nresults"""
+    """Handle pagination for request with number of results equal nresults
+
+    If `page_cursors` are given, and the request does not use `page_offset` or
+    `page_number`, the pagination links use `page_below` ("prev") and `page_above`
+    ("next").
+    """
     from optimade.server.routers.utils import get_base_url
 
     pagination = {}
 
-    # "prev"
     parse_result = urllib.parse.urlparse(str(request.url))
     base_url = get_base_url(parse_result)
     query = urllib.parse.parse_qs(parse_result.query)
+
+    if page_cursors is not None and not {"page_offset", "page_number"} & set(query):
+        for key in ("page_above", "page_below"):
+            query.pop(key, None)
+        for link, key in (("prev", "page_below"), ("next", "page_above")):
+            pagination[link] = None
+            if page_cursors.get(link, None) is not None:
+                urlencoded = urllib.parse.urlencode(
+                    {**query, key: [page_cursors[link]]}, doseq=True
+                )
+                pagination[link] = f"{base_url}{parse_result.path}?{urlencoded}"
+        return pagination
+
+    # "prev"
     query["page_offset"] = int(query.get("page_offset", ["0"])[0]) - int(
         query.get("page_limit", [CONFIG.page_limit])[0]
     )
@@ -65,15 +228,33 @@ def get_entries(
     response: "Type[EntryResponseMany]",
     request: Request,
     params: EntryListingQueryParams,
-) -> EntryResponseMany:
-    """Generalized /{entry} endpoint getter"""
+    headers: "Optional[MutableHeaders]" = None,
+) -> "Union[EntryResponseMany, Response]":
+    """Generalized /{entry} endpoint getter
+
+    If the entries are trusted (see `use_trusted_serialization()`), they are neither
+    validated nor serialized through `response`, and a `TrustedJSONResponse` is
+    returned instead.
+
+    If the client's cached response is still valid (see `get_cache_headers()`), an
+    empty 304 Not Modified response is returned without querying the entries.
+    Otherwise, the caching headers are added to `headers`, i.e., the headers of the
+    response FastAPI creates from the returned response model.
+    """
+    cache_headers = get_cache_headers(collection, request)
+    if cache_headers is not None and is_not_modified(request, cache_headers):
+        return Response(status_code=304, headers=cache_headers)
+
+    trusted = use_trusted_serialization(collection)
     (
         results,
         data_returned,
         more_data_available,
         fields,
         include_fields,
-    ) = collection.find(params)
+    ) = (
+        collection.find(params, validate=False) if trusted else collection.find(params)
+    )
 
     if results is None:
         nresults = 0
@@ -91,6 +272,7 @@ def get_entries(
             request=request,
             more_data_available=more_data_available,
             nresults=nresults,
+            page_cursors=getattr(collection, "page_cursors", None),
         )
 
     if (fields or include_fields) and results:
@@ -98,17 +280,22 @@ def get_entries(
             results=results, exclude_fields=fields, include_fields=include_fields
         )
 
-    return response(
-        links=ToplevelLinks(**pagination),
-        data=results,
-        meta=meta_values(
-            url=request.url,
-            data_returned=data_returned,
-            data_available=len(collection),
-            more_data_available=more_data_available,
-            schema=CONFIG.schema_url,
-        ),
+    links = ToplevelLinks(**pagination)
+    meta = meta_values(
+        url=request.url,
+        data_returned=data_returned,
+        data_available=len(collection),
+        more_data_available=more_data_available,
+        schema=CONFIG.schema_url,
     )
+    cache_headers = _cacheable(collection, cache_headers)
+    if trusted:
+        return TrustedJSONResponse(
+            {"links": links, "data": results, "meta": meta}, headers=cache_headers
+        )
+    if headers is not None and cache_headers:
+        headers.update(cache_headers)
+    return response(links=links, data=results, meta=meta)
 
 
 def get_single_entry(
@@ -117,16 +304,42 @@ def get_single_entry(
     response: "Type[EntryResponseOne]",
     request: Request,
     params: SingleEntryQueryParams,
-) -> EntryResponseOne:
-    """Generalized /{entry}/{entry_id} endpoint getter"""
-    params.filter = f'id="{entry_id}"'
-    (
-        results,
-        data_returned,
-        more_data_available,
-        fields,
-        include_fields,
-    ) = collection.find(params)
+    headers: "Optional[MutableHeaders]" = None,
+) -> "Union[EntryResponseOne, Response]":
+    """Generalized /{entry}/{entry_id} endpoint getter
+
+    For an `AiidaCollection`, the entry is retrieved directly by its PK, see
+    `AiidaCollection.find_by_id()`.
+    See `get_entries()` for the handling of trusted entries and conditional requests.
+    A 304 Not Modified response is only returned if the entry exists, e.g., since
+    `If-None-Match: *` only matches an existing entry.
+    """
+    cache_headers = get_cache_headers(collection, request)
+    if (
+        cache_headers is not None
+        and is_not_modified(request, cache_headers)
+        and collection.entry_exists(int(entry_id))
+    ):
+        return Response(status_code=304, headers=cache_headers)
+
+    trusted = use_trusted_serialization(collection)
+    if isinstance(collection, AiidaCollection):
+        (
+            results,
+            data_returned,
+            more_data_available,
+            fields,
+            include_fields,
+        ) = collection.find_by_id(int(entry_id), params, validate=not trusted)
+    else:
+        params.filter = f'id="{entry_id}"'
+        (
+            results,
+            data_returned,
+            more_data_available,
+            fields,
+            include_fields,
+        ) = collection.find(params)
 
     if more_data_available:
         raise HTTPException(
@@ -140,19 +353,180 @@ def get_single_entry(
             results=results, exclude_fields=fields, include_fields=include_fields
         )[0]
 
-    return response(
-        links=ToplevelLinks(next=None),
-        data=results,
-        meta=meta_values(
-            url=request.url,
-            data_returned=data_returned,
-            data_available=len(collection),
-            more_data_available=more_data_available,
-            schema=CONFIG.schema_url,
-        ),
+    links = ToplevelLinks(next=None)
+    meta = meta_values(
+        url=request.url,
+        data_returned=data_returned,
+        data_available=len(collection),
+        more_data_available=more_data_available,
+        schema=CONFIG.schema_url,
+    )
+    cache_headers = _cacheable(collection, cache_headers)
+    if trusted:
+        return TrustedJSONResponse(
+            {"links": links, "data": results, "meta": meta}, headers=cache_headers
+        )
+    if headers is not None and cache_headers:
+        headers.update(cache_headers)
+    return response(links=links, data=results, meta=meta)
+
+
+def use_streaming(
+    collection: "Union[AiidaCollection, MongoCollection]",
+    params: EntryListingQueryParams,
+) -> bool:
+    """Whether or not to stream the response, see `stream_entries()`"""
+    return (
+        SERVER_CONFIG.streaming_page_limit is not None
+        and isinstance(collection, AiidaCollection)
+        and params.page_limit >= SERVER_CONFIG.streaming_page_limit
     )
 
 
+class _StreamClosed(Exception):
+    """The client of a streamed response has gone away"""
+
+
+_END_OF_STREAM = object()
+
+# References to the running producers of streamed responses, see `stream_entries()`
+_STREAM_PRODUCERS: "set[asyncio.Future]" = set()
+
+
+async def stream_entries(
+    collection: AiidaCollection,
+    request: Request,
+    params: EntryListingQueryParams,
+) -> Response:
+    """Streaming /{entry} endpoint getter
+
+    The entries are retrieved with `AiidaCollection.iterfind()` in the database
+    executor, and serialized in batches of `streaming_batch_size` into the body of a
+    `StreamingResponse` as they are retrieved.
+    Only a few batches are buffered, so the memory used does not depend on the page
+    size.
+    Since `data_returned`, `more_data_available`, and the pagination links are only
+    known once all entries have been retrieved, `links` and `meta` follow `data` in
+    the JSON envelope.
+
+    Invalid parameters are raised as usual, before the response is started.
+    An error while streaming the entries ends the response prematurely, i.e., with
+    invalid JSON.
+    Conditional requests are handled like for `get_entries()`.
+    """
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=4)
+    closed = threading.Event()
+    batch_size = SERVER_CONFIG.streaming_batch_size
+
+    def emit(item: "Any") -> None:
+        """Pass `item` to the response, waiting while the buffer is full"""
+        if closed.is_set():
+            raise _StreamClosed()
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def produce() -> None:
+        """Run the query and serialize the response (in the database executor)"""
+        try:
+            cache_headers = get_cache_headers(collection, request)
+            if cache_headers is not None and is_not_modified(request, cache_headers):
+                emit(Response(status_code=304, headers=cache_headers))
+                return
+
+            entries, fields, include_fields = collection.iterfind(
+                params,
+                validate=not use_trusted_serialization(collection),
+                batch_size=batch_size,
+            )
+            emit(_cacheable(collection, cache_headers) or {})
+
+            nresults = 0
+            batch = []
+            for entry in entries:
+                if fields or include_fields:
+                    entry = handle_response_fields(
+                        results=[entry],
+                        exclude_fields=fields,
+                        include_fields=include_fields,
+                    )[0]
+                batch.append(_dumps(entry))
+                nresults += 1
+                if len(batch) == batch_size:
+                    emit((b"," if nresults > batch_size else b"") + b",".join(batch))
+                    batch = []
+            if batch:
+                emit((b"," if nresults > len(batch) else b"") + b",".join(batch))
+
+            context = collection.context
+            pagination = {}
+            if nresults:
+                pagination = handle_pagination(
+                    request=request,
+                    more_data_available=context.more_data_available,
+                    nresults=nresults,
+                    page_cursors=context.page_cursors,
+                )
+            meta = meta_values(
+                url=request.url,
+                data_returned=context.data_returned,
+                data_available=len(collection),
+                more_data_available=context.more_data_available,
+                schema=CONFIG.schema_url,
+            ).dict(exclude_unset=True, by_alias=True)
+            warnings = getattr(request.state, "optimade_warnings", None)
+            if warnings:
+                meta["warnings"] = warnings
+            emit(
+                b'],"links":'
+                + _dumps(ToplevelLinks(**pagination))
+                + b',"meta":'
+                + _dumps(meta)
+                + b"}"
+            )
+            emit(_END_OF_STREAM)
+        except _StreamClosed:
+            LOGGER.debug("Stopped streaming the response, the client has gone away.")
+        except Exception as exc:  # pylint: disable=broad-except
+            try:
+                emit(exc)
+            except _StreamClosed:
+                pass
+
+    producer = asyncio.ensure_future(run_in_db_executor(request, produce))
+    _STREAM_PRODUCERS.add(producer)
+    producer.add_done_callback(_STREAM_PRODUCERS.discard)
+
+    async def close() -> None:
+        """Stop the producer, which may be waiting for the buffer"""
+        closed.set()
+        while not queue.empty():
+            queue.get_nowait()
+
+    first = await queue.get()
+    if isinstance(first, Exception):
+        await close()
+        raise first
+    if isinstance(first, Response):
+        await close()
+        return first
+
+    async def body() -> "AsyncIterator[bytes]":
+        try:
+            yield b'{"data":['
+            while True:
+                item = await queue.get()
+                if item is _END_OF_STREAM:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            await close()
+
+    request.state.streaming = True
+    return StreamingResponse(body(), media_type="application/json", headers=first)
+
+
 def close_session(func):
     """Close AiiDA SQLAlchemy session
 
@@ -174,3 +548,19 @@ def close_session(func):
         return value
 
     return wrapper
+
+
+async def run_in_db_executor(
+    request: Request, func: "Callable[..., Any]", *args, **kwargs
+) -> "Any":
+    """Run the database work of a request
+
+    The work is run in the bounded database executor set up when starting the server,
+    where each thread reuses its AiiDA SQLAlchemy session between requests.
+    If there is no executor, e.g., since the startup event has not been run, the work
+    is run in FastAPI's threadpool, closing the session afterwards.
+    """
+    executor = getattr(request.app.state, "db_executor", None)
+    if executor is None:
+        return await run_in_threadpool(close_session(func), *args, **kwargs)
+    return await executor.run(func, *args, **kwargs)
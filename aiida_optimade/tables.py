@@ -0,0 +1,440 @@
+"""Materialized OPTIMADE structures table
+
+Instead of querying the OPTIMADE fields stored in the Node extras through JSONB
+lookups (casting every row), the fields can be materialized in a dedicated, typed,
+and indexed table within the AiiDA PostgreSQL database.
+Filters and sorting on these fields are then served by regular B-tree and GIN
+indexes.
+"""
+
+import uuid
+from typing import TYPE_CHECKING
+
+from aiida.manage.manager import get_manager
+from aiida.storage.psql_dos.models.group import DbGroup, DbGroupNode
+from aiida.storage.psql_dos.models.node import DbNode
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    and_,
+    func,
+    not_,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
+from aiida_optimade.common.logger import LOGGER
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Optional
+
+    from sqlalchemy.orm import Session
+    from sqlalchemy.sql import ColumnElement
+
+__all__ = ("StructuresTable", "UnsupportedQuery")
+
+
+class UnsupportedQuery(Exception):
+    """The query cannot be expressed in terms of the materialized table."""
+
+
+METADATA = MetaData()
+
+STRUCTURES_TABLE = Table(
+    "aiida_optimade_structures",
+    METADATA,
+    Column(
+        "node_id",
+        Integer,
+        ForeignKey(DbNode.__table__.c.id, ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    # The Node's `mtime` when the row was written, used to detect outdated rows
+    Column("node_mtime", DateTime(timezone=True), nullable=False),
+    Column("elements", ARRAY(Text)),
+    Column("nelements", Integer),
+    Column("elements_ratios", ARRAY(Float)),
+    Column("chemical_formula_descriptive", Text),
+    Column("chemical_formula_reduced", Text),
+    Column("chemical_formula_hill", Text),
+    Column("chemical_formula_anonymous", Text),
+    Column("dimension_types", ARRAY(Integer)),
+    Column("nperiodic_dimensions", Integer),
+    Column("nsites", Integer),
+    Column("species_at_sites", ARRAY(Text)),
+    Column("structure_features", ARRAY(Text)),
+    Index("ix_aiida_optimade_structures_elements", "elements", postgresql_using="gin"),
+    Index("ix_aiida_optimade_structures_nelements", "nelements"),
+    Index("ix_aiida_optimade_structures_nsites", "nsites"),
+    Index(
+        "ix_aiida_optimade_structures_chemical_formula_reduced",
+        "chemical_formula_reduced",
+    ),
+    Index(
+        "ix_aiida_optimade_structures_chemical_formula_anonymous",
+        "chemical_formula_anonymous",
+    ),
+)
+
+
+class StructuresTable:
+    """Query and maintain the materialized OPTIMADE structures table
+
+    Parameters:
+        entities: The AiiDA Node types served.
+        group: The label of the AiiDA Group to which the served Nodes belong.
+            If `None`, all Nodes of the given `entities` are served.
+        project_prefix: The prefix of the backend fields stored in the Node extras,
+            e.g., `"extras.optimade."`.
+
+    """
+
+    table = STRUCTURES_TABLE
+
+    # Backend fields that are Node columns
+    NODE_COLUMNS = {"id", "uuid", "node_type", "mtime", "ctime"}
+
+    def __init__(
+        self,
+        entities: list[str],
+        group: "Optional[str]" = None,
+        project_prefix: str = "extras.optimade.",
+    ):
+        self.entities = entities
+        self.group = group
+        self.project_prefix = project_prefix
+
+    @property
+    def fields(self) -> list[str]:
+        """The OPTIMADE fields stored in the table"""
+        return [
+            _.name
+            for _ in self.table.columns
+            if _.name not in ("node_id", "node_mtime")
+        ]
+
+    @staticmethod
+    def _get_session() -> "Session":
+        """The SQLAlchemy session used by AiiDA"""
+        return get_manager().get_profile_storage().get_session()
+
+    def exists(self) -> bool:
+        """Whether or not the table exists in the database"""
+        from sqlalchemy import inspect
+
+        return inspect(self._get_session().get_bind()).has_table(self.table.name)
+
+    def create(self) -> None:
+        """Create the table and its indexes, if they do not already exist"""
+        LOGGER.debug("Creating table %s.", self.table.name)
+        session = self._get_session()
+        self.table.create(bind=session.connection(), checkfirst=True)
+        session.commit()
+
+    def drop(self) -> None:
+        """Drop the table, if it exists"""
+        LOGGER.debug("Dropping table %s.", self.table.name)
+        session = self._get_session()
+        self.table.drop(bind=session.connection(), checkfirst=True)
+        session.commit()
+
+    def upsert(self, rows: list[dict[str, "Any"]]) -> None:
+        """Insert or update rows
+
+        Parameters:
+            rows: Dictionaries with the keys `node_id`, `node_mtime`, and any of the
+                OPTIMADE `fields`. Float values may be given as hex strings.
+
+        """
+        if not rows:
+            return
+        rows = [
+            {
+                "node_id": row["node_id"],
+                "node_mtime": row["node_mtime"],
+                **{
+                    field: self._python_value(field, row.get(field, None))
+                    for field in self.fields
+                },
+            }
+            for row in rows
+        ]
+        statement = insert(self.table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.table.c.node_id],
+            set_={
+                name: statement.excluded[name] for name in rows[0] if name != "node_id"
+            },
+        )
+        LOGGER.debug("Upserting %d rows in table %s.", len(rows), self.table.name)
+        session = self._get_session()
+        session.execute(statement, rows)
+        session.commit()
+
+    def outdated_node_ids(self) -> list[int]:
+        """The PKs of served Nodes without an up-to-date row in the table"""
+        query = self._select(DbNode.id, outer=True).where(
+            or_(
+                self.table.c.node_id.is_(None),
+                self.table.c.node_mtime < DbNode.mtime,
+            )
+        )
+        return [pk for (pk,) in self._get_session().execute(query)]
+
+    def find_ids(
+        self,
+        filters: "Optional[dict]" = None,
+        order_by: "Optional[list[dict[str, dict[str, str]]]]" = None,
+        limit: "Optional[int]" = None,
+        offset: "Optional[int]" = None,
+    ) -> list[int]:
+        """Retrieve the PKs of the Nodes matching the QueryBuilder-style `filters`
+
+        Raises:
+            UnsupportedQuery: If the filters or ordering cannot be expressed in
+                terms of the table columns, or do not use the table, see
+                `_check_uses_table()`.
+
+        """
+        self._check_uses_table(filters, order_by)
+        query = self._select(DbNode.id, outer=True)
+        if filters:
+            query = query.where(self.compile_filters(filters))
+        query = query.order_by(*self.compile_order_by(order_by))
+        if limit is not None:
+            query = query.limit(limit)
+        if offset:
+            query = query.offset(offset)
+        LOGGER.debug("Using %s to get the PKs of found entries.", self.table.name)
+        return [pk for (pk,) in self._get_session().execute(query)]
+
+    def count(self, filters: "Optional[dict]" = None) -> int:
+        """Count the Nodes matching the QueryBuilder-style `filters`
+
+        Raises:
+            UnsupportedQuery: If the filters cannot be expressed in terms of the
+                table columns, or do not use the table, see `_check_uses_table()`.
+
+        """
+        self._check_uses_table(filters)
+        query = self._select(func.count(DbNode.id), outer=True)
+        if filters:
+            query = query.where(self.compile_filters(filters))
+        LOGGER.debug("Using %s to COUNT all found entries.", self.table.name)
+        return self._get_session().execute(query).scalar()
+
+    def _check_uses_table(
+        self,
+        filters: "Optional[dict]" = None,
+        order_by: "Optional[list[dict[str, dict[str, str]]]]" = None,
+    ) -> None:
+        """Ensure the filters or ordering use a column of the table
+
+        Served Nodes may not (yet) have a row in the table, e.g., if their OPTIMADE
+        fields have not been calculated. Hence, queries only using Node columns are
+        left to the QueryBuilder, and the table is outer joined, so these Nodes are
+        only missing from the results if they do not match a filter on the table.
+
+        Raises:
+            UnsupportedQuery: If neither the filters nor the ordering use the table.
+
+        """
+        fields = self._filter_fields(filters or {})
+        fields.update(field for sort_field in order_by or [] for field in sort_field)
+        if all(field in self.NODE_COLUMNS for field in fields):
+            raise UnsupportedQuery(f"The query does not use {self.table.name}")
+
+    def _filter_fields(self, filters: dict) -> set[str]:
+        """The backend fields in QueryBuilder-style `filters`"""
+        fields = set()
+        for key, value in filters.items():
+            if key in ("and", "or", "!and", "!or"):
+                for nested in value:
+                    fields.update(self._filter_fields(nested))
+            else:
+                fields.add(key)
+        return fields
+
+    def _select(self, *columns, outer: bool = False):
+        """Select `columns` from the served Nodes joined with the table"""
+        from_clause = DbNode.__table__.join(
+            self.table, self.table.c.node_id == DbNode.id, isouter=outer
+        )
+        query = select(*columns).select_from(from_clause)
+        if self.group:
+            query = (
+                query.join(DbGroupNode, DbGroupNode.dbnode_id == DbNode.id)
+                .join(DbGroup, DbGroup.id == DbGroupNode.dbgroup_id)
+                .where(DbGroup.label == self.group)
+            )
+        return query.where(DbNode.node_type.in_(self.entities))
+
+    def _column(self, field: str) -> "ColumnElement":
+        """The column for a backend field"""
+        if field in self.NODE_COLUMNS:
+            return getattr(DbNode, field)
+        if field.startswith(self.project_prefix):
+            name = field[len(self.project_prefix) :]
+            if name in self.fields:
+                return self.table.c[name]
+        raise UnsupportedQuery(f"{field!r} is not a column of {self.table.name}")
+
+    def _python_value(self, field: str, value: "Any") -> "Any":
+        """Convert a value from the extras or a filter to the column's Python type
+
+        Floats may be stored as hex strings in the extras and the transformed
+        filters.
+        """
+        if value is None:
+            return None
+        if field == "uuid" and not isinstance(value, uuid.UUID):
+            try:
+                return uuid.UUID(str(value))
+            except ValueError as exc:
+                raise UnsupportedQuery(f"Invalid UUID: {value!r}") from exc
+        if field.startswith(self.project_prefix):
+            field = field[len(self.project_prefix) :]
+        column = self.table.c[field] if field in self.fields else None
+        if column is None:
+            return value
+
+        column_type = column.type
+        if isinstance(column_type, ARRAY):
+            if not isinstance(value, (list, tuple)):
+                raise UnsupportedQuery(f"Expected a list for {field!r}: {value!r}")
+            column_type = column_type.item_type
+            return [self._convert_scalar(column_type, _) for _ in value]
+        return self._convert_scalar(column_type, value)
+
+    @staticmethod
+    def _convert_scalar(column_type: "Any", value: "Any") -> "Any":
+        """Convert a single value to the Python type of `column_type`"""
+        if value is None:
+            return None
+        try:
+            if isinstance(column_type, (Float, Integer)) and isinstance(value, str):
+                if "0x" not in value.lower():
+                    raise UnsupportedQuery(f"Expected a number: {value!r}")
+                value = float.fromhex(value)
+            if isinstance(column_type, Integer) and float(value).is_integer():
+                return int(value)
+            if isinstance(column_type, Text) and not isinstance(value, str):
+                raise UnsupportedQuery(f"Expected a string: {value!r}")
+        except (TypeError, ValueError) as exc:
+            raise UnsupportedQuery(f"Invalid value: {value!r}") from exc
+        return value
+
+    def compile_filters(self, filters: dict) -> "ColumnElement":
+        """Compile QueryBuilder-style `filters` into an SQL expression
+
+        Raises:
+            UnsupportedQuery: If the filters cannot be expressed in terms of the
+                table columns.
+
+        """
+        expressions = []
+        for key, value in filters.items():
+            if key in ("and", "or", "!and", "!or"):
+                expressions.append(
+                    self._combine(key, [self.compile_filters(_) for _ in value])
+                )
+            else:
+                expressions.append(self._compile_field(key, value))
+        return and_(*expressions) if len(expressions) > 1 else expressions[0]
+
+    @staticmethod
+    def _combine(key: str, expressions: list) -> "ColumnElement":
+        """Combine `expressions` according to a QueryBuilder logical operator"""
+        combined = (and_ if key.endswith("and") else or_)(*expressions)
+        return not_(combined) if key.startswith("!") else combined
+
+    def _compile_field(self, field: str, spec: "Any") -> "ColumnElement":
+        """Compile the filter `spec` for a single backend field"""
+        if not isinstance(spec, dict):
+            spec = {"==": spec}
+
+        column = self._column(field)
+        expressions = []
+        for operator, value in spec.items():
+            if operator in ("and", "or", "!and", "!or"):
+                expressions.append(
+                    self._combine(
+                        operator, [self._compile_field(field, _) for _ in value]
+                    )
+                )
+                continue
+
+            negate = operator.startswith(("!", "~")) and operator != "!=="
+            operator = operator.lstrip("!~") if negate else operator
+            expression = self._compile_operator(field, column, operator, value)
+            expressions.append(not_(expression) if negate else expression)
+        return and_(*expressions) if len(expressions) > 1 else expressions[0]
+
+    def _compile_operator(  # pylint: disable=too-many-return-statements
+        self, field: str, column: "ColumnElement", operator: str, value: "Any"
+    ) -> "ColumnElement":
+        """Compile a single QueryBuilder operator"""
+        is_array = isinstance(column.type, ARRAY)
+
+        if operator in ("==", "!==") and value is None:
+            return column.is_(None) if operator == "==" else column.isnot(None)
+        if operator in ("of_length", "longer", "shorter"):
+            if not is_array:
+                raise UnsupportedQuery(f"{operator!r} requires a list field")
+            length = func.cardinality(column)
+            return {
+                "of_length": length == value,
+                "longer": length > value,
+                "shorter": length < value,
+            }[operator]
+        if operator == "contains":
+            if not is_array:
+                raise UnsupportedQuery(f"'contains' requires a list field: {field!r}")
+            return column.contains(self._python_value(field, value))
+        if is_array:
+            raise UnsupportedQuery(f"{operator!r} is not supported for {field!r}")
+        if operator == "in":
+            return column.in_([self._python_value(field, _) for _ in value])
+        if operator in ("like", "ilike"):
+            return getattr(column, operator)(value)
+
+        value = self._python_value(field, value)
+        comparisons = {
+            "==": column.__eq__,
+            "!==": column.__ne__,
+            "<": column.__lt__,
+            "<=": column.__le__,
+            ">": column.__gt__,
+            ">=": column.__ge__,
+        }
+        if operator not in comparisons:
+            raise UnsupportedQuery(f"Operator {operator!r} is not supported")
+        return comparisons[operator](value)
+
+    def compile_order_by(
+        self, order_by: "Optional[list[dict[str, dict[str, str]]]]"
+    ) -> list:
+        """Compile a QueryBuilder-style `order_by` into SQL ordering clauses
+
+        Raises:
+            UnsupportedQuery: If the ordering cannot be expressed in terms of the
+                table columns.
+
+        """
+        if not order_by:
+            return [DbNode.id.asc()]
+        clauses = []
+        for sort_field in order_by:
+            for field, spec in sort_field.items():
+                order = spec.get("order", "asc") if isinstance(spec, dict) else spec
+                column = self._column(field)
+                clauses.append(column.desc() if order == "desc" else column.asc())
+        return clauses
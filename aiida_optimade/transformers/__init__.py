@@ -1,4 +1,5 @@
 # pylint: disable=undefined-variable
 from .aiida import *  # noqa: F403
+from .optimizer import *  # noqa: F403
 
-__all__ = aiida.__all__  # noqa: F405
+__all__ = aiida.__all__ + optimizer.__all__  # noqa: F405
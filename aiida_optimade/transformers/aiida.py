@@ -1,4 +1,6 @@
 # pylint: disable=no-self-use,too-many-public-methods
+from typing import Union
+
 from lark import v_args
 from optimade.filtertransformers import BaseTransformer, Quantity
 from optimade.server.exceptions import BadRequest
@@ -21,6 +23,25 @@ class AiidaTransformer(BaseTransformer):
     }
     list_operator_map = {"<": "shorter", ">": "longer", "=": "of_length"}
 
+    # The backend field of properties that are treated as UNKNOWN
+    UNKNOWN_PROPERTY = "attributes.something.non.existing"
+
+    def __init__(self, mapper=None, native_floats: bool = False):
+        """Initialise the transformer
+
+        Parameters:
+            mapper: A resource mapper object defining the aliases and units.
+            native_floats: Whether float values are stored as JSON numbers in AiiDA.
+                Otherwise, they are stored (and compared) as hex strings.
+
+        """
+        super().__init__(mapper=mapper)
+        self.native_floats = native_floats
+
+    def _float(self, number) -> Union[float, str]:
+        """Represent a float value as it is stored in AiiDA"""
+        return float(number) if self.native_floats else float(number).hex()
+
     def value_list(self, arg):
         """value_list: [ OPERATOR ] value ( "," [ OPERATOR ] value )*"""
         for value in arg:
@@ -206,7 +227,7 @@ class AiidaTransformer(BaseTransformer):
             # The quantity is either an entry type (indicating a relationship filter)
             # or a provider-specific property that does not match any known provider.
             # In any case, this will be treated as UNKNOWN.
-            quantity = "attributes.something.non.existing"
+            quantity = self.UNKNOWN_PROPERTY
         elif isinstance(quantity, Quantity):
             quantity = ".".join([quantity.backend_field] + args[1:])
         else:
@@ -224,21 +245,23 @@ class AiidaTransformer(BaseTransformer):
         """
         signed_float: SIGNED_FLOAT
 
-        All floats values are converted and stored as hex strings in AiiDA.
+        All floats values are converted and stored as hex strings in AiiDA, unless
+        they are stored as native floats.
         """
-        return float(number).hex()
+        return self._float(number)
 
     @v_args(inline=True)
     def number(self, number):
         """
         number: SIGNED_INT | SIGNED_FLOAT
 
-        All floats values are converted and stored as hex strings in AiiDA.
+        All floats values are converted and stored as hex strings in AiiDA, unless
+        they are stored as native floats.
         """
         if number.type == "SIGNED_INT":
             return int(number)
         if number.type == "SIGNED_FLOAT":
-            return float(number).hex()
+            return self._float(number)
 
         raise NotImplementedError(
             f"number: {number} (type: {number.type}) does not seem to be a SIGNED_INT "
@@ -0,0 +1,199 @@
+from typing import Any, Optional, Union
+
+from aiida_optimade.common import normalize_cache_key
+
+__all__ = ("FilterOptimizer",)
+
+# A filter is represented by a tree of terms while optimizing it:
+# ("leaf", field, operator, value), ("and", [terms]), ("or", [terms]), ("not", term)
+Term = tuple
+
+LOGICAL_OPERATORS = ("and", "or", "!and", "!or")
+
+
+class FilterOptimizer:
+    """Rewrite the QueryBuilder filters of `AiidaTransformer` into an equivalent,
+    more index-friendly form
+
+    The following rewrites are done:
+
+    - Nested `and` and `or` are flattened, single-child ones are removed, double
+      negations are removed, and duplicate operands are dropped.
+    - `LENGTH` comparisons on list fields with a length alias (e.g., `elements` and
+      `nelements`) become comparisons of the alias, which is a plain number (and an
+      indexed column of the materialized structures table).
+    - A disjunction of `>` (or `<`) and `==` with the same value becomes `>=`
+      (or `<=`), e.g., for `LENGTH >=`.
+    - A disjunction of equalities of the same field becomes a single `in`.
+
+    Parameters:
+        length_aliases: Backend fields of list properties mapped to the backend field
+            holding their length, e.g., `"extras.optimade.elements"` to
+            `"extras.optimade.nelements"`.
+
+    """
+
+    LENGTH_OPERATORS = {"of_length": "==", "longer": ">", "shorter": "<"}
+
+    def __init__(self, length_aliases: Optional[dict[str, str]] = None):
+        self.length_aliases = length_aliases or {}
+
+    def optimize(self, filters: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        """Return the optimized equivalent of `filters`"""
+        if not filters:
+            return filters
+        return self._to_filters(self._simplify(self._parse(filters)))
+
+    def _parse(self, filters: dict[str, Any]) -> Term:
+        """Parse QueryBuilder `filters` into a tree of terms"""
+        terms = []
+        for key, value in filters.items():
+            if key in LOGICAL_OPERATORS:
+                terms.append(self._logical(key, [self._parse(_) for _ in value]))
+            else:
+                terms.append(self._parse_spec(key, value))
+        return self._logical("and", terms)
+
+    def _parse_spec(self, field: str, spec: Any) -> Term:
+        """Parse the filter `spec` of a single backend field"""
+        if not isinstance(spec, dict):
+            return self._leaf(field, "==", spec)
+        terms = []
+        for operator, value in spec.items():
+            if operator in LOGICAL_OPERATORS:
+                terms.append(
+                    self._logical(operator, [self._parse_spec(field, _) for _ in value])
+                )
+            else:
+                terms.append(self._leaf(field, operator, value))
+        return self._logical("and", terms)
+
+    def _leaf(self, field: str, operator: str, value: Any) -> Term:
+        """A single comparison, where `LENGTH` comparisons use the length alias"""
+        if (
+            field in self.length_aliases
+            and operator in self.LENGTH_OPERATORS
+            and type(value) is int  # pylint: disable=unidiomatic-typecheck
+        ):
+            return (
+                "leaf",
+                self.length_aliases[field],
+                self.LENGTH_OPERATORS[operator],
+                value,
+            )
+        return ("leaf", field, operator, value)
+
+    @staticmethod
+    def _logical(operator: str, terms: list[Term]) -> Term:
+        """Combine `terms` according to a QueryBuilder logical operator"""
+        term = ("and" if operator.endswith("and") else "or", terms)
+        return ("not", term) if operator.startswith("!") else term
+
+    def _simplify(self, term: Term) -> Term:
+        """Simplify the tree of terms bottom-up"""
+        if term[0] == "leaf":
+            return term
+        if term[0] == "not":
+            operand = self._simplify(term[1])
+            return operand[1] if operand[0] == "not" else ("not", operand)
+
+        operator, operands = term
+        flattened = []
+        for operand in (self._simplify(_) for _ in operands):
+            flattened.extend(operand[1] if operand[0] == operator else [operand])
+        flattened = self._unique(flattened)
+        if operator == "or":
+            # Merging may result in duplicates, e.g., `>=` already in the disjunction
+            flattened = self._unique(
+                self._merge_equalities(self._merge_ranges(flattened))
+            )
+        return flattened[0] if len(flattened) == 1 else (operator, flattened)
+
+    @classmethod
+    def _unique(cls, operands: list[Term]) -> list[Term]:
+        """Remove duplicate operands, keeping the first occurrence"""
+        unique = {}
+        for operand in operands:
+            unique.setdefault(normalize_cache_key(cls._to_filters(operand)), operand)
+        return list(unique.values())
+
+    @staticmethod
+    def _merge_ranges(operands: list[Term]) -> list[Term]:
+        """Merge `>` (or `<`) and `==` of the same field and value into `>=` (or `<=`)
+        in a disjunction"""
+        equalities = {
+            (operand[1], normalize_cache_key(operand[3])): index
+            for index, operand in enumerate(operands)
+            if operand[0] == "leaf" and operand[2] == "==" and operand[3] is not None
+        }
+        merged: list[Optional[Term]] = list(operands)
+        for index, operand in enumerate(operands):
+            if operand[0] != "leaf" or operand[2] not in ("<", ">"):
+                continue
+            equality = equalities.pop(
+                (operand[1], normalize_cache_key(operand[3])), None
+            )
+            if equality is not None:
+                merged[index] = ("leaf", operand[1], f"{operand[2]}=", operand[3])
+                merged[equality] = None
+        return [operand for operand in merged if operand is not None]
+
+    @classmethod
+    def _merge_equalities(cls, operands: list[Term]) -> list[Term]:
+        """Merge the equalities of the same field into `in` in a disjunction
+
+        Only values of the same JSON type are merged, since the QueryBuilder casts
+        JSON values according to the type of the first value of an `in`.
+        """
+        merged: list[Term] = []
+        groups: dict[tuple[str, str], int] = {}
+        for operand in operands:
+            json_type, values = cls._equal_values(operand)
+            if json_type is None:
+                merged.append(operand)
+                continue
+            group = (operand[1], json_type)
+            if group not in groups:
+                groups[group] = len(merged)
+                merged.append(operand)
+                continue
+            _, merged_values = cls._equal_values(merged[groups[group]])
+            keys = {normalize_cache_key(_) for _ in merged_values}
+            merged_values.extend(
+                value for value in values if normalize_cache_key(value) not in keys
+            )
+            merged[groups[group]] = ("leaf", operand[1], "in", merged_values)
+        return merged
+
+    @staticmethod
+    def _equal_values(operand: Term) -> tuple[Optional[str], list]:
+        """The JSON type and values of an `==` or `in` comparison of scalars of a
+        single JSON type"""
+        if operand[0] != "leaf" or operand[2] not in ("==", "in"):
+            return None, []
+        values = list(operand[3]) if operand[2] == "in" else [operand[3]]
+        json_types = set()
+        for value in values:
+            if isinstance(value, bool):
+                json_types.add("boolean")
+            elif isinstance(value, (int, float)):
+                json_types.add("number")
+            elif isinstance(value, str):
+                json_types.add("string")
+            else:
+                return None, []
+        if len(json_types) != 1:
+            return None, []
+        return json_types.pop(), values
+
+    @classmethod
+    def _to_filters(cls, term: Term) -> dict[str, Union[list, dict]]:
+        """Represent a tree of terms as QueryBuilder filters"""
+        if term[0] == "leaf":
+            return {term[1]: {term[2]: term[3]}}
+        if term[0] == "not":
+            operand = term[1]
+            if operand[0] in ("and", "or"):
+                return {f"!{operand[0]}": [cls._to_filters(_) for _ in operand[1]]}
+            return {"!and": [cls._to_filters(operand)]}
+        return {term[0]: [cls._to_filters(_) for _ in term[1]]}
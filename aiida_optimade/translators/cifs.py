@@ -1,31 +1,100 @@
-from typing import Union
+from functools import lru_cache
+from importlib.metadata import version
+from io import StringIO
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 from aiida.orm.nodes.data.cif import CifData
 from aiida.orm.nodes.data.structure import StructureData
+from aiida.tools.data.cif import InvalidOccupationsError
 
+from aiida_optimade.common import (
+    LOGGER,
+    SqliteCache,
+    normalize_cache_key,
+    run_with_limits,
+)
+from aiida_optimade.common.logger import LOGS_DIR
+from aiida_optimade.config import CONFIG
 from aiida_optimade.translators.structures import StructureDataTranslator
 
+if TYPE_CHECKING:  # pragma: no cover
+    from pymatgen.core import Structure
+
 __all__ = ("CifDataTranslator",)
 
+# Persistent cache of the structures parsed from CIF files, see `_get_cif_cache()`
+CIF_CACHE_FILE = LOGS_DIR.joinpath("cif_structures.sqlite")
+_CIF_CACHE: Optional[SqliteCache] = None
 
-def _get_aiida_structure_pymatgen_inline(cif, **kwargs) -> StructureData:
-    """Copy of similar named function in AiiDA-Core.
+# The parameters used for parsing CIF files
+PARSER_PARAMETERS: dict[str, Any] = {}
 
-    Creates :py:class:`aiida.orm.nodes.data.structure.StructureData` using pymatgen.
 
-    :param occupancy_tolerance: If total occupancy of a site is between 1 and
-        occupancy_tolerance, the occupancies will be scaled down to 1.
-    :param site_tolerance: This tolerance is used to determine if two sites are sitting
-        in the same position, in which case they will be combined to a single
-        disordered site. Defaults to 1e-4.
+def _get_cif_cache() -> Optional[SqliteCache]:
+    """The cache of parsed CIF structures, or `None` if it is disabled"""
+    global _CIF_CACHE  # pylint: disable=global-statement
+    if not CONFIG.cif_cache:
+        return None
+    if _CIF_CACHE is None:
+        _CIF_CACHE = SqliteCache(filename=CIF_CACHE_FILE, table="cif_structures")
+    return _CIF_CACHE
+
+
+@lru_cache(maxsize=None)
+def _parser_version() -> str:
+    """The version of the CIF parser"""
+    return f"pymatgen=={version('pymatgen')}"
 
-    .. note:: requires pymatgen module.
 
+def cif_cache_key(md5: str, parameters: dict[str, Any]) -> str:
+    """The key of a CIF file with checksum `md5` parsed with `parameters`
+
+    The key includes the pymatgen version, since the parsed structure may differ
+    between versions.
     """
-    from aiida.tools.data.cif import InvalidOccupationsError
-    from pymatgen.io.cif import CifParser
+    return normalize_cache_key(
+        {
+            "md5": md5,
+            "parameters": parameters,
+            "parser": _parser_version(),
+        }
+    )
+
+
+def compact_structure(
+    kinds: list[dict], sites: list[dict], cell: list[list[float]], pbc: list[int]
+) -> dict[str, Any]:
+    """Represent a structure with the kind of each site as an index into `kinds`"""
+    kind_indices = {kind["name"]: index for index, kind in enumerate(kinds)}
+    return {
+        "kinds": kinds,
+        "site_kinds": [kind_indices[site["kind_name"]] for site in sites],
+        "positions": [list(site["position"]) for site in sites],
+        "cell": [list(vector) for vector in cell],
+        "pbc": pbc,
+    }
+
+
+def expand_structure(
+    compact: dict[str, Any]
+) -> tuple[list[dict], list[dict], list[list[float]], list[int]]:
+    """The kinds, sites, cell, and periodic boundary conditions of a structure
+    represented by `compact_structure()`"""
+    kinds = compact["kinds"]
+    sites = [
+        {"kind_name": kinds[index]["name"], "position": position}
+        for index, position in zip(compact["site_kinds"], compact["positions"])
+    ]
+    return kinds, sites, compact["cell"], compact["pbc"]
 
-    parameters = kwargs.get("parameters", {})
+
+def _parse_cif(content: str, parameters: dict[str, Any]) -> "Structure":
+    """Parse the first structure of a CIF file using pymatgen
+
+    Parsing is done without AiiDA, meaning it can be done in a separate process, see
+    `_get_aiida_structure_pymatgen_inline()`.
+    """
+    from pymatgen.io.cif import CifParser
 
     constructor_kwargs = {}
 
@@ -35,8 +104,7 @@ def _get_aiida_structure_pymatgen_inline(cif, **kwargs) -> StructureData:
         if argument in parameters:
             constructor_kwargs[argument] = parameters.pop(argument)
 
-    with cif.open() as handle:
-        parser = CifParser(handle, **constructor_kwargs)
+    parser = CifParser(StringIO(content), **constructor_kwargs)
 
     try:
         structures = parser.get_structures(**parameters)
@@ -44,8 +112,7 @@ def _get_aiida_structure_pymatgen_inline(cif, **kwargs) -> StructureData:
         # Verify whether the failure was due to wrong occupancy numbers
         try:
             constructor_kwargs["occupancy_tolerance"] = 1e10
-            with cif.open() as handle:
-                parser = CifParser(handle, **constructor_kwargs)
+            parser = CifParser(StringIO(content), **constructor_kwargs)
             structures = parser.get_structures(**parameters)
         except ValueError as exc_two:
             # If it still fails, the occupancies were not the reason for failure
@@ -59,7 +126,39 @@ def _get_aiida_structure_pymatgen_inline(cif, **kwargs) -> StructureData:
                 "occupation tolerance"
             ) from exc_one
 
-    return StructureData(pymatgen_structure=structures[0])
+    return structures[0]
+
+
+def _get_aiida_structure_pymatgen_inline(cif, **kwargs) -> StructureData:
+    """Copy of similar named function in AiiDA-Core.
+
+    Creates :py:class:`aiida.orm.nodes.data.structure.StructureData` using pymatgen.
+
+    The CIF file is parsed in a separate process under the `node_calculation_timeout`
+    and `node_calculation_max_memory` limits of the server configuration.
+
+    :param occupancy_tolerance: If total occupancy of a site is between 1 and
+        occupancy_tolerance, the occupancies will be scaled down to 1.
+    :param site_tolerance: This tolerance is used to determine if two sites are sitting
+        in the same position, in which case they will be combined to a single
+        disordered site. Defaults to 1e-4.
+
+    :raises CalculationLimitExceeded: If parsing the CIF file exceeds a limit.
+
+    .. note:: requires pymatgen module.
+
+    """
+    with cif.open() as handle:
+        content = handle.read()
+
+    structure = run_with_limits(
+        _parse_cif,
+        content,
+        kwargs.get("parameters", {}),
+        timeout=CONFIG.node_calculation_timeout,
+        max_memory=CONFIG.node_calculation_max_memory,
+    )
+    return StructureData(pymatgen_structure=structure)
 
 
 class CifDataTranslator(StructureDataTranslator):
@@ -79,9 +178,28 @@ class CifDataTranslator(StructureDataTranslator):
 
     AIIDA_ENTITY = CifData
 
-    def __init__(self, pk: str):
-        super().__init__(pk)
+    # The structure is parsed from the CIF file with fixed parameters
+    CONTENT_PROPERTIES = ["attributes.md5"]
+    # Also the errors of pymatgen when parsing malformed CIF files, see `_parse_cif()`
+    QUARANTINE_ERRORS = StructureDataTranslator.QUARANTINE_ERRORS + (
+        ValueError,
+        InvalidOccupationsError,
+    )
+
+    @classmethod
+    def content_version(cls) -> dict[str, Any]:
+        """The pymatgen version and the parameters used for parsing the CIF file,
+        since the content hash is only its MD5 checksum"""
+        return {
+            "parameters": PARSER_PARAMETERS,
+            "parser": _parser_version(),
+        }
+
+    def __init__(self, pk: str, properties: Optional[dict[str, Any]] = None):
+        # The StructureData properties are always created from the parsed CIF file
+        super().__init__(pk, properties=None)
 
+        self.__md5: Optional[str] = (properties or {}).get("attributes.md5")
         self.__kinds = None
         self.__sites = None
         self.__pbc = None
@@ -97,7 +215,9 @@ class CifDataTranslator(StructureDataTranslator):
             return self.__node
 
         extras = self.__node.extras.copy()
-        self.__node = _get_aiida_structure_pymatgen_inline(cif=self.__node)
+        self.__node = _get_aiida_structure_pymatgen_inline(
+            cif=self.__node, parameters=dict(PARSER_PARAMETERS)
+        )
         self.__node.set_extra_many(extras)
         return self.__node
 
@@ -107,26 +227,61 @@ class CifDataTranslator(StructureDataTranslator):
             del self.__node
         self.__node = value
 
+    def _load_structure(self) -> None:
+        """Retrieve the parsed structure from the CIF cache, or parse the CIF file
+
+        The CIF file is parsed (by loading the Node) only if its structure has not
+        been cached yet, in which case it is added to the cache.
+        """
+        cache = _get_cif_cache()
+        key = None
+        if cache is not None:
+            if self.__md5 is None:
+                self.__md5 = self._get_unique_node_property("attributes.md5")
+            if self.__md5:
+                key = cif_cache_key(self.__md5, PARSER_PARAMETERS)
+                compact = cache.get(key)
+                if compact is not None:
+                    LOGGER.debug("Using cached structure of CifData Node %s.", self._pk)
+                    (
+                        self.__kinds,
+                        self.__sites,
+                        self.__cell,
+                        self.__pbc,
+                    ) = expand_structure(compact)
+                    return
+
+        node = self._node
+        self.__kinds = [_.get_raw() for _ in node.kinds]
+        self.__sites = [_.get_raw() for _ in node.sites]
+        self.__pbc = [int(_) for _ in node.pbc]
+        self.__cell = node.cell.copy()
+        if key is not None:
+            cache.set(
+                key,
+                compact_structure(self.__kinds, self.__sites, self.__cell, self.__pbc),
+            )
+
     @property
     def _kinds(self) -> list:
-        if not self.__kinds or self.__kinds is None:
-            self.__kinds = [_.get_raw() for _ in self._node.kinds]
+        if not self.__kinds:
+            self._load_structure()
         return self.__kinds
 
     @property
     def _sites(self) -> list:
-        if not self.__sites or self.__sites is None:
-            self.__sites = [_.get_raw() for _ in self._node.sites]
+        if not self.__sites:
+            self._load_structure()
         return self.__sites
 
     @property
     def _pbc(self) -> list:
         if not self.__pbc:
-            self.__pbc = [int(_) for _ in self._node.pbc]
+            self._load_structure()
         return self.__pbc
 
     @property
     def _cell(self) -> list:
         if not self.__cell:
-            self.__cell = self._node.cell.copy()
+            self._load_structure()
         return self.__cell
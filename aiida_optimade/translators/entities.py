@@ -1,10 +1,18 @@
-from typing import Any, Union
+import hashlib
+import json
+from typing import Any, Optional, Union
 
 from aiida import orm
 from aiida.orm.nodes import Node
 from aiida.orm.querybuilder import QueryBuilder
 
-from aiida_optimade.common import LOGGER, AiidaEntityNotFound
+from aiida_optimade.common import (
+    LOGGER,
+    AiidaEntityNotFound,
+    AiidaError,
+    CalculationLimitExceeded,
+    OptimadeIntegrityError,
+)
 
 __all__ = ("AiidaEntityTranslator",)
 
@@ -17,13 +25,53 @@ class AiidaEntityTranslator:  # pylint: disable=too-few-public-methods
     """
 
     EXTRAS_KEY = "optimade"
+    # The Node extra marking a Node for which the attributes could not be calculated
+    QUARANTINE_KEY = "optimade_quarantine"
+    # The errors caused by the data of a Node, for which the Node is quarantined.
+    # Other errors are raised, since they are not fixed by skipping the Node.
+    QUARANTINE_ERRORS: tuple[type[Exception], ...] = (
+        AiidaError,
+        OptimadeIntegrityError,
+        CalculationLimitExceeded,
+    )
     AIIDA_ENTITY = Node  # This should be the front-end AiiDA Node class
 
+    # The Node properties fully determining the OPTIMADE attributes, see
+    # `content_hash()`. If empty, the attributes are calculated for every Node.
+    CONTENT_PROPERTIES: list[str] = []
+
     def __init__(self, pk: int):
         self._pk = pk
         self.new_attributes = {}
         self.__node = None
 
+    @classmethod
+    def content_hash(cls, properties: dict[str, Any]) -> Optional[str]:
+        """A hash of the `CONTENT_PROPERTIES` in `properties`
+
+        Nodes with the same hash have the same OPTIMADE attributes, meaning these
+        only have to be calculated once.
+        `None` if the Node cannot be identified by its content.
+        """
+        if not cls.CONTENT_PROPERTIES:
+            return None
+        values = [properties.get(_) for _ in cls.CONTENT_PROPERTIES]
+        if all(value is None for value in values):
+            return None
+        return hashlib.sha256(
+            json.dumps(values, sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()
+
+    @classmethod
+    def content_version(cls) -> dict[str, Any]:
+        """The versions and parameters, besides the content of a Node, that the
+        OPTIMADE attributes depend on, e.g., of an external parser
+
+        Attributes calculated for the same content hash under a different content
+        version must not be reused, see `content_hash()`.
+        """
+        return {}
+
     def _get_unique_node_property(
         self, project: Union[list[str], str]
     ) -> Union[Node, Any]:
@@ -1,17 +1,20 @@
 # pylint: disable=line-too-long,too-many-public-methods
 import itertools
+from functools import cached_property
 from math import fsum
-from typing import Any, Union
+from typing import Any, Optional, Union
 
+import numpy as np
 from aiida.orm.nodes.data.structure import StructureData
 from optimade.models.utils import ANONYMOUS_ELEMENTS
 
 from aiida_optimade.common import AiidaError, OptimadeIntegrityError
+from aiida_optimade.config import CONFIG
 from aiida_optimade.translators.entities import AiidaEntityTranslator
 from aiida_optimade.translators.utils import (
-    check_floating_round_errors,
-    floats_to_hex,
     hex_to_floats,
+    store_floats,
+    zero_round_errors,
 )
 
 __all__ = ("StructureDataTranslator",)
@@ -23,15 +26,35 @@ class StructureDataTranslator(AiidaEntityTranslator):
     Each OPTIMADE field is a method in this class.
 
     NOTE: This class succeeds in *never* loading the actual AiiDA Node for optimization purposes.
+
+    The intermediate results shared by several fields (the kind of each site, the
+    number of sites per kind, the weight of each element, and the positions as a
+    NumPy array) are calculated once per translator.
     """
 
     AIIDA_ENTITY = StructureData
 
+    # The Node properties needed to calculate all OPTIMADE fields
+    NODE_PROPERTIES = [
+        "attributes.kinds",
+        "attributes.sites",
+        "attributes.pbc1",
+        "attributes.pbc2",
+        "attributes.pbc3",
+        "attributes.cell",
+    ]
+    CONTENT_PROPERTIES = NODE_PROPERTIES
+
     # StructureData specific properties
-    def __init__(self, pk: str):
+    def __init__(self, pk: str, properties: Optional[dict[str, Any]] = None):
+        """Parameters:
+        pk: The Node's PK.
+        properties: Already retrieved `NODE_PROPERTIES` values, e.g., from a single
+            query for many Nodes. If not given, they are retrieved when needed.
+        """
         super().__init__(pk)
 
-        self.__properties = None
+        self.__properties = properties
 
     @property
     def _kinds(self) -> list:
@@ -60,16 +83,11 @@ class StructureDataTranslator(AiidaEntityTranslator):
         This is to ensure only a single QueryBuilder query is performed.
         """
         if not self.__properties:
-            properties = [
-                "attributes.kinds",
-                "attributes.sites",
-                "attributes.pbc1",
-                "attributes.pbc2",
-                "attributes.pbc3",
-                "attributes.cell",
-            ]
             self.__properties = dict(
-                zip(properties, self._get_unique_node_property(properties))
+                zip(
+                    self.NODE_PROPERTIES,
+                    self._get_unique_node_property(self.NODE_PROPERTIES),
+                )
             )
         return self.__properties.get(node_property)
 
@@ -91,35 +109,61 @@ class StructureDataTranslator(AiidaEntityTranslator):
 
         return any(kind_has_vacancies(kind["weights"]) for kind in self._kinds)
 
+    @cached_property
+    def _site_kinds(self) -> np.ndarray:
+        """The index in `_kinds` of the kind of each site"""
+        kind_indices = {}
+        for index, kind in enumerate(self._kinds):
+            kind_indices.setdefault(kind["name"], index)
+        try:
+            return np.fromiter(
+                (kind_indices[site["kind_name"]] for site in self._sites),
+                dtype=np.intp,
+                count=len(self._sites),
+            )
+        except KeyError as exc:
+            raise AiidaError(
+                f"kind with name {exc.args[0]} cannot be found amongst the kinds {self._kinds}"
+            ) from exc
+
+    @cached_property
+    def _kind_site_counts(self) -> list[int]:
+        """The number of sites of each kind in `_kinds`"""
+        return np.bincount(self._site_kinds, minlength=len(self._kinds)).tolist()
+
+    @cached_property
+    def _symbol_weights(self) -> dict[str, float]:
+        """The weights of all symbols, see `get_symbol_weights()`"""
+        occupation = {}.fromkeys(sorted(self.get_symbols_set()), 0.0)
+        for kind, number_of_sites in zip(self._kinds, self._kind_site_counts):
+            for symbol, weight in zip(kind["symbols"], kind["weights"]):
+                occupation[symbol] += weight * number_of_sites
+        return occupation
+
+    @cached_property
+    def _positions(self) -> np.ndarray:
+        """The Cartesian positions of the sites as an (nsites, 3) array"""
+        return np.array(
+            [site["position"] for site in self._sites], dtype=float
+        ).reshape(-1, 3)
+
     def get_formula(self, mode="hill", separator=""):
-        """Copy of aiida.orm.StructureData:get_formula()"""
+        """Copy of aiida.orm.StructureData:get_formula()
+
+        The symbols string is determined once per kind instead of once per site.
+        """
         from aiida.orm.nodes.data.structure import get_formula, get_symbols_string
 
-        kind = None
-        symbol_list = []
-        for site in self._sites:
-            for _kind in self._kinds:
-                if _kind["name"] == site["kind_name"]:
-                    kind = _kind
-                    break
-            else:
-                raise AiidaError(
-                    f"kind with name {site['kind_name']} cannot be found amongst the kinds {self._kinds}"
-                )
-            symbol_list.append(get_symbols_string(kind["symbols"], kind["weights"]))
+        kind_symbols = [
+            get_symbols_string(kind["symbols"], kind["weights"]) for kind in self._kinds
+        ]
+        symbol_list = [kind_symbols[index] for index in self._site_kinds.tolist()]
 
         return get_formula(symbol_list, mode=mode, separator=separator)
 
     def get_symbol_weights(self) -> dict:
         """Get weights of all symbols / chemical elements"""
-        occupation = {}.fromkeys(sorted(self.get_symbols_set()), 0.0)
-        for kind in self._kinds:
-            number_of_sites = len(
-                [_ for _ in self._sites if _["kind_name"] == kind["name"]]
-            )
-            for i in range(len(kind["symbols"])):
-                occupation[kind["symbols"][i]] += kind["weights"][i] * number_of_sites
-        return occupation
+        return self._symbol_weights.copy()
 
     def has_partial_occupancy(self) -> bool:
         """Check for partial occupancies (first vacancies, next through element ratios)"""
@@ -181,7 +225,9 @@ class StructureDataTranslator(AiidaEntityTranslator):
         res = [ratios[symbol] / total_weight for symbol in self.elements()]
 
         # Finally, save OPTIMADE attribute for later storage in extras for AiiDA Node and return value
-        self.new_attributes[attribute] = floats_to_hex(res)
+        self.new_attributes[attribute] = store_floats(
+            res, native=CONFIG.float_storage == "native"
+        )
         return res
 
     def chemical_formula_descriptive(self) -> str:
@@ -320,10 +366,12 @@ class StructureDataTranslator(AiidaEntityTranslator):
         if attribute in self.new_attributes:
             return hex_to_floats(self.new_attributes[attribute])
 
-        res = check_floating_round_errors(self._cell)
+        res = zero_round_errors(np.array(self._cell, dtype=float)).tolist()
 
         # Finally, save OPTIMADE attribute for later storage in extras for AiiDA Node and return value
-        self.new_attributes[attribute] = floats_to_hex(res)
+        self.new_attributes[attribute] = store_floats(
+            res, native=CONFIG.float_storage == "native"
+        )
         return res
 
     def cartesian_site_positions(self) -> list[list[Union[float, None]]]:
@@ -337,11 +385,12 @@ class StructureDataTranslator(AiidaEntityTranslator):
         if attribute in self.new_attributes:
             return hex_to_floats(self.new_attributes[attribute])
 
-        sites = [list(site["position"]) for site in self._sites]
-        res = check_floating_round_errors(sites)
+        res = zero_round_errors(self._positions).tolist()
 
         # Finally, save OPTIMADE attribute for later storage in extras for AiiDA Node and return value
-        self.new_attributes[attribute] = floats_to_hex(res)
+        self.new_attributes[attribute] = store_floats(
+            res, native=CONFIG.float_storage == "native"
+        )
         return res
 
     def nsites(self) -> int:
@@ -351,7 +400,7 @@ class StructureDataTranslator(AiidaEntityTranslator):
         if attribute in self.new_attributes:
             return self.new_attributes[attribute]
 
-        res = len(self.cartesian_site_positions())
+        res = len(self._sites)
 
         # Finally, save OPTIMADE attribute for later storage in extras for AiiDA Node and return value
         self.new_attributes[attribute] = res
@@ -419,7 +468,9 @@ class StructureDataTranslator(AiidaEntityTranslator):
                 if 0.0 <= kind_weight_sum <= 1.0:
                     species["concentration"].append(1.0 - kind_weight_sum)
                 else:
-                    raise ValueError("kind_weight_sum must be in the interval [0;1]")
+                    raise OptimadeIntegrityError(
+                        "kind_weight_sum must be in the interval [0;1]"
+                    )
 
             res.append(species)
 
@@ -477,11 +528,8 @@ class StructureDataTranslator(AiidaEntityTranslator):
         # * Unknown positions *
         # This flag MUST be present if at least one component of the cartesian_site_positions
         # list of lists has value null.
-        cartesian_site_positions = self.cartesian_site_positions()
-        for site in cartesian_site_positions:
-            if float("NaN") in site:
-                res.append("unknown_positions")
-                break
+        if np.isnan(self._positions).any():
+            res.append("unknown_positions")
 
         # * Assemblies *
         # This flag MUST be present if the property assemblies is present.
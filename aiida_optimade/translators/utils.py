@@ -1,5 +1,7 @@
 from typing import Union
 
+import numpy as np
+
 __all__ = ("hex_to_floats",)
 
 
@@ -27,21 +29,32 @@ def check_floating_round_errors(
     return res
 
 
+def zero_round_errors(values: np.ndarray) -> np.ndarray:
+    """Set values close to zero to exactly zero, like `check_floating_round_errors()`
+    for all values of a NumPy array at once"""
+    might_as_well_be_zero = 1e-8
+    return np.where(np.abs(values) < might_as_well_be_zero, 0.0, values)
+
+
 def floats_to_hex(
     some_list: list[Union[list[float], float]]
 ) -> list[Union[list[str], str]]:
     """Convert floats embedded in lists to hex strings (for storing "precise" floats)
 
+    Values that are already hex strings are kept as they are.
+
     :param some_list: Must be a list of either lists or float values
     :type some_list: list
     """
     res = []
     for item in some_list:
-        if isinstance(item, list):
+        if type(item) is float:  # pylint: disable=unidiomatic-typecheck
+            res.append(item.hex())
+        elif isinstance(item, list):
             res.append(floats_to_hex(item))
         else:
-            if isinstance(item, float):
-                item = item.hex()
+            if isinstance(item, (float, int)) and not isinstance(item, bool):
+                item = float(item).hex()
             if not isinstance(item, str):
                 raise TypeError(
                     "Wrong type passed to floats_to_hex method, must be a "
@@ -57,13 +70,17 @@ def hex_to_floats(
 ) -> list[Union[list[float], float]]:
     """Convert hex strings embedded in lists (back) to floats
 
+    Values that are already numbers (natively stored floats) are kept as floats.
+
     :param some_list: Must be a list of either lists or string values
     :type some_list: list
     """
     res = []
 
     for item in some_list:
-        if isinstance(item, list):
+        if type(item) is float:  # pylint: disable=unidiomatic-typecheck
+            res.append(item)
+        elif isinstance(item, list):
             res.append(hex_to_floats(item))
         else:
             if isinstance(item, str):
@@ -74,6 +91,9 @@ def hex_to_floats(
                         f"Could not turn item ({item}) into float from hex. "
                         f"Original exception: {exc!r}"
                     ) from exc
+            elif isinstance(item, int) and not isinstance(item, bool):
+                # Native JSON numbers may have been stored without a fraction
+                item = float(item)
             if not isinstance(item, float):
                 raise TypeError(
                     "Wrong type passed to hex_to_floats method, must be a "
@@ -82,3 +102,17 @@ def hex_to_floats(
                 )
             res.append(item)
     return res
+
+
+def store_floats(
+    some_list: list[Union[list[float], float]], native: bool
+) -> list[Union[list[Union[float, str]], Union[float, str]]]:
+    """Represent floats embedded in lists as they are stored in the Node extras
+
+    :param some_list: Must be a list of either lists or float values
+    :type some_list: list
+    :param native: Whether to store the floats as native JSON numbers, which
+        round-trip exactly, or as hex strings
+    :type native: bool
+    """
+    return hex_to_floats(some_list) if native else floats_to_hex(some_list)
@@ -0,0 +1,90 @@
+"""Benchmark the throughput of a running AiiDA-OPTIMADE server
+
+Requests are sent by a number of concurrent clients (threads), each sending its
+requests one after the other.
+For each level of concurrency, the number of requests per second and the latency
+percentiles are reported.
+
+Example:
+
+    aiida-optimade -p profile_name run &
+    python benchmarks/concurrency.py --clients 1 8 32 --requests 400 \\
+        "/v1/structures?filter=nelements=2" "/v1/structures?page_limit=25"
+
+"""
+
+import argparse
+import statistics
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+
+def request(url: str, timeout: float) -> float:
+    """Send a single GET request and return its latency in seconds"""
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{url} responded with status {response.status}")
+    return time.perf_counter() - start
+
+
+def benchmark(
+    urls: list[str], clients: int, requests: int, timeout: float
+) -> dict[str, float]:
+    """Send `requests` requests (cycling through `urls`) from `clients` clients"""
+    urls = list(islice(cycle(urls), requests))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        latencies = sorted(executor.map(lambda url: request(url, timeout), urls))
+    elapsed = time.perf_counter() - start
+    return {
+        "clients": clients,
+        "requests/s": len(latencies) / elapsed,
+        "p50 (ms)": 1000 * statistics.median(latencies),
+        "p95 (ms)": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+        "max (ms)": 1000 * latencies[-1],
+    }
+
+
+def main() -> None:
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=["/v1/structures", '/v1/structures?filter=elements HAS "Si"'],
+        help="The paths to request, relative to --base-url.",
+    )
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests per concurrency level."
+    )
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    urls = [
+        args.base_url.rstrip("/") + urllib.parse.quote(path, safe="/?=&,")
+        for path in args.paths
+    ]
+    benchmark(urls, clients=1, requests=args.warmup, timeout=args.timeout)
+
+    header = ("clients", "requests/s", "p50 (ms)", "p95 (ms)", "max (ms)")
+    print("".join(f"{_:>12}" for _ in header))
+    for clients in args.clients:
+        result = benchmark(
+            urls, clients=clients, requests=args.requests, timeout=args.timeout
+        )
+        print(
+            f"{result['clients']:>12}"
+            + "".join(f"{result[_]:>12.1f}" for _ in header[1:])
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark parsing and transforming OPTIMADE filters
+
+The filters are transformed with `AiidaCollection.transform_filter()`, first with an
+empty filter cache for every filter (parsing and transforming each time), then with
+a warm cache.
+No database is needed.
+
+Example:
+
+    python benchmarks/filters.py --repeat 20
+
+"""
+
+import argparse
+import time
+
+FILTERS = [
+    'elements HAS "Si"',
+    'elements HAS ALL "Si", "O"',
+    'elements HAS ANY "Fe", "Co", "Ni" AND nelements<=3',
+    "nelements=2",
+    "nelements>=2 AND nelements<=4",
+    "nsites<10",
+    'chemical_formula_descriptive="SiO2"',
+    'chemical_formula_reduced="O2Si"',
+    'chemical_formula_anonymous="A2B"',
+    "elements LENGTH 3",
+    'NOT elements HAS "H"',
+    'elements HAS "C" AND NOT elements HAS "H" AND nelements<5',
+    "nperiodic_dimensions=3",
+    'structure_features HAS "disorder"',
+    'id="1234"',
+    'last_modified>"2022-01-01T00:00:00Z"',
+    '(elements HAS "Li" OR elements HAS "Na") AND nelements=3',
+    'elements HAS "O" AND elements HAS "Ti" AND nsites>=5 AND nsites<=50',
+]
+
+
+def run(collection, filters: list[str], cached: bool) -> float:
+    """Transform all `filters` and return the time per filter in seconds"""
+    start = time.perf_counter()
+    for optimade_filter in filters:
+        if not cached:
+            collection._filter_cache.clear()  # pylint: disable=protected-access
+        collection.transform_filter(optimade_filter)
+    return (time.perf_counter() - start) / len(filters)
+
+
+def main() -> None:
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="Number of passes over the filters."
+    )
+    args = parser.parse_args()
+
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    filters = FILTERS * args.repeat
+    # Warm up the parser
+    run(STRUCTURES, FILTERS, cached=False)
+
+    uncached = run(STRUCTURES, filters, cached=False)
+    STRUCTURES._filter_cache.clear()  # pylint: disable=protected-access
+    run(STRUCTURES, FILTERS, cached=True)
+    cached = run(STRUCTURES, filters, cached=True)
+
+    print(f"{'':>10}{'us/filter':>12}")
+    print(f"{'uncached':>10}{1e6 * uncached:>12.1f}")
+    print(f"{'cached':>10}{1e6 * cached:>12.1f}")
+    print(f"Speed-up: {uncached / cached:.0f}x")
+    print(
+        f"Cache: {STRUCTURES._filter_cache.info()}"
+    )  # pylint: disable=protected-access
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark mapping QueryBuilder rows to OPTIMADE structures
+
+A page of synthetic rows (for the default projection of the `/structures` endpoint)
+is mapped with the row-mapping plan of `StructureMapper`, and with the previous
+implementation, which built a dictionary per row and resolved the aliases per row.
+No database is needed.
+
+Example:
+
+    python benchmarks/mapping.py --rows 1000
+
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+
+def legacy_map_back(mapper, entity_properties: dict) -> dict:
+    """`ResourceMapper.map_back()` before the introduction of row-mapping plans"""
+    from aiida_optimade.mappers import ResourceMapper
+
+    def all_aliases():
+        return ResourceMapper.__dict__["all_aliases"].__func__.__wrapped__(mapper)
+
+    def get_backend_field(field: str) -> str:
+        return dict(all_aliases()).get(field, field)
+
+    new_object = {
+        field: entity_properties[get_backend_field(field)]
+        for field in mapper.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
+        if get_backend_field(field) in entity_properties
+    }
+    new_object["attributes"] = mapper.build_attributes(
+        retrieved_attributes={
+            alias: entity_properties[real]
+            for alias, real in all_aliases()
+            if (
+                real in entity_properties
+                and alias not in mapper.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
+            )
+        },
+        entry_pk=new_object["id"],
+        node_type=new_object["type"],
+    )
+    new_object["type"] = mapper.ENDPOINT
+    return new_object
+
+
+def synthetic_row(project: list[str], pk: int, nsites: int) -> list:
+    """A row of realistic values for a structure with `nsites` sites"""
+    from aiida_optimade.translators.utils import floats_to_hex
+
+    rng = random.Random(pk)
+    values = {
+        "id": pk,
+        "uuid": str(uuid4()),
+        "node_type": "data.core.structure.StructureData.",
+        "ctime": datetime.now(timezone.utc),
+        "mtime": datetime.now(timezone.utc),
+        "attributes.something.non.existing": None,
+        "elements": ["O", "Si"],
+        "nelements": 2,
+        "elements_ratios": floats_to_hex([2 / 3, 1 / 3]),
+        "chemical_formula_descriptive": f"Si{nsites // 3}O{2 * nsites // 3}",
+        "chemical_formula_reduced": "O2Si",
+        "chemical_formula_hill": f"O{2 * nsites // 3}Si{nsites // 3}",
+        "chemical_formula_anonymous": "A2B",
+        "dimension_types": [1, 1, 1],
+        "nperiodic_dimensions": 3,
+        "lattice_vectors": floats_to_hex(
+            [[rng.uniform(4, 6) for _ in range(3)] for _ in range(3)]
+        ),
+        "cartesian_site_positions": floats_to_hex(
+            [[rng.uniform(0, 5) for _ in range(3)] for _ in range(nsites)]
+        ),
+        "nsites": nsites,
+        "species": [
+            {"name": "O", "chemical_symbols": ["O"], "concentration": [1.0]},
+            {"name": "Si", "chemical_symbols": ["Si"], "concentration": [1.0]},
+        ],
+        "species_at_sites": ["Si" if _ % 3 == 0 else "O" for _ in range(nsites)],
+        "structure_features": [],
+        "assemblies": None,
+    }
+    return [values[field.removeprefix("extras.optimade.")] for field in project]
+
+
+def main() -> None:
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page.")
+    parser.add_argument("--sites", type=int, default=24, help="Sites per structure.")
+    parser.add_argument("--repeat", type=int, default=5, help="Pages to map.")
+    args = parser.parse_args()
+
+    from aiida_optimade.mappers import StructureMapper
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    project = [
+        STRUCTURES.resource_mapper.get_backend_field(field)
+        for field in sorted(STRUCTURES.all_fields)
+    ]
+    project = list(dict.fromkeys(project))
+    rows = [synthetic_row(project, pk, args.sites) for pk in range(args.rows)]
+
+    def legacy() -> list:
+        return [
+            legacy_map_back(StructureMapper, dict(zip(project, row))) for row in rows
+        ]
+
+    def planned() -> list:
+        plan = StructureMapper.row_plan(tuple(project))
+        return [StructureMapper.map_back_row(row, plan) for row in rows]
+
+    assert legacy() == planned()
+
+    print(f"{'':>8}{'us/row':>10}")
+    for name, func in (("before", legacy), ("after", planned)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            func()
+        elapsed = (time.perf_counter() - start) / (args.repeat * args.rows)
+        print(f"{name:>8}{1e6 * elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark retrieving single structures from an AiiDA profile
+
+The entries are retrieved directly from the collection (no HTTP), both through the
+listing machinery (`find()` with an `id` filter, as done before the primary-key fast
+path) and through `find_by_id()`, with and without the entry cache.
+
+Example:
+
+    python benchmarks/single_entry.py --profile profile_name --entries 200
+
+"""
+
+import argparse
+import random
+import time
+
+
+def run(func, pks: list[int]) -> float:
+    """Call `func` for each of `pks` and return the time per call in seconds"""
+    start = time.perf_counter()
+    for pk in pks:
+        func(pk)
+    return (time.perf_counter() - start) / len(pks)
+
+
+def main() -> None:
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", default=None, help="The AiiDA profile to use.")
+    parser.add_argument(
+        "--entries", type=int, default=100, help="Number of entries to retrieve."
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=1024, help="Size of the entry cache."
+    )
+    args = parser.parse_args()
+
+    from aiida import load_profile
+
+    load_profile(args.profile)
+
+    from optimade.server.query_params import SingleEntryQueryParams
+
+    from aiida_optimade.common import LRUCache
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    def params() -> SingleEntryQueryParams:
+        return SingleEntryQueryParams(
+            response_format="json",
+            email_address="",
+            response_fields="",
+            include="references",
+            api_hint="",
+        )
+
+    def listing(pk: int):
+        query_params = params()
+        query_params.filter = f'id="{pk}"'
+        return STRUCTURES.find(query_params)
+
+    def fast_path(pk: int):
+        return STRUCTURES.find_by_id(pk, params())
+
+    all_pks = [
+        pk
+        # pylint: disable=protected-access
+        for (pk,) in STRUCTURES._find_all(project=["id"])
+    ]
+    pks = random.choices(all_pks, k=args.entries)
+    fast_path(pks[0])  # Warm up, e.g., the count of available entries
+
+    results = {"find() with id filter": run(listing, pks)}
+    # pylint: disable=protected-access
+    STRUCTURES._entry_cache = LRUCache(maxsize=0)
+    results["find_by_id()"] = run(fast_path, pks)
+    STRUCTURES._entry_cache = LRUCache(maxsize=args.cache_size)
+    run(fast_path, pks)
+    results["find_by_id() cached"] = run(fast_path, pks)
+
+    print(f"{'':>24}{'ms/entry':>10}")
+    for name, seconds in results.items():
+        print(f"{name:>24}{1000 * seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark calculating the OPTIMADE structure fields of StructureData Nodes
+
+For synthetic structures of increasing size, each field is calculated by a fresh
+`StructureDataTranslator` (i.e., without any intermediate results shared with other
+fields), followed by calculating all fields with a single translator, as is done
+when initializing a database.
+No database is needed.
+
+Example:
+
+    python benchmarks/translators.py --sites 100 10000 100000
+
+"""
+
+import argparse
+import random
+import time
+
+FIELDS = [
+    "elements",
+    "nelements",
+    "elements_ratios",
+    "chemical_formula_descriptive",
+    "chemical_formula_reduced",
+    "chemical_formula_hill",
+    "chemical_formula_anonymous",
+    "dimension_types",
+    "nperiodic_dimensions",
+    "lattice_vectors",
+    "cartesian_site_positions",
+    "nsites",
+    "species_at_sites",
+    "species",
+    "structure_features",
+]
+
+
+def synthetic_properties(nsites: int, disorder: bool) -> dict:
+    """The `StructureDataTranslator.NODE_PROPERTIES` of a structure with `nsites`
+    sites of 3 kinds (one of them a mixture of Mg and Fe if `disorder`)"""
+    rng = random.Random(nsites)
+    kinds = [
+        {"name": "Si", "symbols": ["Si"], "weights": [1.0], "mass": 28.085},
+        {"name": "O", "symbols": ["O"], "weights": [1.0], "mass": 15.999},
+        (
+            {"name": "MgFe", "symbols": ["Fe", "Mg"], "weights": [0.5, 0.5]}
+            if disorder
+            else {"name": "Mg", "symbols": ["Mg"], "weights": [1.0], "mass": 24.305}
+        ),
+    ]
+    length = 2.5 * nsites ** (1 / 3)
+    sites = [
+        {
+            "kind_name": kinds[index % len(kinds)]["name"],
+            "position": [rng.uniform(0, length) for _ in range(3)],
+        }
+        for index in range(nsites)
+    ]
+    return {
+        "attributes.kinds": kinds,
+        "attributes.sites": sites,
+        "attributes.pbc1": True,
+        "attributes.pbc2": True,
+        "attributes.pbc3": True,
+        "attributes.cell": [[length, 0.0, 0.0], [0.0, length, 0.0], [0.0, 0.0, length]],
+    }
+
+
+def timed(func, repeat: int) -> float:
+    """The best time in milliseconds of `repeat` calls to `func`"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return 1000 * best
+
+
+def main() -> None:
+    """Run the benchmark from the command line"""
+    from aiida_optimade.translators import StructureDataTranslator
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--disorder",
+        action="store_true",
+        help="Make one of the kinds a mixture of two elements.",
+    )
+    args = parser.parse_args()
+
+    def field_time(properties: dict, field: str) -> float:
+        return timed(
+            lambda: getattr(StructureDataTranslator(1, properties=properties), field)(),
+            args.repeat,
+        )
+
+    def all_fields(properties: dict) -> None:
+        translator = StructureDataTranslator(1, properties=properties)
+        for field in FIELDS:
+            getattr(translator, field)()
+
+    structures = {
+        nsites: synthetic_properties(nsites, args.disorder) for nsites in args.sites
+    }
+    width = max(len(_) for _ in FIELDS + ["(all fields)"]) + 2
+    print(f"{'field (ms)':<{width}}" + "".join(f"{_:>12}" for _ in args.sites))
+    for field in FIELDS:
+        print(
+            f"{field:<{width}}"
+            + "".join(
+                f"{field_time(properties, field):>12.2f}"
+                for properties in structures.values()
+            )
+        )
+    print(
+        f"{'(all fields)':<{width}}"
+        + "".join(
+            f"{timed(lambda: all_fields(properties), args.repeat):>12.2f}"
+            for properties in structures.values()
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Test CLI `aiida-optimade index` command"""
+
+# pylint: disable=import-error
+import os
+
+import pytest
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+def test_index_create_list_drop(run_cli_command):
+    """Test `aiida-optimade -p profile_name index create/list/drop`"""
+    from aiida_optimade.cli import cmd_index
+    from aiida_optimade.indexes import index_name
+
+    fields = ["elements", "nsites"]
+
+    result = run_cli_command(cmd_index.create, fields)
+    assert "Estimated query cost (before -> after):" in result.stdout, result.stdout
+    assert 'filter=elements HAS "Si": ' in result.stdout, result.stdout
+    assert (
+        f"Created indexes: {', '.join(index_name(_) for _ in fields)}." in result.stdout
+    ), result.stdout
+
+    result = run_cli_command(cmd_index.list_)
+    for field in fields:
+        assert index_name(field) in result.stdout, result.stdout
+    assert index_name("nelements") not in result.stdout, result.stdout
+    assert "USING gin" in result.stdout, result.stdout
+
+    result = run_cli_command(cmd_index.drop, ["--no-explain"] + fields)
+    assert "Estimated query cost" not in result.stdout, result.stdout
+    assert "Dropped indexes:" in result.stdout, result.stdout
+
+    result = run_cli_command(cmd_index.list_)
+    assert "No AiiDA-OPTIMADE indexes found" in result.stdout, result.stdout
+
+    run_cli_command(cmd_index.create, ["not_a_field"], raises=True)
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+def test_canonical_queries_use_indexes():
+    """Each canonical query should be served by an AiiDA-OPTIMADE index
+
+    Sequential scans are disabled, since they are cheaper than any index scan for the
+    small test database.
+    """
+    from aiida.manage.manager import get_manager
+    from sqlalchemy import text
+
+    from aiida_optimade.indexes import (
+        CANONICAL_QUERIES,
+        INDEX_PREFIX,
+        INDEXES,
+        create_indexes,
+        drop_indexes,
+        explain_query,
+    )
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    session = get_manager().get_profile_storage().get_session()
+    create_indexes(list(INDEXES), STRUCTURES.entities, concurrently=False)
+    session.execute(text("SET enable_seqscan = off"))
+    session.commit()
+    try:
+        for filter_, sort in CANONICAL_QUERIES:
+            plan = explain_query(STRUCTURES, filter_, sort)
+            assert INDEX_PREFIX in plan, f"filter={filter_}&sort={sort}:\n{plan}"
+    finally:
+        session.execute(text("RESET enable_seqscan"))
+        session.commit()
+        drop_indexes(list(INDEXES), concurrently=False)
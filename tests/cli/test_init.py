@@ -36,6 +36,10 @@ def test_init_structuredata(run_cli_command, aiida_profile, top_dir, caplog):
         f"{n_structure_data} StructureData and CifData Nodes or MongoDB documents have"
         " been initialized." in result.stdout
     ), result.stdout
+    assert (
+        "Reused the OPTIMADE fields of identical structures for" in result.stdout
+    ), result.stdout
+    assert "dedup hit rate:" in result.stdout, result.stdout
 
     extras_key = AiidaEntityTranslator.EXTRAS_KEY
     n_updated_structure_data = (
@@ -142,6 +146,48 @@ def test_init_cifdata(run_cli_command, aiida_profile, top_dir, caplog):
     import_archive(original_data)
 
 
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+def test_init_workers(run_cli_command, aiida_profile, top_dir):
+    """Test `aiida-optimade -p profile_name init --workers 2 --chunk-size 2`
+    calculates the same fields as a single process."""
+    from aiida import orm
+    from aiida.tools.archive.imports import import_archive
+
+    from aiida_optimade.cli import cmd_init
+    from aiida_optimade.translators.entities import AiidaEntityTranslator
+
+    # Clear database
+    aiida_profile.reset_db()
+
+    archive = top_dir.joinpath("tests/cli/static/structure_data_nodes.aiida")
+    import_archive(archive)
+
+    extras_key = AiidaEntityTranslator.EXTRAS_KEY
+    query = orm.QueryBuilder().append(
+        orm.StructureData, project=["id", f"extras.{extras_key}"]
+    )
+
+    run_cli_command(cmd_init.init)
+    expected = dict(query.all())
+
+    result = run_cli_command(
+        cmd_init.init, ["--force", "--workers", "2", "--chunk-size", "2"]
+    )
+    assert (
+        f"{len(expected)} StructureData and CifData Nodes or MongoDB documents have"
+        " been initialized." in result.stdout
+    ), result.stdout
+    assert dict(query.all()) == expected
+
+    # Repopulate database with the "proper" test data
+    aiida_profile.reset_db()
+    original_data = top_dir.joinpath("tests/static/test_structures.aiida")
+    import_archive(original_data)
+
+
 @pytest.mark.skipif(
     os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is None, reason="Test is only for MongoDB"
 )
@@ -0,0 +1,136 @@
+"""Test the checkpoint journal for `aiida-optimade init` and `calc`"""
+
+# pylint: disable=import-error
+import os
+
+import pytest
+
+
+def test_journal(tmp_path):
+    """Test recording chunks and the last committed PK"""
+    from aiida_optimade.journal import Journal
+
+    journal = Journal(tmp_path / "init.journal.json")
+    assert not journal.exists
+    assert journal.last_pk is None
+
+    journal.start(
+        fields=["nsites", "elements"], chunks=[[1, 2], [4, 5], [7]], max_pk=10
+    )
+    assert journal.status == "running"
+    assert journal.fields == ["elements", "nsites"]
+    assert journal.last_pk is None
+
+    # Chunks may be committed out of order
+    journal.record_chunk([4, 5], seconds=0.1)
+    assert journal.last_pk is None
+    journal.record_chunk([1, 2], seconds=0.1, failed=True)
+    assert journal.last_pk == 5
+    assert journal.failures == [1, 2]
+
+    # The journal is read back from file
+    journal = Journal(tmp_path / "init.journal.json")
+    assert journal.status == "running"
+    assert journal.last_pk == 5
+    assert journal.max_pk == 10
+
+    journal.record_chunk([7], seconds=0.1)
+    journal.finish()
+    assert journal.status == "failed"
+    assert journal.last_pk == 7
+
+
+def test_journal_filters(tmp_path):
+    """Test the QueryBuilder filters for `--resume`, `--since-pk`, and
+    `--since-mtime`"""
+    import click
+
+    from aiida_optimade.cli.utils import get_journal_filters
+    from aiida_optimade.journal import Journal
+
+    journal = Journal(tmp_path / "calc.journal.json")
+    assert get_journal_filters(journal) is None
+    with pytest.raises(click.UsageError):
+        get_journal_filters(journal, resume=True)
+    with pytest.raises(click.UsageError):
+        get_journal_filters(journal, since_pk="last")
+
+    assert get_journal_filters(journal, since_pk="3") == {"and": [{"id": {">": 3}}]}
+    with pytest.raises(click.BadParameter):
+        get_journal_filters(journal, since_pk="three")
+    with pytest.raises(click.BadParameter):
+        get_journal_filters(journal, since_mtime="yesterday")
+
+    journal.start(fields=["elements"], chunks=[[1, 2], [4]], max_pk=8)
+    journal.record_chunk([1, 2], seconds=0.1, failed=True)
+    assert get_journal_filters(journal, resume=True) == {
+        "and": [{"or": [{"id": {">": 2}}, {"id": {"in": [1, 2]}}]}]
+    }
+
+    filters = get_journal_filters(journal, since_pk="last", since_mtime="last")
+    assert filters["and"][0] == {"id": {">": 8}}
+    assert filters["and"][1] == {"mtime": {">": journal.started}}
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+def test_init_resume(run_cli_command, aiida_profile, top_dir):
+    """Test `aiida-optimade -p profile_name init --resume` continues after the last
+    committed PK"""
+    from aiida import get_profile, orm
+    from aiida.tools.archive.imports import import_archive
+
+    from aiida_optimade.cli import cmd_init
+    from aiida_optimade.journal import Journal
+    from aiida_optimade.translators.entities import AiidaEntityTranslator
+
+    # Clear database
+    aiida_profile.reset_db()
+
+    archive = top_dir.joinpath("tests/cli/static/structure_data_nodes.aiida")
+    import_archive(archive)
+
+    extras_key = AiidaEntityTranslator.EXTRAS_KEY
+    pks = sorted(
+        orm.QueryBuilder().append(orm.StructureData, project="id").all(flat=True)
+    )
+
+    # Record an interrupted run, where only the first chunk was committed
+    journal = Journal.for_profile("init", get_profile().name)
+    journal.start(fields=["elements"], chunks=[pks[:2], pks[2:]], max_pk=pks[-1])
+    journal.record_chunk(pks[:2], seconds=0.1)
+
+    result = run_cli_command(cmd_init.init, ["--resume"])
+    assert f"last committed PK: {pks[1]}" in result.stdout, result.stdout
+    assert (
+        f"{len(pks) - 2} StructureData and CifData Nodes or MongoDB documents have"
+        " been initialized." in result.stdout
+    ), result.stdout
+    assert not (
+        orm.QueryBuilder()
+        .append(
+            orm.StructureData,
+            filters={"id": {"in": pks[:2]}, "extras": {"has_key": extras_key}},
+        )
+        .count()
+    )
+
+    journal = Journal.for_profile("init", get_profile().name)
+    assert journal.status == "completed"
+    assert journal.last_pk == pks[-1]
+
+    # Nothing has been added since the last run
+    result = run_cli_command(cmd_init.init, ["--since-pk"])
+    assert (
+        "No new StructureData and CifData Nodes or MongoDB documents found to "
+        "initialize" in result.stdout
+    ), result.stdout
+
+    journal.filename.unlink()
+
+    # Repopulate database with the "proper" test data
+    aiida_profile.reset_db()
+    original_data = top_dir.joinpath("tests/static/test_structures.aiida")
+    import_archive(original_data)
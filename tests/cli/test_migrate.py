@@ -0,0 +1,61 @@
+"""Test CLI `aiida-optimade migrate-floats` command"""
+
+# pylint: disable=import-error
+import os
+
+import pytest
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+def test_migrate_floats(run_cli_command, aiida_profile, top_dir):
+    """Test `aiida-optimade -p profile_name migrate-floats` converts the floats back
+    and forth without losing precision"""
+    from aiida import orm
+    from aiida.tools.archive.imports import import_archive
+
+    from aiida_optimade.cli import cmd_migrate
+    from aiida_optimade.translators.entities import AiidaEntityTranslator
+    from aiida_optimade.translators.utils import hex_to_floats
+
+    aiida_profile.reset_db()
+    archive = top_dir.joinpath("tests/cli/static/initialized_structure_nodes.aiida")
+    import_archive(archive)
+
+    extras_key = AiidaEntityTranslator.EXTRAS_KEY
+    fields = ["cartesian_site_positions", "elements_ratios", "lattice_vectors"]
+
+    def stored_fields() -> dict[int, dict]:
+        """The stored float-valued fields per Node PK"""
+        return {
+            pk: {field: optimade.get(field) for field in fields}
+            for pk, optimade in orm.QueryBuilder()
+            .append(
+                orm.StructureData,
+                filters={"extras": {"has_key": extras_key}},
+                project=["id", f"extras.{extras_key}"],
+            )
+            .all()
+        }
+
+    original = stored_fields()
+    assert original
+
+    result = run_cli_command(cmd_migrate.migrate_floats, ["-y", "--to", "native"])
+    assert "Migrated the floats of 0 Nodes" not in result.stdout, result.stdout
+    native = stored_fields()
+    for pk, values in native.items():
+        for field, value in values.items():
+            if value is None:
+                continue
+            assert value == hex_to_floats(original[pk][field])
+
+    # Running the migration again does not change any Node
+    result = run_cli_command(cmd_migrate.migrate_floats, ["-y", "--to", "native"])
+    assert "Migrated the floats of 0 Nodes" in result.stdout, result.stdout
+
+    result = run_cli_command(cmd_migrate.migrate_floats, ["-y", "-q", "--to", "hex"])
+    assert not result.stdout
+    assert stored_fields() == original
@@ -0,0 +1,50 @@
+"""Test CLI `aiida-optimade quarantine` commands"""
+
+# pylint: disable=import-error
+import os
+
+import pytest
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+def test_quarantine(run_cli_command, aiida_profile, top_dir):
+    """Test quarantined Nodes are skipped by `aiida-optimade init`, and are listed and
+    calculated again by `aiida-optimade quarantine list` and `retry`"""
+    from aiida import orm
+    from aiida.tools.archive.imports import import_archive
+
+    from aiida_optimade.cli import cmd_init, cmd_quarantine
+    from aiida_optimade.translators.entities import AiidaEntityTranslator
+
+    aiida_profile.reset_db()
+    archive = top_dir.joinpath("tests/cli/static/structure_data_nodes.aiida")
+    import_archive(archive)
+
+    extras_key = AiidaEntityTranslator.EXTRAS_KEY
+    quarantine_key = AiidaEntityTranslator.QUARANTINE_KEY
+    node = orm.QueryBuilder().append(orm.StructureData).first()[0]
+    node.set_extra(
+        quarantine_key,
+        {"error": "CalculationLimitExceeded('Exceeded the time limit of 1 s.')"},
+    )
+
+    result = run_cli_command(cmd_init.init)
+    assert "Success:" in result.stdout, result.stdout
+    assert "1 Node is quarantined" in result.stdout, result.stdout
+    assert extras_key not in orm.load_node(node.pk).extras
+
+    result = run_cli_command(cmd_quarantine.list_quarantined)
+    assert str(node.pk) in result.stdout, result.stdout
+    assert "Exceeded the time limit of 1 s." in result.stdout, result.stdout
+
+    result = run_cli_command(cmd_quarantine.retry, ["-y", str(node.pk)])
+    assert "Calculated the OPTIMADE fields for 1 of 1" in result.stdout, result.stdout
+    extras = orm.load_node(node.pk).extras
+    assert quarantine_key not in extras
+    assert extras[extras_key]
+
+    result = run_cli_command(cmd_quarantine.list_quarantined)
+    assert "No quarantined Nodes" in result.stdout, result.stdout
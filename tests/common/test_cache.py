@@ -0,0 +1,188 @@
+"""Tests for aiida_optimade.common.cache"""
+
+# pylint: disable=import-error,protected-access
+from pathlib import Path
+
+import pytest
+
+
+def test_lru_cache_eviction():
+    """Ensure the least recently used entries are evicted first"""
+    from aiida_optimade.common.cache import LRUCache
+
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used entry
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.info() == {"hits": 3, "misses": 0, "size": 2, "maxsize": 2}
+
+
+def test_lru_cache_ttl(monkeypatch: pytest.MonkeyPatch):
+    """Ensure entries expire after their time-to-live"""
+    from aiida_optimade.common import cache as cache_module
+
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+
+    cache = cache_module.LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    now += 10
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert cache.misses == 1
+
+
+def test_sqlite_cache(tmp_path: Path):
+    """Ensure the SQLite cache is shared between instances using the same file"""
+    from aiida_optimade.common.cache import SqliteCache
+
+    filename = tmp_path / "cache.sqlite"
+    first = SqliteCache(filename, table="counts")
+    second = SqliteCache(filename, table="counts")
+
+    first.set("key", {"count": 42})
+    assert second.get("key") == {"count": 42}
+    assert len(second) == 1
+
+    assert second.pop("key") == {"count": 42}
+    assert first.get("key") is None
+
+    with pytest.raises(ValueError, match="Invalid SQLite table name"):
+        SqliteCache(filename, table="counts; DROP TABLE counts")
+
+
+def test_sqlite_cache_purge(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Ensure expired and excess entries are removed when storing an entry, also if
+    their keys are never used again"""
+    from aiida_optimade.common import cache as cache_module
+
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "time", lambda: now)
+
+    cache = cache_module.SqliteCache(tmp_path / "cache.sqlite", ttl=10, maxsize=3)
+    for watermark in range(5):
+        now += 1
+        cache.set(f"[{watermark}]", watermark)
+    assert sorted(cache.keys()) == ["[2]", "[3]", "[4]"]
+
+    now += 10
+    cache.set("[5]", 5)
+    assert cache.keys() == ["[5]"]
+
+
+def test_count_cache_keys():
+    """Ensure semantically equal queries share a count"""
+    from aiida_optimade.common.cache import CountCache
+
+    watermark = [10]
+    cache = CountCache(maxsize=10, watermark=lambda: list(watermark))
+
+    calls = []
+
+    def counter() -> int:
+        calls.append(1)
+        return 5
+
+    filters = {"and": [{"a": {"==": 1}}], "b": {"<": 2}}
+    reordered = {"b": {"<": 2}, "and": [{"a": {"==": 1}}], "node_type": {"==": "x"}}
+
+    assert cache.get_or_count({"filters": filters}, counter) == 5
+    assert cache.get_or_count({"filters": reordered, "offset": 0}, counter) == 5
+    assert len(calls) == 1
+
+    # A changed watermark invalidates the count
+    watermark[0] += 1
+    assert cache.get_or_count({"filters": filters}, counter) == 5
+    assert len(calls) == 2
+
+
+def test_count_cache_shared(tmp_path: Path):
+    """Ensure counts are shared between processes through the SQLite file"""
+    from aiida_optimade.common.cache import CountCache
+
+    filename = tmp_path / "counts.sqlite"
+    first = CountCache(filename=filename)
+    second = CountCache(filename=filename)
+
+    first.set({"filters": {"a": {"==": 1}}}, 3)
+    assert second.get({"filters": {"a": {"==": 1}}}) == 3
+    assert second.get({"filters": {"a": {"==": 2}}}) is None
+
+
+def test_count_cache_concurrent():
+    """Ensure concurrent counts for the same query are only performed once"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from aiida_optimade.common.cache import CountCache
+
+    cache = CountCache(maxsize=10)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def counter() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 7
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(cache.get_or_count, {"filters": {"a": {"==": 1}}}, counter)
+            for _ in range(8)
+        ]
+        assert started.wait(5)
+        release.set()
+        assert [future.result() for future in futures] == [7] * 8
+
+    assert len(calls) == 1
+    assert not cache._counting
+
+
+def test_response_cache(monkeypatch: pytest.MonkeyPatch):
+    """Ensure responses are bounded by size, expire, and are invalidated by a change
+    of the watermark"""
+    from aiida_optimade.common import cache as cache_module
+    from aiida_optimade.common.cache import CachedResponse, ResponseCache
+
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+
+    cache = ResponseCache(max_bytes=10, ttl=60, stale_while_revalidate=30)
+    cache.set("a", CachedResponse(200, [], b"aaaa", watermark=1))
+    cache.set("b", CachedResponse(200, [], b"bbbb", watermark=1))
+    assert cache.get("a", 1) == (cache._data["a"], False)
+    cache.set("c", CachedResponse(200, [], b"cccc", watermark=1))
+    assert "b" not in cache
+    cache.set("d", CachedResponse(200, [], b"d" * 11, watermark=1))
+    assert "d" not in cache
+
+    now += 60
+    response, stale = cache.get("a", 1)
+    assert response.body == b"aaaa" and stale
+    assert cache.get("c", 2) == (None, False)
+    assert "c" not in cache
+    now += 30
+    assert cache.get("a", 1) == (None, False)
+
+    assert cache.start_refresh("a")
+    assert not cache.start_refresh("a")
+    cache.finish_refresh("a")
+    assert cache.start_refresh("a")
+
+    assert cache.info() == {
+        "hits": 1,
+        "stale_hits": 1,
+        "misses": 2,
+        "size": 0,
+        "bytes": 0,
+        "max_bytes": 10,
+    }
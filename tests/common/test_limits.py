@@ -0,0 +1,74 @@
+"""Tests for aiida_optimade.common.limits"""
+
+# pylint: disable=import-error
+import sys
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux"),
+    reason="Limits are only tested with forked processes",
+)
+
+
+def test_result():
+    """Ensure the result and exceptions of the function are passed on"""
+    from aiida_optimade.common.limits import run_with_limits
+
+    assert run_with_limits(sum, [1, 2, 3], timeout=10, max_memory=1_024) == 6
+    with pytest.raises(ValueError, match="invalid literal"):
+        run_with_limits(int, "not a number", timeout=10)
+
+
+def test_timeout():
+    """Ensure the process is stopped when exceeding the time limit"""
+    from aiida_optimade.common import CalculationLimitExceeded
+    from aiida_optimade.common.limits import run_with_limits
+
+    start = time.monotonic()
+    with pytest.raises(CalculationLimitExceeded, match="time limit of 0.5 s"):
+        run_with_limits(time.sleep, 30, timeout=0.5)
+    assert time.monotonic() - start < 10
+
+
+def test_max_memory():
+    """Ensure allocating more than the memory limit fails"""
+    from aiida_optimade.common import CalculationLimitExceeded
+    from aiida_optimade.common.limits import run_with_limits
+
+    with pytest.raises(CalculationLimitExceeded, match="memory limit of 100 MB"):
+        run_with_limits(bytearray, 2 * 1024**3, max_memory=100)
+    assert len(run_with_limits(bytearray, 1024**2, max_memory=100)) == 1024**2
+
+
+def test_threaded(monkeypatch):
+    """Ensure a process running other threads, e.g., a server, is not forked"""
+    import multiprocessing
+    import threading
+
+    from aiida_optimade.common import CalculationLimitExceeded, limits
+
+    methods = []
+    original_get_context = multiprocessing.get_context
+
+    def get_context(method):
+        methods.append(method)
+        return original_get_context(method)
+
+    monkeypatch.setattr(limits.multiprocessing, "get_context", get_context)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, daemon=True)
+    thread.start()
+    try:
+        assert limits.run_with_limits(sum, [1, 2, 3], timeout=30) == 6
+        with pytest.raises(CalculationLimitExceeded, match="time limit of 0.5 s"):
+            limits.run_with_limits(time.sleep, 30, timeout=0.5)
+    finally:
+        stop.set()
+        thread.join()
+    assert methods == ["forkserver", "forkserver"]
+
+    assert limits.run_with_limits(sum, [1, 2, 3], timeout=30) == 6
+    assert methods[-1] == "fork"
@@ -401,55 +401,61 @@ def test_count_filter(caplog):
     """Test EntryCollection.count() when changing filters"""
     from aiida_optimade.routers.structures import STRUCTURES
 
-    STRUCTURES._count = None
+    STRUCTURES._count_cache.clear()
 
-    # The _count attribute should be None
+    # The count cache should be empty
     filters = {}
     count_one = STRUCTURES.count(filters=filters)
-    assert "self._count is None" in caplog.text
-    assert "was not the same as was found in self._count" not in caplog.text
-    assert "Using self._count" not in caplog.text
+    assert "Count cache miss" in caplog.text
+    assert "Count cache hit" not in caplog.text
     caplog.clear()
     assert "node_type" in filters  # node_type will be added in the _find method
-    assert STRUCTURES._count == {
-        "count": count_one,
-        "filters": filters,
-        "limit": None,
-        "offset": None,
-    }
 
     # Changing filters' "node_type" shouldn't result in a new QueryBuilder call
     filters["node_type"] = {"==": "data.core.structure.StructureData."}
     count_two = STRUCTURES.count(filters=filters)
-    assert "self._count is None" not in caplog.text
-    assert "was not the same as was found in self._count" not in caplog.text
-    assert "Using self._count" in caplog.text
+    assert "Count cache miss" not in caplog.text
+    assert "Count cache hit" in caplog.text
     caplog.clear()
     # _find method is not called, so the updated node_type shouldn't change after
     # count()
     assert filters["node_type"] == {"==": "data.core.structure.StructureData."}
     assert count_one == count_two
-    assert STRUCTURES._count == {
-        "count": count_two,
-        "filters": filters,
-        "limit": None,
-        "offset": None,
-    }
 
     # Changing filters to a non-zero value. This should result in a new QueryBuilder
     # call
     filters = {"extras.optimade.elements": {"contains": ["La", "Ba"]}}
     count_three = STRUCTURES.count(filters=filters)
-    assert "self._count is None" not in caplog.text
-    assert "filters was not the same as was found in self._count" in caplog.text
-    assert "Using self._count" not in caplog.text
+    assert "Count cache miss" in caplog.text
+    assert "Count cache hit" not in caplog.text
     assert count_three == 1
-    assert STRUCTURES._count == {
-        "count": count_three,
-        "filters": filters,
-        "limit": None,
-        "offset": None,
-    }
+    caplog.clear()
+
+    # Alternating between filters should not result in new QueryBuilder calls
+    assert STRUCTURES.count(filters={}) == count_one
+    assert STRUCTURES.count(filters=filters) == count_three
+    assert "Count cache miss" not in caplog.text
+
+
+def test_count_watermark(caplog):
+    """Test cached counts are invalidated when the database watermark changes"""
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    STRUCTURES._count_cache.clear()
+
+    count_one = STRUCTURES.count()
+    assert "Count cache miss" in caplog.text
+    caplog.clear()
+
+    # Mimic a change in the database
+    watermark = STRUCTURES._count_cache.watermark
+    STRUCTURES._count_cache._watermark = [watermark[0] + 1] + watermark[1:]
+
+    assert STRUCTURES.count() == count_one
+    assert "Count cache miss" in caplog.text
+    assert len(STRUCTURES._count_cache.local) == 2
+
+    STRUCTURES._count_cache.clear()
 
 
 @pytest.mark.skipif(
@@ -476,77 +482,81 @@ def test_querybuilder_calls(caplog, get_valid_id):
     expected_data_returned = 1
 
     # First request will do the following:
-    # 1. Query for and set data_available (setting _count to data_available)
+    # 1. Query for and set data_available (storing it in the count cache)
     # 2. Query to check extras filter field 'elements', store in cache
-    # 3. Query for and set data_returned (setting _count to data_returned)
-    # 4. Query for results in DB
-    # 5. Reuse _count for more_data_available
+    # 3. Query for results in DB, including a sentinel entry beyond the page
+    # 4. Set data_returned from the page query, since all results fit in the page
     caplog.clear()
     params = _set_params(EntryListingQueryParams(filter=optimade_filter))
-    (_, data_returned, _, _, _) = STRUCTURES.find(params=params)
-    assert caplog.text.count("Using QueryBuilder") == 4
+    (_, data_returned, more_data_available, _, _) = STRUCTURES.find(params=params)
+    assert caplog.text.count("Using QueryBuilder") == 3
     assert data_returned == expected_data_returned
+    assert not more_data_available
     assert "Setting data_available!" in caplog.text  # 1.
-    assert "self._count is None" in caplog.text  # 1.
+    assert "Count cache miss" in caplog.text  # 1.
     assert "Checking all extras fields" in caplog.text  # 2.
-    assert "Setting data_returned using filter" in caplog.text  # 3.
-    assert "filters was not the same as was found in self._count" in caplog.text  # 3.
-    assert "Using self._count" in caplog.text  # 5.
+    assert "Setting data_returned from page query" in caplog.text  # 4.
+    assert "Setting data_returned using filter" not in caplog.text  # 4.
 
     # Perform the exact same request, which will do the following:
     # 1. Reuse _data_available
     # 2. Recognize elements is already in cache of checked extras
-    # 3. Reuse set _data_returned
-    # 4. Query for results in DB
-    # 5. Reuse _count for more_data_available
+    # 3. Query for results in DB, including a sentinel entry beyond the page
+    # 4. Set data_returned from the page query
     caplog.clear()
     (_, data_returned, _, _, _) = STRUCTURES.find(params=params)
     assert caplog.text.count("Using QueryBuilder") == 1
     assert data_returned == expected_data_returned
     assert "Setting data_available!" not in caplog.text  # 1.
-    assert "self._count is None" not in caplog.text  # 1., 3., 5.
     assert "Fields have already been checked." in caplog.text  # 2.
-    assert "Setting data_returned using filter" not in caplog.text  # 3.
-    assert "was not the same as was found in self._count" not in caplog.text  # 5.
-    assert "Using self._count" in caplog.text  # 5.
+    assert "Setting data_returned from page query" in caplog.text  # 4.
 
-    # Perform request with different filter, but the same extra, which will do the
-    # following:
+    # Perform request with different filter, but the same extra, and a page limit
+    # smaller than the number of results, which will do the following:
     # 1. Reuse _data_available
     # 2. Recognize elements is already in cache of checked extras
-    # 3. Query for and set data_returned (setting _count to data_returned)
-    # 4. Query for results in DB
-    # 5. Reuse _count for more_data_available
+    # 3. Query for results in DB, including a sentinel entry beyond the page
+    # 4. Query for and set data_returned (storing it in the count cache)
     optimade_filter = 'elements HAS "Ga"'
     expected_data_returned = 14
+    page_limit = 5
     caplog.clear()
-    params = _set_params(EntryListingQueryParams(filter=optimade_filter))
-    (_, data_returned, _, _, _) = STRUCTURES.find(params=params)
+    params = _set_params(
+        EntryListingQueryParams(filter=optimade_filter, page_limit=page_limit)
+    )
+    (results, data_returned, more_data_available, _, _) = STRUCTURES.find(params=params)
     assert caplog.text.count("Using QueryBuilder") == 2
     assert data_returned == expected_data_returned
+    assert more_data_available
+    assert len(results) == page_limit
     assert "Setting data_available!" not in caplog.text  # 1.
-    assert "self._count is None" not in caplog.text  # 1., 3., 5.
     assert "Fields have already been checked." in caplog.text  # 2.
-    assert "Setting data_returned using filter" in caplog.text  # 3.
-    assert "filters was not the same as was found in self._count" in caplog.text  # 3.
-    assert "Using self._count" in caplog.text  # 5.
+    assert "Setting data_returned using filter" in caplog.text  # 4.
+    assert "Count cache miss" in caplog.text  # 4.
+
+    # Perform the exact same request, which will do the following:
+    # 1. Reuse _data_available
+    # 2. Recognize elements is already in cache of checked extras
+    # 3. Query for results in DB, including a sentinel entry beyond the page
+    # 4. Reuse data_returned from the count cache
+    caplog.clear()
+    (_, data_returned, _, _, _) = STRUCTURES.find(params=params)
+    assert caplog.text.count("Using QueryBuilder") == 1
+    assert data_returned == expected_data_returned
+    assert "Count cache miss" not in caplog.text  # 4.
 
     # Perform request with non-extras field, which will do the following:
     # 1. Reuse _data_available
     # 2. Recognize no extras field is requested
-    # 3. Query for and set data_returned (setting _count to data_returned)
-    # 4. Query for results in DB
-    # 5. Reuse _count for more_data_available
+    # 3. Query for results in DB, including a sentinel entry beyond the page
+    # 4. Set data_returned from the page query
     optimade_filter = f'id="{get_valid_id}"'
     expected_data_returned = 1
     caplog.clear()
     params = _set_params(EntryListingQueryParams(filter=optimade_filter))
     (_, data_returned, _, _, _) = STRUCTURES.find(params=params)
-    assert caplog.text.count("Using QueryBuilder") == 2
+    assert caplog.text.count("Using QueryBuilder") == 1
     assert data_returned == expected_data_returned
     assert "Setting data_available!" not in caplog.text  # 1.
-    assert "self._count is None" not in caplog.text  # 1., 3., 5.
     assert "No filter and/or no extras fields requested." in caplog.text  # 2.
-    assert "Setting data_returned using filter" in caplog.text  # 3.
-    assert "filters was not the same as was found in self._count" in caplog.text  # 3.
-    assert "Using self._count" in caplog.text  # 5.
+    assert "Setting data_returned from page query" in caplog.text  # 4.
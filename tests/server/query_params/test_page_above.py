@@ -0,0 +1,88 @@
+"""Test the `page_above` and `page_below` query parameters"""
+
+# pylint: disable=import-error,protected-access
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def skip_mongo():
+    """Value-based pagination is only supported for the AiiDA backend"""
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    if CONFIG.database_backend == SupportedBackend.MONGODB:
+        pytest.skip("Value-based pagination is not supported for MongoDB")
+
+
+@pytest.mark.parametrize("sort", ["", "&sort=-last_modified", "&sort=immutable_id"])
+def test_page_above_links(get_good_response, client, sort):
+    """Following the `page_above` links should return the same entries as using
+    `page_offset`"""
+    page_limit = 5
+    pages = 3
+
+    response = get_good_response(f"/structures?page_limit={page_limit}{sort}")
+    data_returned = response["meta"]["data_returned"]
+    ids = [_["id"] for _ in response["data"]]
+
+    for _ in range(pages - 1):
+        assert "page_above=" in response["links"]["next"]
+        assert "page_offset" not in response["links"]["next"]
+
+        response = client.get(response["links"]["next"]).json()
+        assert response["meta"]["data_returned"] == data_returned
+        ids.extend(_["id"] for _ in response["data"])
+
+    response = get_good_response(
+        f"/structures?page_offset=0&page_limit={page_limit * pages}{sort}"
+    )
+    assert ids == [_["id"] for _ in response["data"]]
+
+
+def test_page_below_links(get_good_response, client):
+    """Following the `page_below` link should return the previous page"""
+    page_limit = 5
+
+    first_page = get_good_response(f"/structures?page_limit={page_limit}")
+    assert first_page["links"]["prev"] is None
+
+    second_page = client.get(first_page["links"]["next"]).json()
+    assert "page_below=" in second_page["links"]["prev"]
+
+    response = client.get(second_page["links"]["prev"]).json()
+    assert [_["id"] for _ in response["data"]] == [_["id"] for _ in first_page["data"]]
+    assert response["meta"]["more_data_available"]
+    assert response["links"]["prev"] is None
+    assert response["links"]["next"] == first_page["links"]["next"]
+
+
+def test_page_above_filter(get_good_response):
+    """Entries above the `page_above` value should be returned, and
+    `data_returned` should be unaffected by it"""
+    response = get_good_response("/structures?page_limit=3&filter=nelements>=2")
+    page_above = response["data"][-1]["id"]
+
+    next_page = get_good_response(
+        f"/structures?page_limit=3&filter=nelements>=2&page_above={page_above}"
+    )
+    assert next_page["meta"]["data_returned"] == response["meta"]["data_returned"]
+    assert all(int(_["id"]) > int(page_above) for _ in next_page["data"])
+    assert all(_["attributes"]["nelements"] >= 2 for _ in next_page["data"])
+
+
+def test_invalid_page_above(check_error_response):
+    """Invalid values and unsupported sort fields should result in a 400 error"""
+    check_error_response(
+        "/structures?page_above=not_an_id",
+        expected_status=400,
+        expected_title="Bad Request",
+    )
+
+    check_error_response(
+        "/structures?page_above=5&sort=nelements",
+        expected_status=400,
+        expected_title="Bad Request",
+        expected_detail=(
+            "`page_above` and `page_below` are only supported when sorting on the "
+            "fields: id, immutable_id, last_modified, and _aiida_ctime."
+        ),
+    )
@@ -17,49 +17,37 @@ def test_count_limit(caplog):
     """Test EntryCollection.count() when changing limit"""
     from aiida_optimade.routers.structures import STRUCTURES
 
-    STRUCTURES._count = None
+    STRUCTURES._count_cache.clear()
 
-    # The _count attribute should be None
+    # The count cache should be empty
     limit = None
     count_one = STRUCTURES.count(limit=limit)
-    assert "self._count is None" in caplog.text
-    assert "was not the same as was found in self._count" not in caplog.text
-    assert "Using self._count" not in caplog.text
+    assert "Count cache miss" in caplog.text
+    assert "Count cache hit" not in caplog.text
     caplog.clear()
-    assert STRUCTURES._count == {
-        "count": count_one,
-        "filters": {},
-        "limit": limit,
-        "offset": None,
-    }
+    assert len(STRUCTURES._count_cache.local) == 1
 
     # Changing limit to an int. This should result in a new QueryBuilder call
     limit = 5
     count_two = STRUCTURES.count(limit=limit)
-    assert "self._count is None" not in caplog.text
-    assert "limit was not the same as was found in self._count" in caplog.text
-    assert "Using self._count" not in caplog.text
+    assert "Count cache miss" in caplog.text
+    assert "Count cache hit" not in caplog.text
     assert count_two == limit
     caplog.clear()
-    assert STRUCTURES._count == {
-        "count": count_two,
-        "filters": {},
-        "limit": limit,
-        "offset": None,
-    }
+    assert len(STRUCTURES._count_cache.local) == 2
 
     # Keeping the same limit. This should not result in a new QueryBuilder call
     count_three = STRUCTURES.count(limit=limit)
-    assert "self._count is None" not in caplog.text
-    assert "was not the same as was found in self._count" not in caplog.text
-    assert "Using self._count" in caplog.text
+    assert "Count cache miss" not in caplog.text
+    assert "Count cache hit" in caplog.text
     assert count_two == count_three
-    assert STRUCTURES._count == {
-        "count": count_three,
-        "filters": {},
-        "limit": limit,
-        "offset": None,
-    }
+    caplog.clear()
+
+    # Going back to the first limit should also not result in a new QueryBuilder call
+    assert STRUCTURES.count() == count_one
+    assert "Count cache miss" not in caplog.text
+    assert "Count cache hit" in caplog.text
+    assert len(STRUCTURES._count_cache.local) == 2
 
 
 def test_page_limit_max(get_good_response, check_error_response):
@@ -28,47 +28,29 @@ def test_count_offset(caplog):
     """Test EntryCollection.count() when changing offset"""
     from aiida_optimade.routers.structures import STRUCTURES
 
-    STRUCTURES._count = None
+    STRUCTURES._count_cache.clear()
 
-    # The _count attribute should be None
+    # The count cache should be empty
     offset = None
     count_one = STRUCTURES.count(offset=offset)
-    assert "self._count is None" in caplog.text
-    assert "was not the same as was found in self._count" not in caplog.text
-    assert "Using self._count" not in caplog.text
+    assert "Count cache miss" in caplog.text
+    assert "Count cache hit" not in caplog.text
     caplog.clear()
-    assert STRUCTURES._count == {
-        "count": count_one,
-        "filters": {},
-        "limit": None,
-        "offset": offset,
-    }
+    assert len(STRUCTURES._count_cache.local) == 1
 
     # Changing offset to 0 shouldn't result in a new QueryBuilder call
     offset = 0
     count_two = STRUCTURES.count(offset=offset)
-    assert "self._count is None" not in caplog.text
-    assert "was not the same as was found in self._count" not in caplog.text
-    assert "Using self._count" in caplog.text
+    assert "Count cache miss" not in caplog.text
+    assert "Count cache hit" in caplog.text
     caplog.clear()
     assert count_one == count_two
-    assert STRUCTURES._count == {
-        "count": count_two,
-        "filters": {},
-        "limit": None,
-        "offset": None,  # This shouldn't be updated to 0
-    }
+    assert len(STRUCTURES._count_cache.local) == 1
 
     # Changing offset to a non-zero value. This should result in a new QueryBuilder call
     offset = 2
     count_three = STRUCTURES.count(offset=offset)
-    assert "self._count is None" not in caplog.text
-    assert "offset was not the same as was found in self._count" in caplog.text
-    assert "Using self._count" not in caplog.text
+    assert "Count cache miss" in caplog.text
+    assert "Count cache hit" not in caplog.text
     assert count_two == count_three + offset
-    assert STRUCTURES._count == {
-        "count": count_three,
-        "filters": {},
-        "limit": None,
-        "offset": offset,
-    }
+    assert len(STRUCTURES._count_cache.local) == 2
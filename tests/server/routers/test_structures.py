@@ -88,6 +88,169 @@ def test_structures_missing_endpoint_data(get_good_response):
     assert not response["meta"]["more_data_available"]
 
 
+@pytest.mark.parametrize(
+    "request_str",
+    [
+        "/structures?page_limit=5&sort=-last_modified",
+        "/structures?response_fields=nsites,elements&filter=nelements>=2",
+        "/structures/0",
+    ],
+)
+def test_trusted_serialization(request_str, client, monkeypatch):
+    """Check trusted serialization responds with the same content as validated
+    serialization"""
+    from aiida_optimade.config import CONFIG as SERVER_CONFIG
+
+    def _get() -> dict:
+        response = client.get(request_str)
+        assert response.status_code == 200, f"Request failed: {response.json()}"
+        response = response.json()
+        response["meta"].pop("time_stamp")
+        return response
+
+    validated = _get()
+
+    monkeypatch.setattr(SERVER_CONFIG, "trusted_serialization", True)
+    monkeypatch.setattr(SERVER_CONFIG, "trusted_serialization_validation_rate", 0.0)
+    trusted = _get()
+    assert trusted == validated
+    if request_str != "/structures/0":
+        StructureResponseMany(**trusted)
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+@pytest.mark.parametrize(
+    "request_str", ["/structures?page_limit=5", "/structures/{pk}"]
+)
+def test_conditional_requests(request_str, client, caplog):
+    """Check caching headers are emitted, and that matching conditional requests are
+    answered with 304 Not Modified without querying the entries"""
+    from aiida import orm
+
+    pk = orm.QueryBuilder().append(orm.StructureData, project="id").first(flat=True)
+    request_str = request_str.format(pk=pk)
+
+    response = client.get(request_str)
+    assert response.status_code == 200, f"Request failed: {response.json()}"
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert "Last-Modified" not in response.headers
+    assert response.headers["Cache-Control"]
+
+    caplog.clear()
+    response = client.get(request_str, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert not response.content
+    assert response.headers["ETag"] == etag
+    assert "Using QueryBuilder" not in caplog.text
+
+    # If-Modified-Since is ignored
+    response = client.get(
+        request_str, headers={"If-Modified-Since": "Fri, 01 Jan 9999 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+
+    # Different query parameters result in a different ETag
+    response = client.get(
+        f"{request_str}{'&' if '?' in request_str else '?'}response_fields=nsites",
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+def test_conditional_request_missing_entry(client):
+    """Check conditional requests for a non-existent entry are not answered with 304
+    Not Modified"""
+    response = client.get("/structures/0")
+    assert response.status_code != 304
+
+    for headers in (
+        {"If-None-Match": "*"},
+        {"If-None-Match": response.headers["ETag"]},
+    ):
+        assert client.get("/structures/0", headers=headers).status_code != 304
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+def test_response_cache(client, monkeypatch, caplog):
+    """Check repeated requests are served from the response cache, and that
+    equivalent filters share the cached response"""
+    from aiida_optimade.config import CONFIG as SERVER_CONFIG
+    from aiida_optimade.main import RESPONSE_CACHE
+
+    monkeypatch.setattr(SERVER_CONFIG, "response_cache", True)
+    RESPONSE_CACHE.clear()
+
+    response = client.get("/structures?filter=nelements>=2&page_limit=5")
+    assert response.status_code == 200, f"Request failed: {response.json()}"
+    assert RESPONSE_CACHE.info()["misses"] == 1
+
+    caplog.clear()
+    cached = client.get("/structures?page_limit=5&filter=nelements >= 2")
+    assert cached.status_code == 200
+    assert cached.content == response.content
+    assert "Age" in cached.headers
+    assert "Using QueryBuilder" not in caplog.text
+    assert RESPONSE_CACHE.info()["hits"] == 1
+
+    # Conditional requests bypass the cache
+    response = client.get(
+        "/structures?page_limit=5&filter=nelements>=2",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+    assert RESPONSE_CACHE.info()["hits"] == 1
+    RESPONSE_CACHE.clear()
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+@pytest.mark.parametrize(
+    "request_str",
+    [
+        "/structures?page_limit=25",
+        "/structures?page_limit=5&sort=-last_modified&filter=nelements>=2",
+        "/structures?page_limit=5&page_offset=10&response_fields=nsites,elements",
+        "/structures?page_limit=5&filter=nelements>100",
+    ],
+)
+def test_streaming(request_str, client, monkeypatch):
+    """Check streamed responses have the same content as regular responses, also
+    when following the pagination links"""
+    from aiida_optimade.config import CONFIG as SERVER_CONFIG
+
+    def _get(url: str) -> dict:
+        response = client.get(url)
+        assert response.status_code == 200, f"Request failed: {response.json()}"
+        response = response.json()
+        response["meta"].pop("time_stamp")
+        return response
+
+    regular = _get(request_str)
+
+    monkeypatch.setattr(SERVER_CONFIG, "streaming_page_limit", 1)
+    monkeypatch.setattr(SERVER_CONFIG, "streaming_batch_size", 2)
+    streamed = _get(request_str)
+    assert streamed == regular
+    StructureResponseMany(**streamed)
+
+    if streamed["links"].get("next"):
+        assert _get(streamed["links"]["next"])["data"]
+
+
 @pytest.mark.skip("Relationships have not yet been implemented")
 class TestSingleStructureWithRelationships(EndpointTests):
     """Tests for /structures/<entry_id>, where <entry_id> has relationships"""
@@ -83,3 +83,499 @@ def test_array_sort_type():
 
     with pytest.raises(TypeError):
         STRUCTURES.parse_sort_params("cartesian_site_positions")
+
+
+def test_calculate_entities_in_chunks():
+    """Test the batched calculation gives the same OPTIMADE extras as calculating the
+    fields Node by Node."""
+    from copy import deepcopy
+
+    from aiida import orm
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    from aiida_optimade.routers.structures import STRUCTURES
+    from aiida_optimade.translators.entities import AiidaEntityTranslator
+
+    if CONFIG.database_backend == SupportedBackend.MONGODB:
+        pytest.skip("The OPTIMADE fields are not stored in Node extras with MongoDB")
+
+    extras_key = AiidaEntityTranslator.EXTRAS_KEY
+    nodes = (
+        orm.QueryBuilder()
+        .append(
+            orm.StructureData,
+            filters={"extras": {"has_key": extras_key}},
+            project="*",
+        )
+        .order_by({orm.StructureData: {"id": "asc"}})
+        .all(flat=True)[:5]
+    )
+    assert nodes
+    expected = {}
+    for node in nodes:
+        expected[node.pk] = deepcopy(node.base.extras.get(extras_key))
+
+    fields = set(STRUCTURES.resource_mapper.ALL_ATTRIBUTES) & set(expected[nodes[0].pk])
+    original_extras_fields = STRUCTURES._extras_fields
+    try:
+        for node in nodes:
+            node.base.extras.delete(extras_key)
+        STRUCTURES._extras_fields = fields
+        assert STRUCTURES._check_and_calculate_entities(
+            entries=[[node.pk] for node in nodes], chunk_size=2
+        ) == [node.pk for node in nodes]
+    finally:
+        STRUCTURES._extras_fields = original_extras_fields
+
+    for node in nodes:
+        calculated = orm.load_node(node.pk).base.extras.get(extras_key)
+        assert calculated == {
+            field: value
+            for field, value in expected[node.pk].items()
+            if field in fields
+        }, node.pk
+        # Restore the original extras
+        node.base.extras.set(extras_key, expected[node.pk])
+
+
+@pytest.mark.parametrize("exceeded", ["partial", "unavailable"])
+def test_request_time_calculation_budget(exceeded: str, client, monkeypatch):
+    """Test the request-time calculation stops when the budget is exceeded, either
+    warning about incomplete data or responding with 503 Service Unavailable."""
+    from copy import deepcopy
+
+    from aiida import orm
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    from aiida_optimade.config import CONFIG as SERVER_CONFIG
+    from aiida_optimade.routers.structures import STRUCTURES
+    from aiida_optimade.translators.entities import AiidaEntityTranslator
+
+    if CONFIG.database_backend == SupportedBackend.MONGODB:
+        pytest.skip("The OPTIMADE fields are not stored in Node extras with MongoDB")
+
+    monkeypatch.setattr(SERVER_CONFIG, "request_time_calculation_max_nodes", 1)
+    monkeypatch.setattr(SERVER_CONFIG, "request_time_calculation_chunk_size", 1)
+    monkeypatch.setattr(SERVER_CONFIG, "request_time_calculation_exceeded", exceeded)
+
+    extras_key = AiidaEntityTranslator.EXTRAS_KEY
+    nodes = (
+        orm.QueryBuilder()
+        .append(
+            orm.StructureData,
+            filters={"extras": {"has_key": extras_key}},
+            project="*",
+        )
+        .order_by({orm.StructureData: {"id": "asc"}})
+        .all(flat=True)[:3]
+    )
+    expected = {node.pk: deepcopy(node.base.extras.get(extras_key)) for node in nodes}
+
+    try:
+        for node in nodes:
+            node.base.extras.delete(extras_key)
+        STRUCTURES._checked_extras_filter_fields = set()
+
+        response = client.get("/structures?filter=nsites>=1")
+        if exceeded == "partial":
+            assert response.status_code == 200, response.json()
+            assert {_["id"] for _ in response.json()["data"]}.isdisjoint(
+                {str(node.pk) for node in nodes[1:]}
+            )
+            assert any(
+                warning["title"] == "FieldsNotCalculated"
+                for warning in response.json()["meta"]["warnings"]
+            ), response.json()["meta"]
+        else:
+            assert response.status_code == 503, response.json()
+            assert int(response.headers["Retry-After"]) >= 1
+            assert response.json()["errors"][0]["title"] == "Service Unavailable"
+
+        # The fields were calculated for the first Node
+        assert orm.load_node(nodes[0].pk).base.extras.get(extras_key, None)
+        assert orm.load_node(nodes[1].pk).base.extras.get(extras_key, None) is None
+    finally:
+        for node in nodes:
+            orm.load_node(node.pk).base.extras.set(extras_key, expected[node.pk])
+        STRUCTURES._checked_extras_filter_fields = set()
+
+
+def test_retry_after(monkeypatch):
+    """Test `Retry-After` is estimated from the remaining Nodes and the time per Node
+    measured so far, within bounds"""
+    from aiida_optimade.common import CalculationBudgetExceeded
+    from aiida_optimade.config import CONFIG
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    def retry_after(calculated: int, remaining: int, seconds: float) -> int:
+        return STRUCTURES._retry_after(
+            CalculationBudgetExceeded(calculated, remaining, seconds)
+        )
+
+    assert retry_after(100, 5_000, 10.0) == 500
+    assert retry_after(100, 1, 10.0) == STRUCTURES.RETRY_AFTER_BOUNDS[0]
+    assert retry_after(1, 10**6, 10.0) == STRUCTURES.RETRY_AFTER_BOUNDS[1]
+
+    monkeypatch.setattr(CONFIG, "background_indexer", False)
+    monkeypatch.setattr(CONFIG, "request_time_calculation_max_seconds", 10.0)
+    assert retry_after(0, 100, 12.0) == 10
+    monkeypatch.setattr(CONFIG, "background_indexer", True)
+    monkeypatch.setattr(CONFIG, "background_indexer_interval", 60.0)
+    assert retry_after(0, 100, 12.0) == 60
+
+
+def test_concurrent_queries():
+    """Test concurrent queries on the shared collection each get their own counts,
+    results, and page cursors."""
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+
+    from fastapi.params import Query
+    from optimade.server.query_params import EntryListingQueryParams
+
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    def _query(optimade_filter: str, page_limit: int) -> dict[str, Any]:
+        """Run a query and collect the state of the collection afterwards"""
+        params = EntryListingQueryParams(filter=optimade_filter, page_limit=page_limit)
+        for attribute, value in params.__dict__.copy().items():
+            if isinstance(value, Query):
+                setattr(params, attribute, value.default)
+        results, data_returned, more_data_available, _, _ = STRUCTURES.find(params)
+        return {
+            "ids": [entry.id for entry in results],
+            "data_returned": data_returned,
+            "more_data_available": more_data_available,
+            "collection_data_returned": STRUCTURES.data_returned,
+            "data_available": len(STRUCTURES),
+            "page_cursors": STRUCTURES.page_cursors,
+        }
+
+    queries = [
+        ('elements HAS "Si"', 5),
+        ('elements HAS "Ga"', 3),
+        ('elements HAS ALL "La","Ba"', 10),
+        ("nsites < 4", 4),
+        ("nelements = 2", 20),
+        ("", 7),
+    ]
+    expected = {query: _query(*query) for query in queries}
+    for result in expected.values():
+        assert result["data_returned"] == result["collection_data_returned"]
+
+    requests = queries * 10
+    random.Random(0).shuffle(requests)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(lambda query: _query(*query), requests))
+
+    for query, result in zip(requests, results):
+        assert result == expected[query], query
+
+
+def test_transform_filter_cache():
+    """Ensure transformed filters are cached, and that copies are returned"""
+    from optimade.server.warnings import UnknownProviderProperty
+
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    STRUCTURES._filter_cache.clear()
+    filters = STRUCTURES.transform_filter("nelements>=2")
+    filters["node_type"] = {"==": "data.core.structure.StructureData."}
+
+    assert STRUCTURES.transform_filter("nelements>=2") != filters
+    assert STRUCTURES._filter_cache.info()["hits"] == 1
+    assert STRUCTURES._filter_cache.info()["misses"] == 1
+
+    # Filters on unknown properties are not cached, since they emit warnings
+    with pytest.warns(UnknownProviderProperty):
+        STRUCTURES.transform_filter('_other_field="value"')
+    assert '_other_field="value"' not in STRUCTURES._filter_cache
+
+
+@pytest.mark.parametrize("response_fields", ["", "nsites,elements"])
+def test_find_by_id(response_fields: str, monkeypatch: pytest.MonkeyPatch):
+    """Ensure retrieving an entry by PK results in the same entry as filtering on its
+    `id`, also when served from the entry cache"""
+    from fastapi.params import Query
+    from optimade.server.query_params import SingleEntryQueryParams
+
+    from aiida_optimade.common import LRUCache
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    def _params() -> SingleEntryQueryParams:
+        params = SingleEntryQueryParams(response_fields=response_fields)
+        for attribute, value in params.__dict__.copy().items():
+            if isinstance(value, Query):
+                setattr(params, attribute, value.default)
+        return params
+
+    pk = STRUCTURES._find_all(project=["id"], limit=1)[0][0]
+    params = _params()
+    params.filter = f'id="{pk}"'
+    expected = STRUCTURES.find(params)
+
+    assert STRUCTURES.find_by_id(pk, _params()) == expected
+    assert STRUCTURES.find_by_id(-1, _params())[:2] == (None, 0)
+
+    monkeypatch.setattr(STRUCTURES, "_entry_cache", LRUCache(maxsize=2))
+    assert STRUCTURES.find_by_id(pk, _params()) == expected
+    assert STRUCTURES.find_by_id(pk, _params()) == expected
+    assert STRUCTURES._entry_cache.info()["hits"] == 1
+    assert STRUCTURES.find_by_id(pk, _params(), validate=False)[0] == expected[0].dict(
+        exclude_unset=True, by_alias=True
+    )
+
+
+def test_row_plan():
+    """Ensure rows are mapped according to their projection"""
+    from aiida_optimade.mappers import StructureMapper
+    from aiida_optimade.translators.utils import floats_to_hex
+
+    project = ("extras.optimade.elements_ratios", "node_type", "id", "uuid")
+    row = [floats_to_hex([0.25, 0.75]), "data.core.structure.StructureData.", 1, "x"]
+    plan = StructureMapper.row_plan(project)
+    assert StructureMapper.row_plan(project) is plan
+
+    with pytest.raises(KeyError):
+        StructureMapper.row_plan(("uuid", "node_type"))
+
+    # Skip calculating the attributes that are not projected
+    plan = plan._replace(missing_attributes=frozenset())
+    assert StructureMapper.map_back_row(row, plan) == {
+        "id": 1,
+        "type": "structures",
+        "attributes": {"elements_ratios": [0.25, 0.75], "immutable_id": "x"},
+    }
+
+
+def test_row_plan_native_floats(monkeypatch):
+    """Ensure natively stored floats are not decoded"""
+    from aiida_optimade.config import CONFIG
+    from aiida_optimade.mappers import StructureMapper
+
+    monkeypatch.setattr(CONFIG, "float_storage", "native")
+    StructureMapper.row_plan.cache_clear()
+    try:
+        project = ("extras.optimade.lattice_vectors", "node_type", "id")
+        plan = StructureMapper.row_plan(project)._replace(
+            missing_attributes=frozenset()
+        )
+        assert plan.attributes == (("lattice_vectors", 0, False),)
+        lattice_vectors = [[0.1, 0.0, 0.0], [0.0, 0.2, 0.0], [0.0, 0.0, 1 / 3]]
+        row = [lattice_vectors, "data.core.structure.StructureData.", 1]
+        assert StructureMapper.map_back_row(row, plan)["attributes"] == {
+            "lattice_vectors": lattice_vectors
+        }
+    finally:
+        StructureMapper.row_plan.cache_clear()
+
+
+def test_calculate_attributes_by_content(monkeypatch, tmp_path):
+    """Ensure the fields calculated for a Node are reused for Nodes with the same
+    content"""
+    from copy import deepcopy
+
+    from aiida_optimade import entry_collections
+    from aiida_optimade.common.cache import LRUCache, SqliteCache
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    node_type = "data.core.structure.StructureData."
+    properties = {
+        "attributes.kinds": [{"name": "Si", "symbols": ["Si"], "weights": [1.0]}],
+        "attributes.sites": [
+            {"kind_name": "Si", "position": [0.0, 0.0, 0.0]},
+            {"kind_name": "Si", "position": [1.25, 1.25, 1.25]},
+        ],
+        "attributes.pbc1": True,
+        "attributes.pbc2": True,
+        "attributes.pbc3": True,
+        "attributes.cell": [[2.5, 0.0, 0.0], [0.0, 2.5, 0.0], [0.0, 0.0, 2.5]],
+    }
+    shared = SqliteCache(filename=tmp_path / "content_cache.sqlite", maxsize=10)
+    monkeypatch.setattr(entry_collections, "_CONTENT_CACHE", shared)
+    monkeypatch.setattr(STRUCTURES, "_content_cache", LRUCache(maxsize=4))
+    monkeypatch.setattr(STRUCTURES, "_content_cache_hits", 0)
+    monkeypatch.setattr(STRUCTURES, "_extras_fields", {"elements", "nsites"})
+
+    expected = {"elements": ["Si"], "nsites": 2}
+    assert STRUCTURES._calculate_attributes(1, node_type, properties) == expected
+    assert (
+        STRUCTURES._calculate_attributes(2, node_type, deepcopy(properties)) == expected
+    )
+    assert STRUCTURES._content_cache_hits == 1
+
+    moved = deepcopy(properties)
+    moved["attributes.sites"][1]["position"] = [1.25, 1.25, 1.5]
+    assert STRUCTURES._calculate_attributes(3, node_type, moved) == expected
+    assert STRUCTURES._content_cache_hits == 1
+
+    # Other fields are calculated separately
+    monkeypatch.setattr(STRUCTURES, "_extras_fields", {"nelements"})
+    assert STRUCTURES._calculate_attributes(4, node_type, properties) == {
+        "elements": ["Si"],
+        "nelements": 1,
+    }
+    assert STRUCTURES._content_cache_hits == 1
+
+    # The fields are shared with other processes, which do not have them in-process
+    assert len(shared) == 3
+    monkeypatch.setattr(STRUCTURES, "_content_cache", LRUCache(maxsize=4))
+    monkeypatch.setattr(STRUCTURES, "_extras_fields", {"elements", "nsites"})
+    monkeypatch.setattr(
+        STRUCTURES.resource_mapper,
+        "calculate_attributes",
+        lambda **_: pytest.fail("The fields should not be calculated again"),
+    )
+    assert STRUCTURES._calculate_attributes(5, node_type, moved) == expected
+    assert STRUCTURES._content_cache_hits == 2
+
+
+def test_calculate_chunk_quarantine(monkeypatch):
+    """Ensure a Node for which the fields cannot be calculated is quarantined, while
+    the fields are stored for the other Nodes in the chunk"""
+    from aiida_optimade import entry_collections
+    from aiida_optimade.common.cache import LRUCache
+    from aiida_optimade.routers.structures import STRUCTURES
+    from aiida_optimade.translators.entities import AiidaEntityTranslator
+
+    node_type = "data.core.structure.StructureData."
+    node_properties = [
+        "attributes.kinds",
+        "attributes.sites",
+        "attributes.pbc1",
+        "attributes.pbc2",
+        "attributes.pbc3",
+        "attributes.cell",
+    ]
+    kinds = [{"name": "Si", "symbols": ["Si"], "weights": [1.0]}]
+    cell = [[2.5, 0.0, 0.0], [0.0, 2.5, 0.0], [0.0, 0.0, 2.5]]
+    chunk = [
+        [1, node_type, kinds, [{"kind_name": "Si", "position": [0.0] * 3}]]
+        + [True, True, True, cell],
+        # A site of an unknown kind
+        [2, node_type, kinds, [{"kind_name": "Xe", "position": [0.0] * 3}]]
+        + [True, True, True, cell],
+    ]
+    monkeypatch.setattr(STRUCTURES, "_find_all", lambda **_: chunk)
+    monkeypatch.setattr(STRUCTURES, "_content_cache", LRUCache(maxsize=4))
+    monkeypatch.setattr(entry_collections.CONFIG, "content_cache_file_size", 0)
+    monkeypatch.setattr(
+        STRUCTURES, "_extras_fields", {"nsites", "chemical_formula_descriptive"}
+    )
+
+    updates = []
+    monkeypatch.setattr(
+        STRUCTURES,
+        "_update_extras",
+        lambda storage, merge=None, remove=None: updates.extend(merge),
+    )
+    STRUCTURES._calculate_chunk([1, 2], "optimade", node_properties, storage=None)
+
+    # Only the updated keys are written, leaving other extras untouched
+    updates = {pk: (key, value) for pk, key, value in updates}
+    assert updates[1] == (
+        "optimade",
+        {"chemical_formula_descriptive": "Si", "nsites": 1},
+    )
+    key, record = updates[2]
+    assert key == AiidaEntityTranslator.QUARANTINE_KEY
+    assert "kind with name Xe cannot be found" in record["error"]
+    assert record["fields"] == ["chemical_formula_descriptive", "nsites"]
+
+
+def test_calculate_chunk_unexpected_error(monkeypatch):
+    """Ensure an error not caused by the data of a Node is raised instead of
+    quarantining the Node, leaving the whole chunk unchanged"""
+    from aiida_optimade import entry_collections
+    from aiida_optimade.common.cache import LRUCache
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    node_type = "data.core.structure.StructureData."
+    chunk = [[1, node_type, 1], [2, node_type, 2]]
+    monkeypatch.setattr(STRUCTURES, "_find_all", lambda **_: chunk)
+    monkeypatch.setattr(STRUCTURES, "_content_cache", LRUCache(maxsize=4))
+    monkeypatch.setattr(entry_collections.CONFIG, "content_cache_file_size", 0)
+    monkeypatch.setattr(STRUCTURES, "_extras_fields", {"nsites"})
+
+    def calculate_attributes(entry_pk, **_):
+        if entry_pk == 2:
+            raise RuntimeError("Lost the connection to the repository")
+        return {"nsites": 1}
+
+    monkeypatch.setattr(
+        STRUCTURES.resource_mapper, "calculate_attributes", calculate_attributes
+    )
+    updates = []
+    monkeypatch.setattr(
+        STRUCTURES,
+        "_update_extras",
+        lambda storage, merge=None, remove=None: updates.extend(merge),
+    )
+    with pytest.raises(RuntimeError, match="Lost the connection"):
+        STRUCTURES._calculate_chunk(
+            [1, 2], "optimade", ["attributes.sites"], storage=None
+        )
+    assert not updates
+
+
+def test_update_extras():
+    """Ensure updating the OPTIMADE extras keeps extras written since they were
+    retrieved"""
+    from aiida import orm
+    from aiida.manage.manager import get_manager
+
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    node = orm.Dict({"a": 1}).store()
+    node.base.extras.set_many({"optimade": {"nsites": 1}, "user": 1})
+    mtime = node.mtime
+
+    STRUCTURES._update_extras(
+        get_manager().get_profile_storage(),
+        merge=[(node.pk, "optimade", {"nelements": 2}), (node.pk, "new", {"b": 3})],
+    )
+    node = orm.load_node(node.pk)
+    assert node.base.extras.all == {
+        "optimade": {"nsites": 1, "nelements": 2},
+        "new": {"b": 3},
+        "user": 1,
+    }
+    assert node.mtime > mtime
+
+    STRUCTURES._update_extras(
+        get_manager().get_profile_storage(), remove=[(node.pk, "new")]
+    )
+    assert orm.load_node(node.pk).base.extras.all == {
+        "optimade": {"nsites": 1, "nelements": 2},
+        "user": 1,
+    }
+
+
+@pytest.mark.parametrize(
+    "optimade_filter",
+    [
+        "id=1 OR id=2 OR id=3 OR id=1",
+        "elements LENGTH 3",
+        "elements LENGTH >= 3 AND nsites<10",
+        "cartesian_site_positions LENGTH <= 4 OR species_at_sites LENGTH > 20",
+        "NOT (NOT (nelements=2 OR nelements=3))",
+        '(elements HAS "Si" AND (nsites=2 AND nelements=2)) OR elements HAS "Ba"',
+        'chemical_formula_reduced="O2Si" OR chemical_formula_reduced="BaO3Ti"',
+    ],
+)
+def test_optimized_filters(optimade_filter: str):
+    """Ensure optimized filters match the same Nodes as the unoptimized filters"""
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    if CONFIG.database_backend == SupportedBackend.MONGODB:
+        pytest.skip("Filters are not transformed to QueryBuilder filters with MongoDB")
+
+    filters = STRUCTURES.transformer.transform(STRUCTURES.parser.parse(optimade_filter))
+    optimized = STRUCTURES.transform_filter(optimade_filter)
+    assert optimized == STRUCTURES.optimizer.optimize(filters)
+
+    assert STRUCTURES._find_all(filters=optimized, project="id") == (
+        STRUCTURES._find_all(filters=filters, project="id")
+    )
@@ -0,0 +1,64 @@
+"""Test the bounded executor for the database work of requests"""
+
+# pylint: disable=import-error,protected-access
+import os
+
+import pytest
+
+
+@pytest.mark.skipif(
+    os.getenv("PYTEST_OPTIMADE_CONFIG_FILE") is not None,
+    reason="Test is not for MongoDB",
+)
+def test_database_executor():
+    """Test each thread reuses its session, which is reset between tasks"""
+    import asyncio
+    import threading
+
+    from aiida import orm
+    from aiida.manage.manager import get_manager
+
+    from aiida_optimade.executor import DatabaseExecutor
+
+    def _work() -> tuple[int, int, int]:
+        session = get_manager().get_profile_storage().get_session()
+        count = orm.QueryBuilder().append(orm.StructureData).count()
+        assert session.in_transaction()
+        return threading.get_ident(), id(session), count
+
+    async def _run(executor: DatabaseExecutor) -> list[tuple[int, int, int]]:
+        return await asyncio.gather(*(executor.run(_work) for _ in range(20)))
+
+    executor = DatabaseExecutor(max_workers=2)
+    try:
+        results = asyncio.run(_run(executor))
+        assert len({thread for thread, _, _ in results}) <= 2
+        assert len({(thread, session) for thread, session, _ in results}) == len(
+            {thread for thread, _, _ in results}
+        )
+        assert len({count for _, _, count in results}) == 1
+        assert executor.metrics() == {"max_workers": 2, "active": 0, "tasks": 20}
+
+        # The transaction was ended, returning the connection to the pool
+        session = executor._executor.submit(
+            lambda: get_manager().get_profile_storage().get_session()
+        ).result()
+        assert not session.in_transaction()
+    finally:
+        executor.shutdown()
+
+
+def test_run_in_db_executor(client, monkeypatch):
+    """Test the structures endpoints run in the database executor when set up"""
+    from aiida_optimade.executor import DatabaseExecutor
+    from aiida_optimade.main import APP
+
+    executor = DatabaseExecutor(max_workers=2)
+    monkeypatch.setattr(APP.state, "db_executor", executor, raising=False)
+    try:
+        response = client.get("/structures?page_limit=2")
+        assert response.status_code == 200, response.json()
+        assert len(response.json()["data"]) == 2
+        assert executor.metrics()["tasks"] == 1
+    finally:
+        executor.shutdown()
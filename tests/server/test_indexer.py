@@ -0,0 +1,98 @@
+"""Test the background indexer"""
+
+# pylint: disable=import-error,protected-access
+import pytest
+
+
+def test_indexer_metrics():
+    """The metrics should reflect that no pass has been run yet"""
+    from aiida_optimade.indexer import BackgroundIndexer
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    indexer = BackgroundIndexer(STRUCTURES, interval=60)
+    assert indexer.collection is not STRUCTURES
+    assert indexer.lag is None
+    assert indexer.metrics() == {
+        "running": False,
+        "lag_seconds": None,
+        "passes": 0,
+        "last_pass_nodes": 0,
+        "total_nodes": 0,
+        "last_error": None,
+    }
+
+
+def test_indexer_watermarks(monkeypatch: pytest.MonkeyPatch):
+    """The watermarks should be taken from the database, and Nodes modified shortly
+    before the latest modification time should be checked again"""
+    from datetime import datetime, timezone
+
+    from aiida_optimade.indexer import BackgroundIndexer
+    from aiida_optimade.routers.structures import STRUCTURES
+
+    indexer = BackgroundIndexer(STRUCTURES, interval=60)
+    mtime = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    calls = []
+    monkeypatch.setattr(indexer.collection, "_get_watermark", lambda: [10, 42, mtime])
+    monkeypatch.setattr(
+        indexer.collection,
+        "_check_and_calculate_entities",
+        lambda **kwargs: calls.append(kwargs["filters"]) or [],
+    )
+
+    indexer.run_once()
+    indexer.run_once()
+    assert calls == [
+        None,
+        {
+            "or": [
+                {"id": {">": 42}},
+                {"mtime": {">=": mtime - BackgroundIndexer.MTIME_MARGIN}},
+            ]
+        },
+    ]
+
+
+def test_indexer_run_once():
+    """A pass should calculate the OPTIMADE fields for Nodes missing them, and the
+    next pass should only check new or modified Nodes"""
+    from copy import deepcopy
+
+    from aiida import orm
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    from aiida_optimade.indexer import BackgroundIndexer
+    from aiida_optimade.routers.structures import STRUCTURES
+    from aiida_optimade.translators.entities import AiidaEntityTranslator
+
+    if CONFIG.database_backend == SupportedBackend.MONGODB:
+        pytest.skip("The background indexer is not used with MongoDB")
+
+    extras_key = AiidaEntityTranslator.EXTRAS_KEY
+    node = (
+        orm.QueryBuilder()
+        .append(orm.StructureData, filters={"extras": {"has_key": extras_key}})
+        .first(flat=True)
+    )
+    expected = deepcopy(node.base.extras.get(extras_key))
+
+    indexer = BackgroundIndexer(STRUCTURES, interval=60, chunk_size=10)
+    try:
+        node.base.extras.delete(extras_key)
+
+        assert node.pk in indexer.run_once()
+        calculated = orm.load_node(node.pk).base.extras.get(extras_key)
+        assert calculated == {
+            field: value
+            for field, value in expected.items()
+            if field in indexer.collection._extras_fields
+        }
+
+        assert indexer.run_once() == []
+        metrics = indexer.metrics()
+        assert metrics["passes"] == 2
+        assert metrics["total_nodes"] == 1
+        assert metrics["last_pass_nodes"] == 0
+        assert 0 <= metrics["lag_seconds"] < 60
+    finally:
+        orm.load_node(node.pk).base.extras.set(extras_key, expected)
@@ -33,3 +33,39 @@ def test_redirect_docs(version: str):
         assert urlparse(str(response.url)) == urlparse(
             urljoin(str(client.base_url), f"v{__api_version__.split('.')[0]}{endpoint}")
         ), f"Failed for endpoint '{name}''"
+
+
+def test_add_warnings_streaming():
+    """Check streamed responses pass `AddWarnings` unchanged, while the warnings of
+    the request are made available to them"""
+    import warnings
+
+    from optimade.server.warnings import QueryParamNotUsed
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+
+    from aiida_optimade.middleware import AddWarnings
+
+    def regular(_):
+        warnings.warn(QueryParamNotUsed(detail="Regular"))
+        return JSONResponse({"meta": {}})
+
+    def streamed(request):
+        warnings.warn(QueryParamNotUsed(detail="Streamed"))
+        request.state.streaming = True
+        details = [_["detail"] for _ in request.state.optimade_warnings]
+        return StreamingResponse(iter([b'{"meta":', f'"{details[0]}"'.encode(), b"}"]))
+
+    app = Starlette(routes=[Route("/regular", regular), Route("/streamed", streamed)])
+    app.add_middleware(AddWarnings)
+    client = TestClient(app)
+
+    with pytest.warns(QueryParamNotUsed):
+        response = client.get("/regular")
+    assert response.json()["meta"]["warnings"][0]["detail"] == "Regular"
+
+    with pytest.warns(QueryParamNotUsed):
+        response = client.get("/streamed")
+    assert response.json() == {"meta": "Streamed"}
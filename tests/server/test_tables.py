@@ -0,0 +1,179 @@
+"""Test the materialized OPTIMADE structures table"""
+
+# pylint: disable=import-error,protected-access
+import pytest
+
+
+def compile_filter(filter_: str):
+    """Parse, transform, and compile an OPTIMADE filter for the structures table"""
+    from optimade.filterparser import LarkParser
+    from sqlalchemy.dialects import postgresql
+
+    from aiida_optimade.mappers import StructureMapper
+    from aiida_optimade.tables import StructuresTable
+    from aiida_optimade.transformers import AiidaTransformer
+
+    filters = AiidaTransformer(mapper=StructureMapper).transform(
+        LarkParser(version=(1, 1, 0)).parse(filter_)
+    )
+    table = StructuresTable(entities=["data.core.structure.StructureData."])
+    return table.compile_filters(filters).compile(dialect=postgresql.dialect())
+
+
+def test_compile_filters():
+    """Filters on materialized fields should compile to typed column predicates"""
+    compiled = compile_filter('elements HAS ALL "Si","O" AND nsites<20.5')
+    assert "aiida_optimade_structures.elements @>" in str(compiled)
+    assert "aiida_optimade_structures.nsites <" in str(compiled)
+    # Floats are converted from their hex string representation
+    assert sorted(compiled.params.values(), key=str) == [20.5, ["Si", "O"]]
+
+    compiled = compile_filter("elements LENGTH >= 2 AND nelements IS KNOWN")
+    assert "cardinality(aiida_optimade_structures.elements) >" in str(compiled)
+    assert "aiida_optimade_structures.nelements IS NOT NULL" in str(compiled)
+
+
+def test_compile_unsupported_filters():
+    """Filters on fields that are not materialized cannot be compiled"""
+    from aiida_optimade.tables import UnsupportedQuery
+
+    with pytest.raises(UnsupportedQuery):
+        compile_filter("lattice_vectors IS KNOWN")
+
+    with pytest.raises(UnsupportedQuery):
+        compile_filter('nsites = "5"')
+
+
+def test_structures_table_results(get_good_response):
+    """Querying the structures table should give the same results as querying the
+    Node extras"""
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    from aiida_optimade.routers.structures import STRUCTURES
+    from aiida_optimade.tables import StructuresTable
+
+    if CONFIG.database_backend == SupportedBackend.MONGODB:
+        pytest.skip("The structures table is not used with MongoDB")
+
+    requests = [
+        '/structures?filter=elements HAS ALL "Ba","O"&page_limit=10',
+        "/structures?filter=nsites<10 AND nelements>=2&sort=-nsites&page_limit=10",
+        '/structures?filter=chemical_formula_reduced STARTS "Ba"&page_limit=10',
+        "/structures?filter=lattice_vectors IS KNOWN&page_limit=10",
+    ]
+    expected = [get_good_response(request) for request in requests]
+
+    STRUCTURES.table = StructuresTable(
+        entities=STRUCTURES.entities,
+        group=STRUCTURES.group,
+        project_prefix=STRUCTURES.resource_mapper.PROJECT_PREFIX,
+    )
+    STRUCTURES._clear_cache()
+    try:
+        STRUCTURES.table.create()
+        assert STRUCTURES.sync_table()
+        assert not STRUCTURES.table.outdated_node_ids()
+
+        for request, expected_response in zip(requests, expected):
+            response = get_good_response(request)
+            assert [_["id"] for _ in response["data"]] == [
+                _["id"] for _ in expected_response["data"]
+            ], request
+            assert (
+                response["meta"]["data_returned"]
+                == expected_response["meta"]["data_returned"]
+            ), request
+    finally:
+        STRUCTURES.table.drop()
+        STRUCTURES.table = None
+        STRUCTURES._clear_cache()
+
+
+def test_sync_table_without_calculating(monkeypatch: pytest.MonkeyPatch):
+    """Syncing the table while handling requests should not calculate OPTIMADE
+    fields, only writing the rows of Nodes for which they have been calculated"""
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    from aiida_optimade.routers.structures import STRUCTURES
+    from aiida_optimade.tables import StructuresTable
+
+    if CONFIG.database_backend == SupportedBackend.MONGODB:
+        pytest.skip("The structures table is not used with MongoDB")
+
+    def calculate(*args, **kwargs):
+        raise AssertionError("The OPTIMADE fields should not be calculated")
+
+    table = StructuresTable(
+        entities=STRUCTURES.entities,
+        group=STRUCTURES.group,
+        project_prefix=STRUCTURES.resource_mapper.PROJECT_PREFIX,
+    )
+    calculated = [
+        pk
+        for (pk,) in STRUCTURES._find_all(
+            filters={
+                STRUCTURES.resource_mapper.PROJECT_PREFIX.rstrip("."): {
+                    "and": [
+                        {"has_key": field} for field in STRUCTURES._all_extras_fields()
+                    ]
+                }
+            },
+            project=["id"],
+        )
+    ]
+    monkeypatch.setattr(STRUCTURES, "_check_and_calculate_entities", calculate)
+    try:
+        table.create()
+        assert sorted(STRUCTURES.sync_table(table=table, calculate=False)) == sorted(
+            calculated
+        )
+    finally:
+        table.drop()
+
+
+def test_nodes_without_row(get_good_response):
+    """Served Nodes without a row in the table should still be listed and counted"""
+    from aiida import orm
+    from aiida.tools import delete_nodes
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    from aiida_optimade.routers.structures import STRUCTURES
+    from aiida_optimade.tables import StructuresTable
+
+    if CONFIG.database_backend == SupportedBackend.MONGODB:
+        pytest.skip("The structures table is not used with MongoDB")
+
+    STRUCTURES.table = StructuresTable(
+        entities=STRUCTURES.entities,
+        group=STRUCTURES.group,
+        project_prefix=STRUCTURES.resource_mapper.PROJECT_PREFIX,
+    )
+    STRUCTURES._clear_cache()
+    node = None
+    try:
+        STRUCTURES.table.create()
+        assert STRUCTURES.sync_table()
+        data_available = get_good_response("/structures")["meta"]["data_available"]
+
+        node = orm.StructureData(cell=[[2.5, 0, 0], [0, 2.5, 0], [0, 0, 2.5]])
+        node.append_atom(position=(0.0, 0.0, 0.0), symbols="Si")
+        node.store()
+        STRUCTURES._clear_cache()
+        assert node.pk in STRUCTURES.table.outdated_node_ids()
+
+        response = get_good_response("/structures")
+        assert response["meta"]["data_available"] == data_available + 1
+        assert response["meta"]["data_returned"] == data_available + 1
+
+        for request in (
+            f'/structures?filter=id="{node.pk}"',
+            f'/structures?filter=id="{node.pk}"&sort=nsites',
+        ):
+            response = get_good_response(request)
+            assert [_["id"] for _ in response["data"]] == [str(node.pk)], request
+    finally:
+        if node is not None:
+            delete_nodes([node.pk], dry_run=False)
+        STRUCTURES.table.drop()
+        STRUCTURES.table = None
+        STRUCTURES._clear_cache()
@@ -91,6 +91,21 @@ def test_number_values():
         transform("number=0.0.1")
 
 
+def test_native_float_values():
+    """Check float values are kept as floats when stored natively"""
+    transformer = AiidaTransformer(native_floats=True)
+
+    def transform_native(filter_value: str):
+        """Transform `filter_value` with native floats"""
+        return transformer.transform(PARSER.parse(filter_value))
+
+    assert transform_native("a = 12345") == {"a": {"==": 12345}}
+    assert transform_native("d = 1.2") == {"d": {"==": 1.2}}
+    assert transform_native("g = +10.01E-10") == {"g": {"==": 1.001e-09}}
+    assert transform_native("h > 6.03e23") == {"h": {">": 6.03e23}}
+    assert transform_native("1.5 < x") == {"x": {">": 1.5}}
+
+
 def test_simple_comparisons():
     """Check simple comparisons"""
     assert transform("a<3") == {"a": {"<": 3}}
@@ -0,0 +1,203 @@
+# pylint: disable=import-error
+import fnmatch
+import random
+
+import pytest
+from optimade.filterparser import LarkParser
+
+from aiida_optimade.transformers import AiidaTransformer, FilterOptimizer
+
+PARSER = LarkParser(version=(1, 1, 0), variant="default")
+TRANSFORMER = AiidaTransformer()
+OPTIMIZER = FilterOptimizer(
+    length_aliases={"elements": "nelements", "cartesian_site_positions": "nsites"}
+)
+
+COMPARISONS = [
+    "id=1",
+    "id=2",
+    "id=3",
+    "id>5",
+    "nelements=2",
+    "nelements=3",
+    "nelements>2",
+    "nelements>=2",
+    "nelements<=1",
+    "elements LENGTH 2",
+    "elements LENGTH >= 3",
+    "elements LENGTH <= 1",
+    "elements LENGTH > 2",
+    "nsites=1",
+    "nsites=4",
+    "nsites<3",
+    "cartesian_site_positions LENGTH 4",
+    "cartesian_site_positions LENGTH < 3",
+    'elements HAS "Si"',
+    'elements HAS ANY "Si","O"',
+    'elements HAS ALL "Si","O"',
+    'chemical_formula_reduced="O2Si"',
+    'chemical_formula_reduced="FeO"',
+    'chemical_formula_reduced STARTS "Fe"',
+    "chemical_formula_hill IS KNOWN",
+]
+
+
+def transform(filter_value: str) -> dict:
+    """Transform `filter_value` without optimizing it"""
+    return TRANSFORMER.transform(PARSER.parse(filter_value))
+
+
+def entries() -> list[dict]:
+    """Synthetic entries, where the lengths of the list fields are consistent"""
+    rng = random.Random(0)
+    formulas = ["O2Si", "FeO", "Fe2O3", "MgO", None]
+    res = []
+    for pk in range(1, 41):
+        elements = sorted(rng.sample(["Fe", "Mg", "O", "Si"], rng.randint(1, 4)))
+        nsites = rng.randint(1, 5)
+        res.append(
+            {
+                "id": pk,
+                "elements": elements,
+                "nelements": len(elements),
+                "cartesian_site_positions": [
+                    [0.0, 0.0, float(_)] for _ in range(nsites)
+                ],
+                "nsites": nsites,
+                "chemical_formula_reduced": rng.choice(formulas),
+                "chemical_formula_hill": rng.choice(formulas),
+            }
+        )
+    return res
+
+
+def matches(filters: dict, entry: dict) -> bool:  # pylint: disable=too-many-branches
+    """Evaluate QueryBuilder `filters` for `entry`
+
+    As for the QueryBuilder, comparisons of missing (`None`) values are false.
+    """
+    results = []
+    for key, value in filters.items():
+        if key in ("and", "or", "!and", "!or"):
+            result = (all if key.endswith("and") else any)(
+                matches(_, entry) for _ in value
+            )
+            results.append(not result if key.startswith("!") else result)
+        else:
+            results.append(matches_spec(key, value, entry))
+    return all(results)
+
+
+def matches_spec(field: str, spec: dict, entry: dict) -> bool:
+    """Evaluate the filter `spec` of a single `field` for `entry`"""
+    results = []
+    for operator, value in spec.items():
+        if operator in ("and", "or", "!and", "!or"):
+            result = (all if operator.endswith("and") else any)(
+                matches_spec(field, _, entry) for _ in value
+            )
+            results.append(not result if operator.startswith("!") else result)
+            continue
+
+        actual = entry.get(field)
+        if operator == "==" and value is None:
+            results.append(actual is None)
+        elif operator == "!==" and value is None:
+            results.append(actual is not None)
+        elif actual is None:
+            results.append(False)
+        elif operator == "like":
+            results.append(fnmatch.fnmatchcase(actual, value.replace("%", "*")))
+        else:
+            results.append(
+                {
+                    "==": lambda: actual == value,
+                    "!==": lambda: actual != value,
+                    "<": lambda: actual < value,
+                    "<=": lambda: actual <= value,
+                    ">": lambda: actual > value,
+                    ">=": lambda: actual >= value,
+                    "in": lambda: actual in value,
+                    "contains": lambda: all(_ in actual for _ in value),
+                    "of_length": lambda: len(actual) == value,
+                    "longer": lambda: len(actual) > value,
+                    "shorter": lambda: len(actual) < value,
+                }[operator]()
+            )
+    return all(results)
+
+
+def random_filter(rng: random.Random, depth: int = 0) -> str:
+    """A random OPTIMADE filter combining `COMPARISONS`"""
+    if depth > 2 or rng.random() < 0.3:
+        return rng.choice(COMPARISONS)
+    operator = rng.choice([" AND ", " OR ", " OR "])
+    operands = [random_filter(rng, depth + 1) for _ in range(rng.randint(2, 4))]
+    res = f"({operator.join(operands)})"
+    return f"NOT {res}" if rng.random() < 0.2 else res
+
+
+@pytest.mark.parametrize(
+    "filter_value,expected",
+    [
+        ("id=1 OR id=2 OR id=3", {"id": {"in": [1, 2, 3]}}),
+        ("id=1 OR id=2 OR id=1", {"id": {"in": [1, 2]}}),
+        ("elements LENGTH 3", {"nelements": {"==": 3}}),
+        ("elements LENGTH >= 3", {"nelements": {">=": 3}}),
+        ("cartesian_site_positions LENGTH <= 3", {"nsites": {"<=": 3}}),
+        ("NOT (NOT nsites=1)", {"nsites": {"==": 1}}),
+        (
+            "(nelements=2 AND (nsites=1 AND id=1)) AND nelements=2",
+            {
+                "and": [
+                    {"nelements": {"==": 2}},
+                    {"nsites": {"==": 1}},
+                    {"id": {"==": 1}},
+                ]
+            },
+        ),
+        (
+            'id=1 OR chemical_formula_reduced="FeO" OR id=2',
+            {
+                "or": [
+                    {"id": {"in": [1, 2]}},
+                    {"chemical_formula_reduced": {"==": "FeO"}},
+                ]
+            },
+        ),
+        # Values of different JSON types cannot be merged
+        ('id=1 OR id="2"', {"or": [{"id": {"==": 1}}, {"id": {"==": "2"}}]}),
+        # The lengths of other list fields are not rewritten
+        ("species LENGTH 3", {"species": {"of_length": 3}}),
+    ],
+)
+def test_optimize(filter_value: str, expected: dict):
+    """Check the optimized form of specific filters"""
+    assert OPTIMIZER.optimize(transform(filter_value)) == expected
+
+
+def test_empty():
+    """Check empty filters are passed through"""
+    assert OPTIMIZER.optimize(None) is None
+    assert OPTIMIZER.optimize({}) == {}
+
+
+def test_idempotent():
+    """Check optimizing an optimized filter does not change it"""
+    rng = random.Random(1)
+    for _ in range(200):
+        optimized = OPTIMIZER.optimize(transform(random_filter(rng)))
+        assert OPTIMIZER.optimize(optimized) == optimized
+
+
+@pytest.mark.parametrize(
+    "filter_value", COMPARISONS + [random_filter(random.Random(_)) for _ in range(300)]
+)
+def test_equivalence(filter_value: str):
+    """Check the optimized filter matches the same entries as the unoptimized one"""
+    filters = transform(filter_value)
+    optimized = OPTIMIZER.optimize(transform(filter_value))
+
+    assert [entry["id"] for entry in entries() if matches(optimized, entry)] == [
+        entry["id"] for entry in entries() if matches(filters, entry)
+    ], optimized
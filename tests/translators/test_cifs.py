@@ -0,0 +1,122 @@
+"""Tests for aiida_optimade.translators.cifs"""
+
+# pylint: disable=import-error,protected-access
+
+KINDS = [
+    {"name": "Na", "symbols": ["Na"], "weights": [1.0], "mass": 22.99},
+    {"name": "Cl", "symbols": ["Cl"], "weights": [1.0], "mass": 35.45},
+]
+SITES = [
+    {"kind_name": "Na", "position": (0.0, 0.0, 0.0)},
+    {"kind_name": "Cl", "position": (2.82, 2.82, 2.82)},
+]
+CELL = [[5.64, 0.0, 0.0], [0.0, 5.64, 0.0], [0.0, 0.0, 5.64]]
+PBC = [1, 1, 1]
+
+
+def test_compact_structure():
+    """Ensure structures are restored from their compact representation"""
+    import json
+
+    from aiida_optimade.translators.cifs import compact_structure, expand_structure
+
+    compact = compact_structure(KINDS, SITES, CELL, PBC)
+    assert compact["site_kinds"] == [0, 1]
+
+    kinds, sites, cell, pbc = expand_structure(json.loads(json.dumps(compact)))
+    assert kinds == KINDS
+    assert sites == [
+        {"kind_name": site["kind_name"], "position": list(site["position"])}
+        for site in SITES
+    ]
+    assert cell == CELL
+    assert pbc == PBC
+
+
+def test_cif_cache_key():
+    """Ensure the key depends on the CIF file and the parser parameters"""
+    from aiida_optimade.translators.cifs import cif_cache_key
+
+    assert cif_cache_key("abc", {}) == cif_cache_key("abc", {})
+    assert cif_cache_key("abc", {}) != cif_cache_key("abd", {})
+    assert cif_cache_key("abc", {}) != cif_cache_key("abc", {"primitive_cell": True})
+
+
+def test_content_version(monkeypatch):
+    """Ensure fields calculated for the same CIF file are not reused after changing
+    the parser version or parameters"""
+    from aiida_optimade.entry_collections import content_cache_key
+    from aiida_optimade.translators import cifs
+
+    node_type = "data.core.cif.CifData."
+
+    def key() -> str:
+        return content_cache_key(
+            node_type, "abc", {"nsites"}, cifs.CifDataTranslator.content_version()
+        )
+
+    original = key()
+    assert key() == original
+
+    monkeypatch.setattr(cifs, "PARSER_PARAMETERS", {"primitive_cell": True})
+    assert key() != original
+    monkeypatch.undo()
+
+    monkeypatch.setattr(cifs, "_parser_version", lambda: "pymatgen==0.0.0")
+    assert key() != original
+
+
+def test_cached_structure(tmp_path, monkeypatch):
+    """Ensure a cached structure is used instead of parsing the CIF file"""
+    from aiida_optimade.common import SqliteCache
+    from aiida_optimade.translators import cifs
+
+    cache = SqliteCache(filename=tmp_path / "cif_structures.sqlite")
+    cache.set(
+        cifs.cif_cache_key("abc", cifs.PARSER_PARAMETERS),
+        cifs.compact_structure(KINDS, SITES, CELL, PBC),
+    )
+    monkeypatch.setattr(cifs, "_CIF_CACHE", cache)
+
+    def fail(*_, **__):
+        raise AssertionError("The CIF file should not be parsed")
+
+    monkeypatch.setattr(cifs, "_get_aiida_structure_pymatgen_inline", fail)
+
+    translator = cifs.CifDataTranslator(1, properties={"attributes.md5": "abc"})
+    assert translator.chemical_formula_reduced() == "ClNa"
+    assert translator.nsites() == 2
+    assert translator.cartesian_site_positions() == [
+        list(site["position"]) for site in SITES
+    ]
+    assert translator.lattice_vectors() == CELL
+    assert translator.dimension_types() == PBC
+
+
+def test_parse_timeout(monkeypatch):
+    """Ensure parsing a CIF file is stopped when exceeding the time limit"""
+    import io
+    import sys
+    import time
+
+    import pytest
+
+    from aiida_optimade.common import CalculationLimitExceeded
+    from aiida_optimade.config import CONFIG
+    from aiida_optimade.translators import cifs
+
+    if not sys.platform.startswith("linux"):
+        pytest.skip("Limits are only tested with forked processes")
+
+    class Cif:  # pylint: disable=too-few-public-methods
+        """A CifData Node with a CIF file"""
+
+        @staticmethod
+        def open():
+            return io.StringIO("data_pathological\n")
+
+    monkeypatch.setattr(cifs, "_parse_cif", lambda *_: time.sleep(30))
+    monkeypatch.setattr(CONFIG, "node_calculation_timeout", 0.5)
+
+    with pytest.raises(CalculationLimitExceeded, match="time limit"):
+        cifs._get_aiida_structure_pymatgen_inline(Cif(), parameters={})
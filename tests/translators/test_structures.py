@@ -0,0 +1,103 @@
+"""Tests for aiida_optimade.translators.structures"""
+
+# pylint: disable=import-error
+import pytest
+
+PROPERTIES = {
+    "attributes.kinds": [
+        {"name": "Si", "symbols": ["Si"], "weights": [1.0], "mass": 28.085},
+        {"name": "O", "symbols": ["O"], "weights": [1.0], "mass": 15.999},
+        {"name": "MgFe", "symbols": ["Fe", "Mg"], "weights": [0.5, 0.5]},
+    ],
+    "attributes.sites": [
+        {"kind_name": "Si", "position": [0.0, 0.0, 0.0]},
+        {"kind_name": "O", "position": [1e-9, 1.5, 0.25]},
+        {"kind_name": "O", "position": [1.5, -2e-9, 0.75]},
+        {"kind_name": "MgFe", "position": [1.5, 1.5, 1.5]},
+        {"kind_name": "MgFe", "position": [0.5, 2.5, 1.0]},
+    ],
+    "attributes.pbc1": True,
+    "attributes.pbc2": True,
+    "attributes.pbc3": False,
+    "attributes.cell": [[3.0, 0.0, 0.0], [0.0, 3.0, 1e-10], [0.0, 0.0, 3.0]],
+}
+
+
+def test_shared_intermediates():
+    """Ensure the fields derived from the shared intermediate results are correct"""
+    from aiida_optimade.translators import StructureDataTranslator
+    from aiida_optimade.translators.utils import hex_to_floats
+
+    translator = StructureDataTranslator(1, properties=PROPERTIES)
+
+    assert translator._site_kinds.tolist() == [0, 1, 1, 2, 2]
+    assert translator._kind_site_counts == [1, 2, 2]
+    assert translator.get_symbol_weights() == {
+        "Fe": 1.0,
+        "Mg": 1.0,
+        "O": 2.0,
+        "Si": 1.0,
+    }
+    # Callers may change the returned weights
+    translator.get_symbol_weights()["O"] = 0.0
+    assert translator.get_symbol_weights()["O"] == 2.0
+
+    assert translator.elements_ratios() == [0.2, 0.2, 0.4, 0.2]
+    assert translator.chemical_formula_descriptive() == "O2Si{Fe0.50Mg0.50}2"
+    assert translator.chemical_formula_reduced() == "FeMgO2Si"
+    assert translator.chemical_formula_hill() is None
+    assert translator.chemical_formula_anonymous() == "A2BCD"
+    assert translator.nsites() == 5
+    assert translator.cartesian_site_positions() == [
+        [0.0, 0.0, 0.0],
+        [0.0, 1.5, 0.25],
+        [1.5, 0.0, 0.75],
+        [1.5, 1.5, 1.5],
+        [0.5, 2.5, 1.0],
+    ]
+    assert translator.lattice_vectors() == [
+        [3.0, 0.0, 0.0],
+        [0.0, 3.0, 0.0],
+        [0.0, 0.0, 3.0],
+    ]
+    assert translator.structure_features() == ["disorder"]
+    assert (
+        hex_to_floats(translator.new_attributes["cartesian_site_positions"])
+        == translator.cartesian_site_positions()
+    )
+
+
+def test_unknown_kind():
+    """Ensure a site of an unknown kind is reported"""
+    from aiida_optimade.common import AiidaError
+    from aiida_optimade.translators import StructureDataTranslator
+
+    properties = PROPERTIES.copy()
+    properties["attributes.sites"] = PROPERTIES["attributes.sites"] + [
+        {"kind_name": "Xe", "position": [0.0, 0.0, 0.0]}
+    ]
+    translator = StructureDataTranslator(1, properties=properties)
+    with pytest.raises(AiidaError, match="kind with name Xe cannot be found"):
+        translator.chemical_formula_descriptive()
+
+
+def test_content_hash():
+    """Ensure Nodes are identified by the properties determining their fields"""
+    from copy import deepcopy
+
+    from aiida_optimade.translators import CifDataTranslator, StructureDataTranslator
+
+    content_hash = StructureDataTranslator.content_hash(PROPERTIES)
+    assert content_hash == StructureDataTranslator.content_hash(deepcopy(PROPERTIES))
+    assert content_hash == StructureDataTranslator.content_hash(
+        {**PROPERTIES, "attributes.md5": "abc"}
+    )
+    assert content_hash != StructureDataTranslator.content_hash(
+        {**PROPERTIES, "attributes.pbc3": True}
+    )
+
+    # CifData Nodes are identified by the checksum of their file
+    assert CifDataTranslator.content_hash(PROPERTIES) is None
+    assert CifDataTranslator.content_hash(
+        {**PROPERTIES, "attributes.md5": "abc"}
+    ) == CifDataTranslator.content_hash({"attributes.md5": "abc"})